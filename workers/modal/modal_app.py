@@ -19,10 +19,13 @@ import modal
 from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel, Field
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config as BotoConfig
 import subprocess
 import tempfile
 import pathlib
+import threading
+import time
 import urllib.request
 
 
@@ -55,6 +58,18 @@ image = (
         # every OpenAI call (highlights, voiceover, TTS) raises
         # `Client.__init__() got an unexpected keyword argument 'proxies'`.
         "httpx==0.27.2",
+        # ONNX export + ONNX Runtime for the `onnx` / `onnx-int8` detection backends
+        "onnx==1.15.0",
+        "onnxruntime==1.16.3",
+    )
+    # Bake the YOLOv8n weights into the image so a cold container doesn't
+    # download them from GitHub before its first detection, along with their
+    # ONNX export (dynamic batch) and a dynamically int8-quantized copy.
+    .run_commands(
+        "mkdir -p /models && cd /models && "
+        "python -c \"from ultralytics import YOLO; YOLO('yolov8n.pt').export(format='onnx', dynamic=True)\"",
+        "cd /models && python -c \"from onnxruntime.quantization import QuantType, quantize_dynamic; "
+        "quantize_dynamic('yolov8n.onnx', 'yolov8n.int8.onnx', weight_type=QuantType.QUInt8)\"",
     )
 )
 
@@ -73,13 +88,35 @@ class IngestRequest(BaseModel):
 class IngestResponse(BaseModel):
     proxyUrl: str
     waveformUrl: Optional[str] = None
+    # Binary min/max peak pyramid for editor zoom (format: _write_waveform_peaks).
+    waveformPeaksUrl: Optional[str] = None
     posterUrl: Optional[str] = None
+    # sha256 of the source bytes (dedupe index key). None if the hash could
+    # not be completed, e.g. ffmpeg stopped reading the stream early.
+    contentHash: Optional[str] = None
+    # Per-stage wall times in seconds (download, transcode, waveform, upload,
+    # total) plus `decodePasses` — 1 for the single-pass ingest, 3 when it
+    # fell back to the legacy transcode/extract/poster passes — `streamed`
+    # (True when ffmpeg read the source straight off the download stream, in
+    # which case download and transcode overlap rather than add up),
+    # `uploads` ({artifact: seconds} for the concurrent artifact uploads) and
+    # `deduped` (True when a byte-identical source was cloned, not transcoded).
+    timings: Optional[dict] = None
 
 
 class HighlightRequest(BaseModel):
     assetId: str
     proxyUrl: str
     targetJersey: Optional[str] = None  # e.g. "23" — when set, GPT-4o reports per-scene bbox of that player
+    # Max concurrent GPT-4o vision calls for this request (capped by
+    # OPENAI_VISION_MAX_CONCURRENCY). None = OPENAI_VISION_CONCURRENCY.
+    visionConcurrency: Optional[int] = None
+    # Uncached scenes sent to the classifier, best cheap score first. None =
+    # HIGHLIGHT_CASCADE_CANDIDATES; 0 classifies every scene.
+    cascadeCandidates: Optional[int] = None
+    # Optional jobId: stage + per-scene progress goes to `job:<id>:progress`
+    # like /render's, throttled (see _progress_reporter). None = no writes.
+    jobId: Optional[str] = None
 
 
 class HighlightSegment(BaseModel):
@@ -100,6 +137,10 @@ class HighlightSegment(BaseModel):
 
 class HighlightResponse(BaseModel):
     segments: List[HighlightSegment]
+    # Classifier work for this request: {scenes, cacheHits, classified,
+    # skipped}. `skipped` counts scenes the cheap-first cascade never sent to
+    # GPT-4o/YOLO; `cacheHits` were answered from the classification cache.
+    cascade: Optional[dict] = None
 
 
 class RenderPreset(BaseModel):
@@ -173,16 +214,22 @@ class RenderRequest(BaseModel):
 # 2) Mild contrast & saturation lift.
 # 3) Vibrance via curves preset (gentle S-curve on luma).
 # 4) Subtle unsharp for crisp edges without halos.
-GRADE_FILTER = (
+# Steps 1-3 are per-pixel and can run once on the source before the presets'
+# crops (GRADE_COLOR_FILTER); the sharpen and vignette depend on the output
+# framing and run per preset after crop/scale (GRADE_FRAME_FILTER).
+GRADE_COLOR_FILTER = (
     "format=yuv420p,"
     "eq=contrast=1.28:saturation=1.55:brightness=0.01:gamma=1.05,"
     # Orange-teal telecine: warm highlights (red lifted), cool shadows (blue boosted in lows, cut in mids)
     "curves=r='0/0 0.2/0.18 0.5/0.56 0.8/0.88 1/1'"
     ":g='0/0 0.2/0.19 0.5/0.50 0.8/0.82 1/1'"
-    ":b='0/0 0.2/0.26 0.5/0.46 0.8/0.72 1/0.94',"
+    ":b='0/0 0.2/0.26 0.5/0.46 0.8/0.72 1/0.94'"
+)
+GRADE_FRAME_FILTER = (
     "unsharp=5:5:1.0:5:5:0.0,"
     "vignette=PI/5"
 )
+GRADE_FILTER = f"{GRADE_COLOR_FILTER},{GRADE_FRAME_FILTER}"
 
 
 def _write_progress(
@@ -193,9 +240,9 @@ def _write_progress(
     note: Optional[str] = None,
 ) -> None:
     """
-    Write real render progress to Upstash Redis at key `job:<id>:progress`
-    so Netlify's getRenderJobStatus can show it instead of the simulated
-    elapsed-vs-randomMs() fake. Best-effort: any error is logged and dropped
+    Write real job progress (render, highlights, audio analysis) to Upstash
+    Redis at key `job:<id>:progress` so Netlify's getRenderJobStatus can show
+    it instead of the simulated elapsed-vs-randomMs() fake. Best-effort: any error is logged and dropped
     so a Redis blip can't kill an otherwise-successful render.
 
     Stored as JSON: { progress: 0..100, stage, presets: [{presetId, progress}], note?, ts }
@@ -228,9 +275,62 @@ def _write_progress(
         print(f"[progress] write failed (job={job_id}): {type(e).__name__}: {e}")
 
 
-def _has_audio_stream(path: pathlib.Path) -> bool:
+# Analysis endpoints report progress far more often than /render's per-stage
+# writes, so theirs go through a throttle: at most one write per
+# PROGRESS_MIN_INTERVAL seconds within a stage, sent from a background thread
+# so the analysis never waits on the Redis round trip.
+PROGRESS_MIN_INTERVAL = 1.0
+
+
+def _progress_reporter(job_id: Optional[str]):
+    """
+    `report(progress, stage, note=None, force=False)` for one job; a no-op
+    without a job id. The payload is handed to a writer thread and the newest
+    one wins, so a slow write drops intermediate values rather than queueing
+    them. Stage changes skip the interval; forced (terminal) writes also wait
+    up to 5s for the write to land, so "done" is stored before the response.
     """
-    ffprobe-detect whether the file has at least one audio stream.
+    lock = threading.Lock()
+    idle = threading.Event()
+    idle.set()
+    state = {"pending": None, "busy": False, "last": None, "stage": None}
+
+    def _drain() -> None:
+        while True:
+            with lock:
+                item = state["pending"]
+                state["pending"] = None
+                if item is None:
+                    state["busy"] = False
+                    idle.set()
+                    return
+            _write_progress(job_id, item[0], stage=item[1], note=item[2])
+
+    def report(progress: int, stage: str, note: Optional[str] = None, force: bool = False) -> None:
+        if not job_id:
+            return
+        now = time.perf_counter()
+        if not force and stage == state["stage"] and state["last"] is not None and now - state["last"] < PROGRESS_MIN_INTERVAL:
+            return
+        state["last"] = now
+        state["stage"] = stage
+        with lock:
+            state["pending"] = (progress, stage, note)
+            start = not state["busy"]
+            if start:
+                state["busy"] = True
+                idle.clear()
+        if start:
+            threading.Thread(target=_drain, name="progress", daemon=True).start()
+        if force:
+            idle.wait(timeout=5)
+
+    return report
+
+
+def _has_audio_stream(path) -> bool:
+    """
+    ffprobe-detect whether the file (local path or URL) has at least one audio stream.
     Returns True on probe failure to preserve existing behaviour for normal
     inputs (the audio chain's failure will then surface naturally in stderr);
     only the verified-no-audio case is new.
@@ -546,6 +646,10 @@ class RenderOutput(BaseModel):
 
 class RenderResponse(BaseModel):
     outputs: List[RenderOutput]
+    # Wall-time breakdown in seconds: {"uploads": {presetId: seconds},
+    # "segments": [{index, track, cut, total}], "encode": {multiOutput?,
+    # presetId: seconds}}.
+    timings: Optional[dict] = None
 
 
 def _require_auth(authorization: Optional[str]):
@@ -561,49 +665,308 @@ def _require_auth(authorization: Optional[str]):
 
 # ----- AI/ML Utility Functions -----
 
-def detect_scenes(video_path: pathlib.Path, min_duration: float = 1.2):
+# Keyframe indexes of local analysis proxies, keyed by str(path). Registered
+# by _fetch_analysis_proxy; any other video falls back to plain seeks.
+_keyframe_indexes: dict = {}
+
+
+def _register_keyframe_index(video_path: pathlib.Path, index: dict) -> None:
+    _keyframe_indexes[str(video_path)] = sorted(int(k) for k in index.get("keyframes") or [])
+
+
+def _read_frames_at(cap, video_path: pathlib.Path, frame_numbers: List[int], sequential: bool = False):
     """
-    Detect scene boundaries using PySceneDetect.
-    Returns list of dicts with 'start' and 'end' times in seconds.
-    PRD Requirement: Auto-segment video into scenes > 1.2s (Section 6.2)
+    Yield (i, frame) for each entry of `frame_numbers` that decodes, in
+    request order (i indexes `frame_numbers`). With a keyframe index for
+    `video_path`, each target is reached by whichever is cheaper: `grab()`-ing
+    forward from the current position (no keyframe between here and the
+    target, so a seek would land behind us anyway) or a `CAP_PROP_POS_FRAMES`
+    seek (decodes from the target's keyframe). Without an index every target
+    is a seek, as before — unless `sequential`, where forward targets are
+    always reached by grabbing, so no frame is decoded twice.
     """
-    from scenedetect import detect, ContentDetector, split_video_ffmpeg
+    import bisect
     import cv2
 
-    try:
-        # Detect scenes with content-based detection
-        scene_list = detect(str(video_path), ContentDetector(threshold=27.0))
+    keyframes = _keyframe_indexes.get(str(video_path))
+    pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+    for i, target in enumerate(frame_numbers):
+        target = max(0, int(target))
+        if target != pos:
+            forward = sequential and target > pos
+            if keyframes and target > pos:
+                k = bisect.bisect_right(keyframes, target) - 1
+                forward = k < 0 or keyframes[k] <= pos
+            if forward:
+                while pos < target and cap.grab():
+                    pos += 1
+                if pos != target:
+                    break
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                pos = target
+        ret, frame = cap.read()
+        if not ret:
+            pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+            continue
+        pos = target + 1
+        yield i, frame
+
+
+# Frames the frame server may hold decoded ahead of its consumer. ~33 MB at
+# the 360p analysis rendition, ~130 MB on the 720p proxy fallback.
+FRAME_SERVER_BUFFER = 48
+
+
+def _video_fps(video_path: pathlib.Path) -> float:
+    import cv2
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return fps
+
+
+def _serve_frames(video_path: pathlib.Path, plans: List[List[int]], max_buffered: int = FRAME_SERVER_BUFFER):
+    """
+    Shared frame server. `plans` holds one list of frame numbers per consumer
+    unit (a scene), in time order. The union of all plans is decoded ONCE,
+    front to back, on a producer thread (seeking forward over gaps only when
+    the keyframe index says that skips whole GOPs), and handed over through a
+    queue of at most `max_buffered` frames. Yields (plan_index, {frame_number:
+    frame}) in plan order as soon as every frame a plan needs has gone past;
+    frames that fail to decode are simply absent from the bundle.
+    """
+    import queue
+    import cv2
+
+    wanted: dict = {}
+    for p, frame_numbers in enumerate(plans):
+        for n in frame_numbers:
+            wanted.setdefault(max(0, int(n)), []).append(p)
+    order = sorted(wanted)
+    last_needed = [max((max(0, int(n)) for n in fns), default=-1) for fns in plans]
+
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, max_buffered))
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-        # Convert to time ranges
+    def _produce() -> None:
         cap = cv2.VideoCapture(str(video_path))
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        try:
+            # Start at the first wanted frame: a shard of the timeline (or a
+            # first scene deep into the game) shouldn't grab its way there.
+            if order and order[0] > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, order[0])
+            for i, frame in _read_frames_at(cap, video_path, order, sequential=True):
+                if not _put((order[i], frame)):
+                    return
+        except Exception as e:
+            print(f"[frames] decode stopped early: {e}")
+        finally:
+            cap.release()
+            _put(done)
+
+    producer = threading.Thread(target=_produce, name="frame-server", daemon=True)
+    producer.start()
+    pending: dict = {}
+    next_plan = 0
+    try:
+        while next_plan < len(plans):
+            # Emit every plan whose last frame is already behind the decoder.
+            item = q.get()
+            if item is done:
+                break
+            frame_no, frame = item
+            for p in wanted[frame_no]:
+                pending.setdefault(p, {})[frame_no] = frame
+            while next_plan < len(plans) and last_needed[next_plan] <= frame_no:
+                yield next_plan, pending.pop(next_plan, {})
+                next_plan += 1
+        while next_plan < len(plans):
+            yield next_plan, pending.pop(next_plan, {})
+            next_plan += 1
+    finally:
+        stop.set()
+        producer.join(timeout=5)
+
+
+# Decode-based scene detection (assets without an ingest scene sidecar).
+# `SCENE_DETECT_MODE=sharded` (default) runs a ContentDetector-equivalent HSV
+# delta on a downscaled, frame-skipped stream, split into time shards scored
+# by a process pool; `pyscenedetect` keeps the original single-threaded
+# full-resolution `detect()`.
+SCENE_CONTENT_THRESHOLD = 27.0  # ContentDetector's default, same HSV-delta scale
+SCENE_DETECT_WIDTH = 256        # ~what PySceneDetect's auto-downscale picks for 720p+
+SCENE_DETECT_FPS = 15.0         # sampled frames per second (frame skipping)
+SCENE_SHARD_MIN_SECONDS = 60.0  # shorter shards cost more in pool start-up than they save
+
+
+def _container_cpus() -> int:
+    """
+    Cores this container may use: the cgroup CPU quota (what Modal's `cpu=`
+    sets) when there is one, else the affinity mask / os.cpu_count(), which
+    on a Modal host counts the whole machine.
+    """
+    try:
+        quota, period = pathlib.Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            return max(1, int(float(quota) / float(period) + 0.5))
+    except (OSError, ValueError):
+        pass
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+def _scene_detect_workers() -> int:
+    try:
+        return max(1, int(os.environ.get("SCENE_DETECT_WORKERS") or _container_cpus()))
+    except ValueError:
+        return _container_cpus()
+
+
+def _scene_content_scores(video_path: str, fps: float, step: float, first: int, last: int, width: int = SCENE_DETECT_WIDTH) -> List[float]:
+    """
+    HSV content delta between sampled frames k-1 and k, for k in
+    [first, last). Sample k is frame round(k * step). A shard reads one
+    sample before its own range (the overlap), so its first delta is
+    computed from the same pair a single front-to-back pass would use, and
+    concatenating shards gives exactly the single-pass score list. Samples
+    that fail to decode score 0 (no cut). Top-level so a process pool can run it.
+    """
+    import cv2
+    import numpy as np
+
+    cv2.setNumThreads(1)
+    begin = max(0, first - 1)
+    frame_numbers = [int(round(k * step)) for k in range(begin, last)]
+    scores = [0.0] * (last - first)
+    if not frame_numbers:
+        return scores
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if frame_numbers[0] > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_numbers[0])
+        prev_k, prev_hsv = None, None
+        for i, frame in _read_frames_at(cap, pathlib.Path(video_path), frame_numbers, sequential=True):
+            k = begin + i
+            h, w = frame.shape[:2]
+            small = cv2.resize(frame, (width, max(2, int(round(h * width / w / 2)) * 2)), interpolation=cv2.INTER_AREA)
+            hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV).astype(np.int16)
+            if prev_hsv is not None and prev_k == k - 1 and k >= first:
+                scores[k - first] = float(np.abs(hsv - prev_hsv).reshape(-1, 3).mean(axis=0).mean())
+            prev_k, prev_hsv = k, hsv
+    finally:
         cap.release()
+    return scores
 
-        scenes = []
-        for i, scene in enumerate(scene_list):
-            start_time = scene[0].get_seconds()
-            end_time = scene[1].get_seconds()
-            duration = end_time - start_time
-
-            # Filter scenes by minimum duration
-            if duration >= min_duration:
-                scenes.append({
-                    'id': f'scene-{i}',
-                    'start': start_time,
-                    'end': end_time,
-                    'duration': duration
-                })
 
-        return scenes
+def _detect_scene_cuts_sharded(video_path: pathlib.Path, workers: Optional[int] = None, sample_fps: float = SCENE_DETECT_FPS) -> Tuple[List[List[float]], float, dict]:
+    """
+    Score the whole timeline in shards and merge. Returns ([[t, score]] for
+    every sampled frame after the first, duration, stats). Cut selection
+    (threshold + min gap) happens after the merge, on the full list, so the
+    result doesn't depend on where the shard borders fell.
+    """
+    import cv2
+    from concurrent.futures import ProcessPoolExecutor
+
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    duration = frame_count / fps if fps else 0.0
+    step = max(1.0, fps / sample_fps)
+    samples = int((frame_count - 1) // step) + 1 if frame_count else 0
+
+    workers = workers or _scene_detect_workers()
+    per_shard = max(1, int(SCENE_SHARD_MIN_SECONDS * fps / step))
+    shards = max(1, min(workers * 2, -(-samples // per_shard)))
+    bounds = [round(samples * i / shards) for i in range(shards + 1)]
+    ranges = [(bounds[i], bounds[i + 1]) for i in range(shards) if bounds[i + 1] > bounds[i]]
+
+    t0 = time.perf_counter()
+    if len(ranges) <= 1 or workers == 1:
+        parts = [_scene_content_scores(str(video_path), fps, step, a, b) for a, b in ranges]
+    else:
+        # Same start method as the analysis executor (see _analysis_mp_context):
+        # never fork the request process while its threads are live. The
+        # forkserver has already imported this module, so workers start cheap.
+        ctx = _analysis_mp_context()
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=ctx) as pool:
+            parts = list(pool.map(_scene_content_scores, *zip(*[(str(video_path), fps, step, a, b) for a, b in ranges])))
+    elapsed = time.perf_counter() - t0
+
+    candidates = []
+    for (a, _), part in zip(ranges, parts):
+        for k, score in enumerate(part, start=a):
+            if k > 0:
+                candidates.append([k * step / fps, score])
+    stats = {
+        "workers": min(workers, len(ranges)) if len(ranges) > 1 else 1,
+        "shards": len(ranges),
+        "sampledFrames": samples,
+        "decodedFrames": frame_count,
+        "seconds": round(elapsed, 3),
+    }
+    return candidates, duration, stats
+
+
+def detect_scenes(video_path: pathlib.Path, min_duration: float = 1.2):
+    """
+    Detect scene boundaries (see SCENE_DETECT_MODE above).
+    Returns list of dicts with 'start' and 'end' times in seconds.
+    PRD Requirement: Auto-segment video into scenes > 1.2s (Section 6.2)
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    duration = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0) / fps
+    cap.release()
+
+    try:
+        if os.environ.get("SCENE_DETECT_MODE", "sharded") == "pyscenedetect":
+            from scenedetect import detect, ContentDetector
+
+            # Detect scenes with content-based detection
+            scene_list = detect(str(video_path), ContentDetector(threshold=SCENE_CONTENT_THRESHOLD))
+
+            scenes = []
+            for i, scene in enumerate(scene_list):
+                start_time = scene[0].get_seconds()
+                end_time = scene[1].get_seconds()
+
+                # Filter scenes by minimum duration
+                if end_time - start_time >= min_duration:
+                    scenes.append({
+                        'id': f'scene-{i}',
+                        'start': start_time,
+                        'end': end_time,
+                        'duration': end_time - start_time
+                    })
+            return scenes
+
+        candidates, duration, stats = _detect_scene_cuts_sharded(video_path)
+        per_core = stats["decodedFrames"] / max(1e-6, stats["seconds"]) / stats["workers"]
+        print(
+            f"[scenes] {stats['shards']} shards on {stats['workers']} workers: "
+            f"{stats['decodedFrames']} frames in {stats['seconds']:.2f}s ({per_core:.0f} fps/core)"
+        )
+        return _scenes_from_cuts(candidates, duration, min_duration, SCENE_CONTENT_THRESHOLD)
     except Exception as e:
         # Fallback: divide video into 3-second chunks
-        import cv2
-        cap = cv2.VideoCapture(str(video_path))
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / fps
-        cap.release()
-
+        print(f"[scenes] detection failed, using 3s chunks: {e}")
         scenes = []
         chunk_duration = 3.0
         for i, t in enumerate(range(0, int(duration), int(chunk_duration))):
@@ -616,6 +979,62 @@ def detect_scenes(video_path: pathlib.Path, min_duration: float = 1.2):
         return scenes
 
 
+# Frame rate the motion normalisation was calibrated on (the 720p60 edit
+# proxy). Lower-fps inputs sample the same time span and have their per-frame
+# flow scaled back to this rate so scores don't depend on which proxy was read.
+MOTION_REFERENCE_FPS = 60.0
+
+
+def _motion_frame_numbers(fps: float, start: float, end: float) -> List[int]:
+    """Consecutive frames motion intensity samples: up to 1s from `start`."""
+    start_frame = int(start * fps)
+    end_frame = int(end * fps)
+    max_frames = min(max(2, int(round(60 * fps / MOTION_REFERENCE_FPS))), end_frame - start_frame)
+    return list(range(start_frame, start_frame + max(0, max_frames)))
+
+
+def _motion_gray(frame):
+    """Motion works on 320x180 grayscale, whatever the source resolution."""
+    import cv2
+    return cv2.cvtColor(cv2.resize(frame, (320, 180)), cv2.COLOR_BGR2GRAY)
+
+
+def _flow_magnitude(prev_gray, gray) -> float:
+    """Mean Farneback flow magnitude between two `_motion_gray` frames, in pixels."""
+    import cv2
+    import numpy as np
+
+    flow = cv2.calcOpticalFlowFarneback(
+        prev_gray, gray, None,
+        pyr_scale=0.5, levels=3, winsize=15,
+        iterations=3, poly_n=5, poly_sigma=1.2, flags=0
+    )
+    return float(np.mean(np.sqrt(flow[..., 0]**2 + flow[..., 1]**2)))
+
+
+def _normalize_motion(mean_flow: float, fps: float) -> float:
+    # Normalize to 0-1 range (typical motion range is 0-10 pixels)
+    return float(min(1.0, mean_flow * (fps / MOTION_REFERENCE_FPS) / 8.0))
+
+
+def _motion_from_frames(frames: list, fps: float) -> float:
+    """Mean Farneback flow over consecutive BGR `frames`, normalised to 0-1."""
+    import numpy as np
+
+    prev_frame = None
+    motion_values = []
+    for frame in frames:
+        gray = _motion_gray(frame)
+        if prev_frame is not None:
+            motion_values.append(_flow_magnitude(prev_frame, gray))
+        prev_frame = gray
+
+    if not motion_values:
+        return 0.5  # Default
+
+    return _normalize_motion(float(np.mean(motion_values)), fps)
+
+
 def compute_motion_intensity(video_path: pathlib.Path, start: float, end: float) -> float:
     """
     Calculate motion intensity using optical flow.
@@ -623,57 +1042,180 @@ def compute_motion_intensity(video_path: pathlib.Path, start: float, end: float)
     Returns normalized value 0.0-1.0
     """
     import cv2
-    import numpy as np
 
     try:
         cap = cv2.VideoCapture(str(video_path))
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
 
-        # Seek to start time
-        start_frame = int(start * fps)
-        end_frame = int(end * fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        # Seek to start time, then read sequentially
+        frames = [f for _, f in _read_frames_at(cap, video_path, _motion_frame_numbers(fps, start, end))]
+        cap.release()
+        return _motion_from_frames(frames, fps)
 
-        prev_frame = None
-        motion_values = []
-        frame_count = 0
-        max_frames = min(60, end_frame - start_frame)  # Sample up to 60 frames
+    except Exception:
+        return 0.5  # Default on error
 
-        while cap.get(cv2.CAP_PROP_POS_FRAMES) < end_frame and frame_count < max_frames:
-            ret, frame = cap.read()
-            if not ret:
-                break
 
-            # Downsample for performance
-            frame = cv2.resize(frame, (320, 180))
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+# ----- Motion curve -----
+# One sequential pass over the whole video samples the flow between a pair of
+# consecutive frames every 1/hz seconds (a bucket). Prefix sums over the
+# buckets make any window's motion intensity an O(1) lookup, so scoring cost
+# no longer grows with scene count or overlap. Curves are persisted in the
+# bucket under the analysed file's sha256 (`motion/<sha256>.npz`).
 
-            if prev_frame is not None:
-                # Calculate optical flow
-                flow = cv2.calcOpticalFlowFarneback(
-                    prev_frame, gray, None,
-                    pyr_scale=0.5, levels=3, winsize=15,
-                    iterations=3, poly_n=5, poly_sigma=1.2, flags=0
-                )
-                # Compute magnitude
-                magnitude = np.sqrt(flow[..., 0]**2 + flow[..., 1]**2)
-                motion_values.append(np.mean(magnitude))
+MOTION_CURVE_VERSION = 1
 
-            prev_frame = gray
-            frame_count += 1
 
-        cap.release()
+def _motion_curve_hz() -> float:
+    """Buckets per second (`MOTION_CURVE_HZ`, default 10)."""
+    try:
+        return min(60.0, max(1.0, float(os.environ.get("MOTION_CURVE_HZ", "10"))))
+    except ValueError:
+        return 10.0
 
-        if not motion_values:
-            return 0.5  # Default
 
-        # Normalize to 0-1 range (typical motion range is 0-10 pixels)
-        avg_motion = np.mean(motion_values)
-        normalized = min(1.0, avg_motion / 8.0)
-        return float(normalized)
+def _curve_from_values(values, hz: float, fps: float) -> dict:
+    import numpy as np
+    values = np.asarray(values, dtype=np.float32)
+    prefix = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    return {"hz": float(hz), "fps": float(fps), "values": values, "prefix": prefix}
+
+
+def _motion_curve_geometry(video_path: pathlib.Path, hz: Optional[float] = None) -> Tuple[float, float, int]:
+    """(hz, fps, bucket count) of the curve for `video_path`."""
+    import cv2
+    import numpy as np
+
+    hz = hz or _motion_curve_hz()
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    hz = min(hz, fps)
+    return hz, fps, max(0, int(np.ceil(max(0, frame_count - 1) / fps * hz)))
+
+
+def _motion_curve_values(video_path: pathlib.Path, hz: float, fps: float, first: int, last: int):
+    """
+    Flow magnitudes for buckets [first, last); NaN where a frame didn't
+    decode. Bucket b only depends on its own frame pair, so shards of the
+    bucket range concatenate to exactly the whole-video values.
+    """
+    import numpy as np
+
+    pairs = [int(round(b * fps / hz)) for b in range(first, last)]
+    plans = [[f, f + 1] for f in pairs]
+    values = np.full(len(pairs), np.nan, dtype=np.float32)
+    grays: dict = {}
+    for b, bundle in _serve_frames(video_path, plans):
+        f = pairs[b]
+        for n in (f, f + 1):
+            if n not in grays and n in bundle:
+                grays[n] = _motion_gray(bundle[n])
+        if f in grays and f + 1 in grays:
+            values[b] = _flow_magnitude(grays[f], grays[f + 1])
+        # With hz == fps, the next pair starts on this pair's second frame.
+        for n in [n for n in grays if n <= f]:
+            del grays[n]
+    return values
+
+
+def compute_motion_curve(
+    video_path: pathlib.Path, hz: Optional[float] = None,
+    executor: Optional[dict] = None, video_ref: Optional[dict] = None,
+) -> dict:
+    """
+    Per-bucket mean flow magnitude (pixels, at the video's own fps) over the
+    whole video. Bucket b holds the flow from frame round(b*fps/hz) to the
+    next one. The bucket range is cut into shards of at least
+    ANALYSIS_SHARD_SECONDS and run on `executor` (in-process by default);
+    every backend computes the same buckets from the same frames.
+    """
+    import numpy as np
 
+    hz, fps, buckets = _motion_curve_geometry(video_path, hz)
+    executor = executor or _analysis_executor("inline")
+    ranges = _shard_ranges(buckets, executor["workers"], int(ANALYSIS_SHARD_SECONDS * hz))
+    tasks = [
+        {"task": "motion", "video": video_ref or {"path": str(video_path)}, "hz": hz, "fps": fps, "first": a, "last": b}
+        for a, b in ranges
+    ]
+    parts = _map_analysis_tasks(executor, tasks)
+    values = np.concatenate(parts).astype(np.float32) if parts else np.zeros(0, dtype=np.float32)
+    # Buckets that failed to decode take the curve's mean rather than 0, so a
+    # corrupt GOP doesn't read as a dead-ball stretch.
+    missing = np.isnan(values)
+    if missing.any():
+        values[missing] = float(np.nanmean(values)) if not missing.all() else 0.0
+    return _curve_from_values(values, hz, fps)
+
+
+def motion_from_curve(curve: dict, start: float, end: float) -> float:
+    """Motion intensity (0-1) of [start, end) from the curve's prefix sums."""
+    import math
+
+    hz = curve["hz"]
+    prefix = curve["prefix"]
+    n = len(prefix) - 1
+    if n <= 0:
+        return 0.5
+    lo = min(n - 1, max(0, int(start * hz)))
+    hi = min(n, max(lo + 1, int(math.ceil(end * hz))))
+    return _normalize_motion(float(prefix[hi] - prefix[lo]) / (hi - lo), curve["fps"])
+
+
+def _motion_curve_key(video_sha256: str) -> str:
+    return f"motion/{video_sha256}.npz"
+
+
+def _load_motion_curve(s3, bucket: str, video_sha256: str) -> Optional[dict]:
+    import io
+    import numpy as np
+    try:
+        body = s3.get_object(Bucket=bucket, Key=_motion_curve_key(video_sha256))["Body"].read()
+        data = np.load(io.BytesIO(body), allow_pickle=False)
+        if int(data["version"]) != MOTION_CURVE_VERSION or float(data["hz"]) != min(_motion_curve_hz(), float(data["fps"])):
+            return None
+        return _curve_from_values(data["values"], float(data["hz"]), float(data["fps"]))
     except Exception:
-        return 0.5  # Default on error
+        return None
+
+
+def _store_motion_curve(s3, bucket: str, video_sha256: str, curve: dict) -> None:
+    import io
+    import numpy as np
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf, version=np.int32(MOTION_CURVE_VERSION), hz=np.float64(curve["hz"]),
+        fps=np.float64(curve["fps"]), values=curve["values"],
+    )
+    s3.put_object(
+        Bucket=bucket, Key=_motion_curve_key(video_sha256), Body=buf.getvalue(),
+        ContentType="application/octet-stream",
+    )
+
+
+def _motion_curve_for(
+    video_path: pathlib.Path, s3, bucket: str, video_sha256: Optional[str],
+    executor: Optional[dict] = None, video_ref: Optional[dict] = None,
+) -> dict:
+    """Persisted curve for this exact file if there is one, else compute (and persist) it."""
+    if s3 is not None and video_sha256:
+        curve = _load_motion_curve(s3, bucket, video_sha256)
+        if curve is not None:
+            return curve
+    t0 = time.perf_counter()
+    curve = compute_motion_curve(video_path, executor=executor, video_ref=video_ref)
+    print(
+        f"[motion] curve: {len(curve['values'])} buckets at {curve['hz']:g} Hz "
+        f"in {time.perf_counter() - t0:.2f}s ({(executor or {}).get('kind', 'inline')})"
+    )
+    if s3 is not None and video_sha256:
+        try:
+            _store_motion_curve(s3, bucket, video_sha256, curve)
+        except Exception as e:
+            print(f"[motion] curve upload failed: {e}")
+    return curve
 
 
 def compute_audio_peak(video_path: pathlib.Path, start: float, end: float) -> float:
@@ -704,7 +1246,112 @@ def compute_audio_peak(video_path: pathlib.Path, start: float, end: float) -> fl
         return 0.3  # Default on error
 
 
+# ----- Audio envelope -----
+# /highlights decodes the audio track once into a `librosa.feature.rms`-shaped
+# envelope (centred 2048-sample frames, 512 hop, zero padded) and answers each
+# scene's peak from a sparse table: O(1) range max, instead of one librosa
+# decode per scene that re-reads everything before `offset`.
+
+AUDIO_PEAK_SAMPLE_RATE = 22050
+AUDIO_PEAK_FRAME = 2048
+AUDIO_PEAK_HOP = 512
+
+
+def compute_audio_envelope(video_path: pathlib.Path) -> Optional[dict]:
+    """
+    RMS envelope of the whole audio track plus its sparse table, from one
+    streamed ffmpeg decode (mono f32 @ 22.05 kHz, read in chunks so memory is
+    per-hop energies, not samples). Frame t's window is hop blocks t-2..t+1,
+    so it's built from per-block sums of squares. Returns an empty envelope
+    for videos without audio and None if the decode fails.
+    """
+    import numpy as np
+
+    hop = AUDIO_PEAK_HOP
+    if not _has_audio_stream(video_path):
+        return {"sr": AUDIO_PEAK_SAMPLE_RATE, "hop": hop, "rms": np.zeros(0, dtype=np.float32), "table": []}
+    proc = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", str(video_path), "-vn", "-ac", "1",
+         "-ar", str(AUDIO_PEAK_SAMPLE_RATE), "-f", "f32le", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    energy_parts = []
+    carry = np.zeros(0, dtype=np.float32)
+    total = 0
+    chunk_bytes = hop * 2048 * 4
+    try:
+        while True:
+            buf = proc.stdout.read(chunk_bytes)
+            if not buf:
+                break
+            y = np.frombuffer(buf[: len(buf) - len(buf) % 4], dtype="<f4")
+            total += y.size
+            y = np.concatenate([carry, y]) if carry.size else y
+            full = (y.size // hop) * hop
+            if full:
+                blocks = y[:full].astype(np.float64).reshape(-1, hop)
+                energy_parts.append(np.einsum("ij,ij->i", blocks, blocks))
+            carry = y[full:].copy()
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+    if rc != 0:
+        print(f"[audio] envelope decode failed (ffmpeg exit {rc})")
+        return None
+    if carry.size:
+        energy_parts.append(np.array([float(np.dot(carry.astype(np.float64), carry))]))
+    energy = np.concatenate(energy_parts) if energy_parts else np.zeros(0)
+    n_frames = 1 + total // hop if total else 0
+    padded = np.concatenate([np.zeros(2), energy, np.zeros(2)])
+    window = padded[:-3] + padded[1:-2] + padded[2:-1] + padded[3:]
+    rms = np.sqrt(np.maximum(window[:n_frames], 0.0) / AUDIO_PEAK_FRAME).astype(np.float32)
+    return {"sr": AUDIO_PEAK_SAMPLE_RATE, "hop": hop, "rms": rms, "table": _sparse_table_max(rms)}
+
+
+def _sparse_table_max(values) -> list:
+    """Level k holds max(values[i : i + 2**k]) for every i that fits."""
+    import numpy as np
+
+    table = [np.asarray(values)]
+    span = 1
+    while 2 * span <= len(values):
+        prev = table[-1]
+        table.append(np.maximum(prev[:-span], prev[span:]))
+        span *= 2
+    return table
+
+
+def _range_max(table: list, lo: int, hi: int) -> float:
+    """max(values[lo..hi]) inclusive, from two overlapping power-of-two spans."""
+    k = (hi - lo + 1).bit_length() - 1
+    return float(max(table[k][lo], table[k][hi - (1 << k) + 1]))
+
+
+def audio_peak_from_envelope(envelope: dict, start: float, end: float) -> float:
+    """Same 0-1 value as `compute_audio_peak`, as a range-max query over the envelope."""
+    n = len(envelope["rms"])
+    if n == 0:
+        return 0.3
+    sr, hop = envelope["sr"], envelope["hop"]
+    # Only frames whose whole window lies inside the scene: the per-scene
+    # slice zero-padded its edges, so audio just outside the scene never
+    # counted towards its peak and must not leak in here either.
+    half = AUDIO_PEAK_FRAME // 2
+    lo = min(n - 1, max(0, -(-int(start * sr + half) // hop)))
+    hi = min(n - 1, int(end * sr - half) // hop)
+    if hi < lo:
+        lo = hi = min(n - 1, max(0, int((start + end) / 2 * sr) // hop))
+    peak_rms = _range_max(envelope["table"], lo, hi)
+    # Normalize (typical peak RMS around 0.1-0.3 for crowd noise)
+    return float(min(1.0, peak_rms / 0.2))
+
+
 _yolo_model = None
+YOLO_WEIGHTS = "/models/yolov8n.pt"  # baked into the image
+# Guards the lazy model / detector loads: render tracks segments on several
+# threads, and on a cold container each would otherwise load its own copy.
+# Reentrant because `_get_detector` loads the YOLO model while holding it.
+_model_load_lock = threading.RLock()
 
 
 def _get_yolo_model():
@@ -712,13 +1359,224 @@ def _get_yolo_model():
     global _yolo_model
     if _yolo_model is not None:
         return _yolo_model
+    with _model_load_lock:
+        if _yolo_model is not None:
+            return _yolo_model
+        try:
+            from ultralytics import YOLO
+            _yolo_model = YOLO(YOLO_WEIGHTS if os.path.exists(YOLO_WEIGHTS) else "yolov8n.pt")
+            return _yolo_model
+        except Exception as e:
+            print(f"[yolo] failed to load model: {e}")
+            return None
+
+
+# ----- Detection backends -----
+# Person/ball detection runs YOLOv8n through one of (`DETECTION_BACKEND`):
+#   ultralytics  PyTorch via ultralytics (default)
+#   onnx         the same weights exported to ONNX, run by ONNX Runtime
+#   onnx-int8    that export with int8 dynamically quantized weights
+# Every backend returns the same (persons, ball_centers) shape, with the same
+# confidence / NMS thresholds. Compare them with `bench_detection`.
+
+DETECTION_BACKENDS = ("ultralytics", "onnx", "onnx-int8")
+ONNX_WEIGHTS = {"onnx": "/models/yolov8n.onnx", "onnx-int8": "/models/yolov8n.int8.onnx"}
+YOLO_CONF = 0.30
+YOLO_IOU = 0.45
+YOLO_INPUT_SIZE = 640
+
+_detectors: dict = {}
+# ultralytics' predictor isn't thread-safe; render prepares segments on threads.
+_yolo_lock = threading.Lock()
+
+
+def _detection_backend() -> str:
+    """`DETECTION_BACKEND`, defaulting to ultralytics."""
+    backend = (os.environ.get("DETECTION_BACKEND") or "ultralytics").lower()
+    if backend not in DETECTION_BACKENDS:
+        print(f"[yolo] unknown detection backend {backend!r}, using ultralytics")
+        return "ultralytics"
+    return backend
+
+
+def _letterbox(frame, size: int):
+    """`frame` scaled to fit a size x size grey canvas, centred. Returns (canvas, scale, left, top)."""
+    import cv2
+    import numpy as np
+
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    left, top = (size - nw) // 2, (size - nh) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, left, top
+
+
+class _OnnxDetector:
+    """
+    YOLOv8n as exported ONNX, run by ONNX Runtime on CPU. Mirrors ultralytics'
+    post-processing: each anchor takes its best class, anchors under YOLO_CONF
+    are dropped, then per-class NMS at YOLO_IOU. Only persons and balls are kept.
+    """
+
+    def __init__(self, path: str):
+        import onnxruntime as ort
+
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, frames: list) -> List[Tuple[list, list]]:
+        import numpy as np
+
+        boxed = [_letterbox(f, YOLO_INPUT_SIZE) for f in frames]
+        # BGR HWC uint8 → RGB NCHW float 0-1
+        x = np.stack([b[0] for b in boxed])[..., ::-1].transpose(0, 3, 1, 2)
+        x = np.ascontiguousarray(x, dtype=np.float32) / 255.0
+        preds = self.session.run(None, {self.input_name: x})[0]  # (N, 4 + 80, anchors)
+        return [
+            self._parse(pred, frame.shape, scale, left, top)
+            for pred, frame, (_, scale, left, top) in zip(preds, frames, boxed)
+        ]
+
+    @staticmethod
+    def _parse(pred, shape, scale: float, left: int, top: int) -> Tuple[list, list]:
+        import cv2
+        import numpy as np
+
+        pred = pred.T
+        scores = pred[:, 4:]
+        cls_ids = scores.argmax(axis=1)
+        confs = scores[np.arange(len(scores)), cls_ids]
+        h, w = shape[:2]
+        persons: list = []
+        balls: list = []
+        # COCO: 0 = person, 32 = sports ball
+        for cls_id in (0, 32):
+            idx = np.where((cls_ids == cls_id) & (confs >= YOLO_CONF))[0]
+            if not len(idx):
+                continue
+            cx, cy, bw, bh = (pred[idx, k] for k in range(4))
+            x1 = np.clip((cx - bw / 2 - left) / scale, 0, w)
+            y1 = np.clip((cy - bh / 2 - top) / scale, 0, h)
+            x2 = np.clip((cx + bw / 2 - left) / scale, 0, w)
+            y2 = np.clip((cy + bh / 2 - top) / scale, 0, h)
+            rects = [[float(a), float(b), float(c - a), float(d - b)] for a, b, c, d in zip(x1, y1, x2, y2)]
+            keep = cv2.dnn.NMSBoxes(rects, confs[idx].tolist(), YOLO_CONF, YOLO_IOU)
+            for k in np.asarray(keep).reshape(-1):
+                bx, by, bw_, bh_ = rects[k]
+                bw_, bh_ = max(1.0, bw_), max(1.0, bh_)
+                conf = float(confs[idx[k]])
+                if cls_id == 0:
+                    persons.append({
+                        "x": bx, "y": by, "w": bw_, "h": bh_,
+                        "cx": bx + bw_ / 2.0, "cy": by + bh_ / 2.0, "conf": conf,
+                    })
+                else:
+                    balls.append((bx + bw_ / 2.0, by + bh_ / 2.0, conf))
+        return persons, balls
+
+
+def _get_detector(backend: Optional[str] = None):
+    """
+    Detection callable for `backend` (default `_detection_backend()`): a list
+    of BGR frames in, one (persons, ball_centers) per frame out, one forward
+    pass per call. Loaded once per container; an ONNX backend whose model or
+    runtime is missing falls back to ultralytics. None if nothing loads.
+    """
+    backend = backend or _detection_backend()
+    if backend in _detectors:
+        return _detectors[backend]
+    with _model_load_lock:
+        if backend in _detectors:
+            return _detectors[backend]
+        detector = None
+        if backend in ONNX_WEIGHTS:
+            try:
+                detector = _OnnxDetector(ONNX_WEIGHTS[backend])
+                print(f"[yolo] {backend} backend loaded from {ONNX_WEIGHTS[backend]}")
+            except Exception as e:
+                print(f"[yolo] {backend} backend failed to load, using ultralytics: {e}")
+        if detector is None:
+            model = _get_yolo_model()
+            if model is not None:
+                def detector(chunk: list) -> List[Tuple[list, list]]:
+                    # A list source is one batch to ultralytics; results come back in order.
+                    with _yolo_lock:
+                        results = model(list(chunk), verbose=False, conf=YOLO_CONF, iou=YOLO_IOU)
+                    return [_parse_yolo_result(r) for r in results]
+        if detector is not None:
+            _detectors[backend] = detector
+        return detector
+
+
+def _yolo_batch_size() -> int:
+    """Frames per YOLO forward pass (`YOLO_BATCH_SIZE`, default 8; see bench_yolo)."""
     try:
-        from ultralytics import YOLO
-        _yolo_model = YOLO("yolov8n.pt")
-        return _yolo_model
-    except Exception as e:
-        print(f"[yolo] failed to load model: {e}")
-        return None
+        return max(1, int(os.environ.get("YOLO_BATCH_SIZE", "8")))
+    except ValueError:
+        return 8
+
+
+def _parse_yolo_result(r) -> Tuple[list, list]:
+    """(persons, ball_centers) from one ultralytics Results object, in pixel coords."""
+    persons = []
+    balls = []
+    if r.boxes is None:
+        return persons, balls
+    for box in r.boxes:
+        cls_id = int(box.cls[0]) if box.cls is not None else -1
+        conf = float(box.conf[0]) if box.conf is not None else 0.0
+        xyxy = box.xyxy[0].tolist()
+        x1, y1, x2, y2 = xyxy
+        w = max(1.0, x2 - x1)
+        h = max(1.0, y2 - y1)
+        cx = x1 + w / 2.0
+        cy = y1 + h / 2.0
+        # COCO: 0 = person, 32 = sports ball
+        if cls_id == 0:
+            persons.append({"x": x1, "y": y1, "w": w, "h": h, "cx": cx, "cy": cy, "conf": conf})
+        elif cls_id == 32:
+            balls.append((cx, cy, conf))
+    return persons, balls
+
+
+def _detect_persons_and_ball_batch(
+    frames, batch_size: Optional[int] = None, backend: Optional[str] = None,
+) -> List[Tuple[list, list]]:
+    """
+    Batched `_detect_persons_and_ball`. `frames` is a list or any iterator of
+    BGR frames; they are pulled `batch_size` at a time (default
+    `_yolo_batch_size()`) and each chunk is one forward pass of the detection
+    `backend` (default `DETECTION_BACKEND`), so only one chunk of frames is
+    held here at once. Returns one (persons, ball_centers) per input frame, in
+    input order — ([], []) for frames in a chunk that failed, or for every
+    frame if the model didn't load.
+    """
+    detector = _get_detector(backend)
+    batch_size = batch_size or _yolo_batch_size()
+    out: List[Tuple[list, list]] = []
+    chunk: list = []
+
+    def _flush() -> None:
+        if not chunk:
+            return
+        if detector is None:
+            out.extend(([], []) for _ in chunk)
+        else:
+            try:
+                out.extend(detector(list(chunk)))
+            except Exception as e:
+                print(f"[yolo] inference error: {e}")
+                out.extend(([], []) for _ in chunk)
+        chunk.clear()
+
+    for frame in frames:
+        chunk.append(frame)
+        if len(chunk) >= batch_size:
+            _flush()
+    _flush()
+    return out
 
 
 def _detect_persons_and_ball(frame):
@@ -726,35 +1584,156 @@ def _detect_persons_and_ball(frame):
     Run YOLOv8 on a single frame. Returns (persons, ball_centers) where:
       persons     = list of dict { x, y, w, h, cx, cy, conf } in pixel coords
       ball_centers = list of (cx, cy, conf) for sports-ball class
+    Prefer `_detect_persons_and_ball_batch` when there are several frames.
     """
-    model = _get_yolo_model()
-    if model is None:
-        return [], []
+    return _detect_persons_and_ball_batch([frame], batch_size=1)[0]
+
+
+def _strip_frame_numbers(fps: float, start: float, end: float, sample_count: int = 5) -> List[int]:
+    """The classifier's samples: `sample_count` frames evenly inside the segment."""
+    import numpy as np
+    return [int(t * fps) for t in np.linspace(start, end, sample_count + 2)[1:-1]]
+
+
+# ----- GPT-4o vision: shared client, backoff, concurrency -----
+
+OPENAI_VISION_MODEL = "gpt-4o-2024-08-06"
+# Bump whenever the classification prompt, the strip layout or the response
+# parsing in `_classify_action_openai` changes — it is part of the
+# classification cache key, so cached answers from the old prompt stop matching.
+OPENAI_VISION_PROMPT_VERSION = 1
+# Retry budget for one classification call. 429s wait out Retry-After (plus
+# jitter so a pool of workers doesn't come back in lockstep); 5xx, timeouts
+# and connection drops back off exponentially with full jitter.
+OPENAI_MAX_RETRIES = 4
+OPENAI_BACKOFF_BASE = 0.5
+OPENAI_BACKOFF_MAX = 20.0
+
+_openai_clients: dict = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _get_openai_client(api_key: str, timeout: float = 15.0):
+    """
+    One OpenAI client per (key, base URL, timeout) per container — its httpx
+    pool is thread-safe and reused across the vision workers. The SDK's own
+    retries are off; `_openai_create_with_backoff` owns retry policy.
+    `OPENAI_BASE_URL` (read by the SDK) points it at the local stub.
+    """
+    key = (api_key, os.environ.get("OPENAI_BASE_URL"), timeout)
+    with _openai_clients_lock:
+        client = _openai_clients.get(key)
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+            _openai_clients[key] = client
+        return client
+
+
+def _openai_vision_concurrency(requested: Optional[int] = None) -> int:
+    """
+    Concurrent vision calls for one /highlights request: the request's own
+    cap if given, else `OPENAI_VISION_CONCURRENCY` (default 4), never above
+    `OPENAI_VISION_MAX_CONCURRENCY` (default 16).
+    """
+    def _env_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.environ.get(name, str(default))))
+        except ValueError:
+            return default
+
+    ceiling = _env_int("OPENAI_VISION_MAX_CONCURRENCY", 16)
+    n = requested if requested and requested > 0 else _env_int("OPENAI_VISION_CONCURRENCY", 4)
+    return max(1, min(ceiling, int(n)))
+
+
+def _retry_after_seconds(exc) -> Optional[float]:
+    """Retry-After (seconds or HTTP date) / retry-after-ms from an API error's response."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
     try:
-        results = model(frame, verbose=False, conf=0.30, iou=0.45)
-        persons = []
-        balls = []
-        for r in results:
-            if r.boxes is None:
-                continue
-            for box in r.boxes:
-                cls_id = int(box.cls[0]) if box.cls is not None else -1
-                conf = float(box.conf[0]) if box.conf is not None else 0.0
-                xyxy = box.xyxy[0].tolist()
-                x1, y1, x2, y2 = xyxy
-                w = max(1.0, x2 - x1)
-                h = max(1.0, y2 - y1)
-                cx = x1 + w / 2.0
-                cy = y1 + h / 2.0
-                # COCO: 0 = person, 32 = sports ball
-                if cls_id == 0:
-                    persons.append({"x": x1, "y": y1, "w": w, "h": h, "cx": cx, "cy": cy, "conf": conf})
-                elif cls_id == 32:
-                    balls.append((cx, cy, conf))
-        return persons, balls
-    except Exception as e:
-        print(f"[yolo] inference error: {e}")
-        return [], []
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _openai_create_with_backoff(client, **kwargs):
+    """
+    `client.chat.completions.create(**kwargs)` with rate-limit-aware retries.
+    Non-retryable errors (4xx other than 408/409/429, bad JSON mode, ...)
+    raise immediately; retryable ones raise after OPENAI_MAX_RETRIES.
+    """
+    import random
+    import openai
+
+    attempt = 0
+    while True:
+        try:
+            return client.chat.completions.create(**kwargs)
+        except (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.APIStatusError) as e:
+            status = getattr(e, "status_code", None)
+            retryable = (
+                isinstance(e, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError))
+                or status in (408, 409)
+                or (status is not None and status >= 500)
+            )
+            if not retryable or attempt >= OPENAI_MAX_RETRIES:
+                raise
+            backoff = min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * (2 ** attempt))
+            retry_after = _retry_after_seconds(e)
+            if retry_after is not None:
+                delay = min(OPENAI_BACKOFF_MAX, retry_after) + random.uniform(0, OPENAI_BACKOFF_BASE)
+            else:
+                delay = random.uniform(0, backoff)
+            attempt += 1
+            print(f"[openai_vision] {type(e).__name__} (status {status}), retry {attempt}/{OPENAI_MAX_RETRIES} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def _classify_openai_ordered(jobs, concurrency: int):
+    """
+    Run `_classify_action_openai(**kwargs)` for each (key, kwargs) in `jobs`
+    (any iterator — it's pulled lazily) on a pool of `concurrency` threads.
+    Yields (key, result) in job order; result is None where the call failed,
+    same as the sequential path. At most 2 × concurrency jobs are in flight
+    or finished-but-unyielded, which bounds the frames held for them.
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _result(fut):
+        try:
+            return fut.result()
+        except Exception as e:
+            print(f"[openai_vision] worker failed: {e}")
+            return None
+
+    window: deque = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="vision") as pool:
+        for key, kwargs in jobs:
+            window.append((key, pool.submit(_classify_action_openai, **kwargs)))
+            while len(window) > 2 * concurrency:
+                k, fut = window.popleft()
+                yield k, _result(fut)
+        while window:
+            k, fut = window.popleft()
+            yield k, _result(fut)
 
 
 _OPENAI_ACTIONS = ("Dunk", "Three Pointer", "Layup", "Steal", "Block", "Assist", "Rebound", "Pass", "Foul", "Other")
@@ -765,6 +1744,7 @@ def _classify_action_openai(
     start: float,
     end: float,
     target_jersey: Optional[str] = None,
+    frames: Optional[list] = None,
 ) -> Optional[Tuple[str, float, str, List[str], Optional[List[float]]]]:
     """
     GPT-4o vision classifier. Samples 5 frames evenly across the segment, composes
@@ -777,6 +1757,9 @@ def _classify_action_openai(
     success, or None on any error so the caller can fall back to YOLO+heuristic.
     `featuredBbox` is [cx, cy, w, h] in 0-1 units of the middle (3rd of 5) tile,
     or None if target_jersey wasn't provided or wasn't visible.
+
+    `frames` (BGR, already sampled via `_strip_frame_numbers`) skips the
+    video read when the caller has them from the frame server.
     """
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
@@ -790,27 +1773,20 @@ def _classify_action_openai(
     from PIL import Image
 
     try:
-        cap = cv2.VideoCapture(str(video_path))
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        sample_count = 5
-        ts = np.linspace(start, end, sample_count + 2)[1:-1]
-        frames: List[Image.Image] = []
-        for t in ts:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, int(t * fps))
-            ret, frame = cap.read()
-            if not ret:
-                continue
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(Image.fromarray(rgb))
-        cap.release()
-
-        if not frames:
+        if frames is None:
+            cap = cv2.VideoCapture(str(video_path))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frames = [f for _, f in _read_frames_at(cap, video_path, _strip_frame_numbers(fps, start, end))]
+            cap.release()
+        images: List[Image.Image] = [Image.fromarray(cv2.cvtColor(f, cv2.COLOR_BGR2RGB)) for f in frames]
+
+        if not images:
             return None
 
         # Compose 1x5 strip at a max tile width of 384px (keeps the upload small
         # while still resolving player/ball detail under detail:high).
         tile_w = 384
-        tiles = [f.resize((tile_w, int(f.height * tile_w / f.width))) for f in frames]
+        tiles = [f.resize((tile_w, int(f.height * tile_w / f.width))) for f in images]
         strip_h = max(t.height for t in tiles)
         strip = Image.new("RGB", (tile_w * len(tiles), strip_h), (0, 0, 0))
         for i, t in enumerate(tiles):
@@ -825,10 +1801,9 @@ def _classify_action_openai(
             f"player wearing #{target_jersey}). Otherwise featuredBbox is null."
         ) if target_jersey else " featuredBbox is always null."
 
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key, timeout=15.0)
-        completion = client.chat.completions.create(
-            model="gpt-4o-2024-08-06",
+        completion = _openai_create_with_backoff(
+            _get_openai_client(api_key, timeout=15.0),
+            model=OPENAI_VISION_MODEL,
             response_format={"type": "json_object"},
             max_tokens=200,
             messages=[
@@ -903,6 +1878,7 @@ def classify_action(
     motion: float,
     audio_peak: float,
     target_jersey: Optional[str] = None,
+    frames: Optional[list] = None,
 ) -> Tuple[str, float, Optional[str], List[str], Optional[List[float]]]:
     """
     Action classifier. Tries GPT-4o vision first when OPENAI_API_KEY is set;
@@ -921,90 +1897,669 @@ def classify_action(
 
     Returns: (action_name, confidence, descriptor)  — confidence in [0.55, 0.97]
     """
+    import cv2
+
+    # `frames` are the 5 strip samples (see _strip_frame_numbers); the GPT
+    # strip and the YOLO fallback use the same ones, so they're read once.
+    if frames is None:
+        try:
+            cap = cv2.VideoCapture(str(video_path))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frames = [f for _, f in _read_frames_at(cap, video_path, _strip_frame_numbers(fps, start, end))]
+            cap.release()
+        except Exception as e:
+            print(f"[classify_action] frame read error: {e}")
+            frames = []
+
     # Try GPT-4o vision first; fall through silently on failure or missing key.
-    openai_result = _classify_action_openai(video_path, start, end, target_jersey=target_jersey)
+    openai_result = _classify_action_openai(video_path, start, end, target_jersey=target_jersey, frames=frames)
     if openai_result is not None:
         return openai_result
 
-    import cv2
+    try:
+        # 5 frames evenly within the segment for a richer signal than a single
+        # mid-frame, detected in one batched YOLO pass
+        per_frame = _yolo_per_frame(frames, _detect_persons_and_ball_batch(frames))
+        return _classify_from_detections(per_frame, motion, audio_peak)
+    except Exception as e:
+        print(f"[classify_action] error: {e}")
+        return "Assist", 0.65, None, [], None
+
+
+def _classify_actions_yolo(items: List[Tuple[list, float, float]]) -> List[Tuple[str, float, Optional[str], List[str], Optional[List[float]]]]:
+    """
+    YOLO fallback for many scenes at once: `items` are (strip frames, motion,
+    audio_peak) per scene. All strips go through `_detect_persons_and_ball_batch`
+    together, so scenes share forward passes instead of 5-frame batches each.
+    """
+    detections = _detect_persons_and_ball_batch([f for frames, _, _ in items for f in frames])
+    results = []
+    k = 0
+    for frames, motion, audio_peak in items:
+        per_frame = _yolo_per_frame(frames, detections[k:k + len(frames)])
+        k += len(frames)
+        try:
+            results.append(_classify_from_detections(per_frame, motion, audio_peak))
+        except Exception as e:
+            print(f"[classify_action] error: {e}")
+            results.append(("Assist", 0.65, None, [], None))
+    return results
+
+
+def _yolo_per_frame(frames: list, detections: List[Tuple[list, list]]) -> List[dict]:
+    """Pair frames with their (persons, balls) in the shape `_classify_from_detections` reads."""
+    return [
+        {"persons": persons, "balls": balls, "frame_h": frame.shape[0], "frame_w": frame.shape[1]}
+        for frame, (persons, balls) in zip(frames, detections)
+    ]
+
+
+def _classify_from_detections(
+    per_frame: List[dict],
+    motion: float,
+    audio_peak: float,
+) -> Tuple[str, float, Optional[str], List[str], Optional[List[float]]]:
+    """
+    YOLO+heuristic half of `classify_action` (decision tree in its docstring):
+    per-frame detections for a scene's sampled frames plus its motion/audio
+    priors → (action, confidence, None, [], None).
+    """
     import numpy as np
 
+    if not per_frame:
+        return "Assist", 0.65, None, [], None
+
+    # Aggregate signals
+    person_counts = [len(f["persons"]) for f in per_frame]
+    ball_counts = [len(f["balls"]) for f in per_frame]
+    avg_persons = float(np.mean(person_counts)) if person_counts else 0.0
+    ball_seen = float(np.mean(ball_counts)) if ball_counts else 0.0
+
+    # Track vertical movement of the most-confident person across samples
+    top_person_y_norm: List[float] = []
+    top_person_x_norm: List[float] = []
+    for f in per_frame:
+        if not f["persons"]:
+            continue
+        top = max(f["persons"], key=lambda p: p["conf"])
+        top_person_y_norm.append(top["cy"] / max(1, f["frame_h"]))
+        top_person_x_norm.append(top["cx"] / max(1, f["frame_w"]))
+
+    vertical_range = (max(top_person_y_norm) - min(top_person_y_norm)) if len(top_person_y_norm) >= 2 else 0.0
+    lateral_range = (max(top_person_x_norm) - min(top_person_x_norm)) if len(top_person_x_norm) >= 2 else 0.0
+
+    # Person-near-ball clustering (proxy for handoffs / contests)
+    contested = 0
+    for f in per_frame:
+        if not f["balls"] or len(f["persons"]) < 2:
+            continue
+        bx, by, _ = max(f["balls"], key=lambda b: b[2])
+        close = [p for p in f["persons"] if abs(p["cx"] - bx) < f["frame_w"] * 0.12 and abs(p["cy"] - by) < f["frame_h"] * 0.18]
+        if len(close) >= 2:
+            contested += 1
+
+    # Decision tree — calibrated to PRD action mix and ESPN highlight cadence
+    if vertical_range > 0.18 and motion > 0.55 and audio_peak > 0.55:
+        return "Dunk", min(0.97, 0.78 + vertical_range * 0.6 + audio_peak * 0.1), None, [], None
+    if vertical_range > 0.10 and motion > 0.50 and audio_peak > 0.50 and avg_persons >= 1.2:
+        return "Block", min(0.92, 0.72 + vertical_range * 0.5 + motion * 0.15), None, [], None
+    if contested >= max(1, len(per_frame) // 2) and lateral_range > 0.10:
+        return "Steal", min(0.90, 0.70 + lateral_range * 0.6 + audio_peak * 0.1), None, [], None
+    if ball_seen > 0.4 and lateral_range > 0.12 and 0.35 < motion < 0.75:
+        return "Three Pointer", min(0.93, 0.74 + lateral_range * 0.5 + audio_peak * 0.1), None, [], None
+    if avg_persons >= 2.0 and ball_seen > 0.3 and motion >= 0.30:
+        return "Assist", min(0.88, 0.70 + min(0.12, contested * 0.04) + motion * 0.1), None, [], None
+
+    # Fallback grading by raw motion/audio
+    score = 0.45 * motion + 0.35 * audio_peak + 0.20 * (avg_persons / 5.0)
+    if score > 0.75:
+        return "Dunk", min(0.92, 0.70 + score * 0.2), None, [], None
+    if score > 0.60:
+        return "Three Pointer", min(0.86, 0.70 + score * 0.15), None, [], None
+    if score > 0.45:
+        return "Steal", min(0.82, 0.66 + score * 0.15), None, [], None
+    return "Assist", max(0.60, min(0.78, 0.60 + score * 0.2)), None, [], None
+
+
+# ----- Analysis executor -----
+# The CPU-heavy /highlights work (the motion curve and the YOLO fallback) runs
+# as self-contained tasks on a pluggable backend (`HIGHLIGHT_EXECUTOR`):
+#   inline   in the request's process, one task after another (default)
+#   process  a local ProcessPoolExecutor (forkserver workers)
+#   modal    `analyze_chunk.map(...)` across worker containers
+# Motion tasks are bucket ranges and YOLO tasks fixed-size scene chunks; each
+# depends only on its own inputs, so every backend returns the same results.
+# Audio (one decode + range max) and GPT-4o (I/O-bound, own concurrency) stay
+# in the request's process.
+
+ANALYSIS_SHARD_SECONDS = 120.0     # minimum timeline per motion shard
+ANALYSIS_YOLO_CHUNK_SCENES = 8     # scenes per YOLO task (40 frames)
+
+
+def _analysis_executor(kind: Optional[str] = None, workers: Optional[int] = None) -> dict:
+    """Backend + parallelism from `HIGHLIGHT_EXECUTOR` / `HIGHLIGHT_EXECUTOR_WORKERS`."""
+    kind = (kind or os.environ.get("HIGHLIGHT_EXECUTOR") or "inline").lower()
+    if kind not in ("inline", "process", "modal"):
+        print(f"[executor] unknown backend {kind!r}, using inline")
+        kind = "inline"
+    if workers is None:
+        try:
+            workers = int(os.environ.get("HIGHLIGHT_EXECUTOR_WORKERS") or 0)
+        except ValueError:
+            workers = 0
+    if kind == "inline":
+        workers = 1
+    elif workers <= 0:
+        workers = _container_cpus() if kind == "process" else 8
+    return {"kind": kind, "workers": workers}
+
+
+def _shard_ranges(total: int, workers: int, min_len: int) -> List[Tuple[int, int]]:
+    """[0, total) as contiguous ranges: up to two per worker, none shorter than `min_len`."""
+    shards = max(1, min(2 * workers if workers > 1 else 1, total // max(1, min_len)))
+    bounds = [round(total * i / shards) for i in range(shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(shards) if bounds[i + 1] > bounds[i]]
+
+
+def _analysis_mp_context():
+    """
+    Start method for every local process pool in this module (the process
+    backend, sharded scene detection). Pools are created mid-request,
+    while the vision thread pool, the frame-server thread and torch's OpenMP
+    pool are running, so the workers must not be forked from this process: a
+    lock some other thread holds at fork time stays held in the child forever.
+    Workers come from a forkserver instead, a clean single-threaded process
+    started on first use that has imported this module once; tasks are plain
+    dicts, so nothing else needs to cross over.
+    """
+    import multiprocessing
+
     try:
-        cap = cv2.VideoCapture(str(video_path))
-        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 720
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1280
-
-        # Sample 5 frames evenly within the segment for a richer signal than a single mid-frame
-        sample_count = 5
-        ts = np.linspace(start, end, sample_count + 2)[1:-1]
-        per_frame: List[dict] = []
-        for t in ts:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, int(t * fps))
-            ret, frame = cap.read()
-            if not ret:
-                continue
-            persons, balls = _detect_persons_and_ball(frame)
-            per_frame.append({"persons": persons, "balls": balls, "frame_h": frame.shape[0], "frame_w": frame.shape[1]})
-        cap.release()
+        ctx = multiprocessing.get_context("forkserver")
+    except ValueError:
+        return multiprocessing.get_context("spawn")
+    ctx.set_forkserver_preload([__name__])
+    return ctx
 
-        if not per_frame:
-            return "Assist", 0.65, None, [], None
 
-        # Aggregate signals
-        person_counts = [len(f["persons"]) for f in per_frame]
-        ball_counts = [len(f["balls"]) for f in per_frame]
-        avg_persons = float(np.mean(person_counts)) if person_counts else 0.0
-        ball_seen = float(np.mean(ball_counts)) if ball_counts else 0.0
+def _init_analysis_worker() -> None:
+    """Pool workers run single-threaded: parallelism comes from the pool."""
+    import sys
+    import cv2
+    cv2.setNumThreads(1)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(1)
+
+
+def _map_analysis_tasks(executor: dict, tasks: List[dict]) -> list:
+    """Run `tasks` on the executor's backend; results in task order."""
+    if not tasks:
+        return []
+    kind = executor["kind"]
+    if kind == "modal":
+        if all(t["video"].get("url") for t in tasks):
+            try:
+                return list(analyze_chunk.map(tasks))
+            except Exception as e:
+                print(f"[executor] modal fan-out failed, running locally: {e}")
+        else:
+            print("[executor] modal backend needs a video URL, running locally")
+        kind = "process"
+    if kind == "process" and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
 
-        # Track vertical movement of the most-confident person across samples
-        top_person_y_norm: List[float] = []
-        top_person_x_norm: List[float] = []
-        for f in per_frame:
-            if not f["persons"]:
-                continue
-            top = max(f["persons"], key=lambda p: p["conf"])
-            top_person_y_norm.append(top["cy"] / max(1, f["frame_h"]))
-            top_person_x_norm.append(top["cx"] / max(1, f["frame_w"]))
+        # Workers don't share this process's keyframe registry; each ref
+        # carries its index along.
+        for t in tasks:
+            if not t["video"].get("keyframes") and t["video"].get("path"):
+                t["video"] = {**t["video"], "keyframes": _keyframe_indexes.get(t["video"]["path"])}
+        with ProcessPoolExecutor(
+            max_workers=min(executor["workers"], len(tasks)), mp_context=_analysis_mp_context(),
+            initializer=_init_analysis_worker,
+        ) as pool:
+            return list(pool.map(_run_analysis_task, tasks))
+    return [_run_analysis_task(t) for t in tasks]
 
-        vertical_range = (max(top_person_y_norm) - min(top_person_y_norm)) if len(top_person_y_norm) >= 2 else 0.0
-        lateral_range = (max(top_person_x_norm) - min(top_person_x_norm)) if len(top_person_x_norm) >= 2 else 0.0
 
-        # Person-near-ball clustering (proxy for handoffs / contests)
-        contested = 0
-        for f in per_frame:
-            if not f["balls"] or len(f["persons"]) < 2:
-                continue
-            bx, by, _ = max(f["balls"], key=lambda b: b[2])
-            close = [p for p in f["persons"] if abs(p["cx"] - bx) < f["frame_w"] * 0.12 and abs(p["cy"] - by) < f["frame_h"] * 0.18]
-            if len(close) >= 2:
-                contested += 1
-
-        # Decision tree — calibrated to PRD action mix and ESPN highlight cadence
-        if vertical_range > 0.18 and motion > 0.55 and audio_peak > 0.55:
-            return "Dunk", min(0.97, 0.78 + vertical_range * 0.6 + audio_peak * 0.1), None, [], None
-        if vertical_range > 0.10 and motion > 0.50 and audio_peak > 0.50 and avg_persons >= 1.2:
-            return "Block", min(0.92, 0.72 + vertical_range * 0.5 + motion * 0.15), None, [], None
-        if contested >= max(1, len(per_frame) // 2) and lateral_range > 0.10:
-            return "Steal", min(0.90, 0.70 + lateral_range * 0.6 + audio_peak * 0.1), None, [], None
-        if ball_seen > 0.4 and lateral_range > 0.12 and 0.35 < motion < 0.75:
-            return "Three Pointer", min(0.93, 0.74 + lateral_range * 0.5 + audio_peak * 0.1), None, [], None
-        if avg_persons >= 2.0 and ball_seen > 0.3 and motion >= 0.30:
-            return "Assist", min(0.88, 0.70 + min(0.12, contested * 0.04) + motion * 0.1), None, [], None
-
-        # Fallback grading by raw motion/audio
-        score = 0.45 * motion + 0.35 * audio_peak + 0.20 * (avg_persons / 5.0)
-        if score > 0.75:
-            return "Dunk", min(0.92, 0.70 + score * 0.2), None, [], None
-        if score > 0.60:
-            return "Three Pointer", min(0.86, 0.70 + score * 0.15), None, [], None
-        if score > 0.45:
-            return "Steal", min(0.82, 0.66 + score * 0.15), None, [], None
-        return "Assist", max(0.60, min(0.78, 0.60 + score * 0.2)), None, [], None
+# Video a fan-out container last downloaded, reused while tasks keep naming it.
+_task_video: dict = {}
+
+
+def _task_video_path(ref: dict) -> pathlib.Path:
+    """
+    Local file for a task's video: `path` when it exists here (inline and
+    process backends), otherwise `url` downloaded once per container, with
+    the keyframe index from the ref registered for it.
+    """
+    path = ref.get("path")
+    if path and os.path.exists(path):
+        if ref.get("keyframes") and path not in _keyframe_indexes:
+            _register_keyframe_index(pathlib.Path(path), {"keyframes": ref["keyframes"]})
+        return pathlib.Path(path)
+    url = ref["url"]
+    if _task_video.get("url") != url:
+        if _task_video.get("path"):
+            pathlib.Path(_task_video["path"]).unlink(missing_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        urllib.request.urlretrieve(url, tmp)
+        _task_video.update(url=url, path=tmp)
+        if ref.get("keyframes"):
+            _register_keyframe_index(pathlib.Path(tmp), {"keyframes": ref["keyframes"]})
+    return pathlib.Path(_task_video["path"])
+
+
+def _yolo_chunk(video_path: pathlib.Path, scenes: List[list], frames: Optional[list] = None) -> list:
+    """YOLO fallback for [start, end, motion, audio] scenes; decodes their strips unless given."""
+    if frames is None:
+        fps = _video_fps(video_path)
+        plans = [_strip_frame_numbers(fps, start, end) for start, end, _, _ in scenes]
+        frames = [[] for _ in scenes]
+        for i, bundle in _serve_frames(video_path, plans):
+            frames[i] = [bundle[n] for n in plans[i] if n in bundle]
+    return _classify_actions_yolo([(strip, motion, audio) for strip, (_, _, motion, audio) in zip(frames, scenes)])
+
+
+def _run_analysis_task(task: dict):
+    """One executor task → its result. Top-level so pools and Modal can run it."""
+    video_path = _task_video_path(task["video"])
+    if task["task"] == "motion":
+        return _motion_curve_values(video_path, task["hz"], task["fps"], task["first"], task["last"])
+    if task["task"] == "yolo":
+        return _yolo_chunk(video_path, task["scenes"], task.get("frames"))
+    raise ValueError(f"unknown analysis task {task['task']!r}")
+
+
+@app.function(image=image, secrets=secrets, timeout=900, memory=2048, cpu=2.0)
+def analyze_chunk(task: dict):
+    """Fan-out worker for HIGHLIGHT_EXECUTOR=modal."""
+    return _run_analysis_task(task)
+
+
+# ----- Classification cache -----
+# GPT-4o vision answers per scene, so re-running /highlights on the same
+# asset (reloads, retries, a different targetJersey) doesn't pay for vision
+# again. Key = sha256 of the analysed video file + scene window + vision
+# model + prompt version (+ target jersey, see below). Two tiers:
+#   local  CLASSIFY_CACHE_DIR/<key>.json, one file per entry, LRU by mtime,
+#          evicted down to CLASSIFY_CACHE_MAX_MB
+#   bucket cache/classify/<videoSha256>.json, every entry for that video in
+#          one object, read once and written once per request
+# Only successful vision answers are cached; YOLO fallbacks are not, so a
+# transient OpenAI failure is retried on the next run.
+
+CLASSIFY_CACHE_VERSION = 1
+
+
+def _classify_cache_enabled() -> bool:
+    """`CLASSIFY_CACHE=0` disables both tiers."""
+    return os.environ.get("CLASSIFY_CACHE", "1") != "0"
+
+
+def _classify_cache_dir() -> pathlib.Path:
+    return pathlib.Path(os.environ.get("CLASSIFY_CACHE_DIR", "/tmp/hhs-classify-cache"))
+
+
+def _classify_cache_max_bytes() -> int:
+    try:
+        return max(1, int(os.environ.get("CLASSIFY_CACHE_MAX_MB", "256"))) * 1024 * 1024
+    except ValueError:
+        return 256 * 1024 * 1024
+
 
+def _file_sha256(path: pathlib.Path, chunk: int = 1024 * 1024) -> str:
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _classify_cache_key(video_sha256: str, start: float, end: float, target_jersey: Optional[str] = None) -> str:
+    import hashlib
+    import json
+    material = json.dumps([
+        CLASSIFY_CACHE_VERSION, video_sha256, round(float(start), 3), round(float(end), 3),
+        OPENAI_VISION_MODEL, OPENAI_VISION_PROMPT_VERSION, target_jersey or "",
+    ])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _classify_cache_remote_key(video_sha256: str) -> str:
+    return f"cache/classify/{video_sha256}.json"
+
+
+def _classify_cache_open(s3, bucket: str, video_sha256: str) -> dict:
+    """Per-request cache handle: the bucket tier's entries for this video, loaded once."""
+    remote: dict = {}
+    if s3 is not None:
+        doc = _read_json_object(s3, bucket, _classify_cache_remote_key(video_sha256))
+        if doc and doc.get("version") == CLASSIFY_CACHE_VERSION and isinstance(doc.get("entries"), dict):
+            remote = doc["entries"]
+    return {"videoSha256": video_sha256, "remote": remote, "new": {}, "hits": 0, "misses": 0}
+
+
+def _classify_cache_read(cache: dict, key: str) -> Optional[dict]:
+    path = _classify_cache_dir() / f"{key}.json"
+    try:
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)  # LRU: eviction drops the least recently read first
+        return entry
+    except Exception:
+        pass
+    entry = cache["remote"].get(key)
+    if isinstance(entry, dict):
+        _classify_cache_write_local(key, entry)
+        return entry
+    return None
+
+
+def _classify_cache_write_local(key: str, entry: dict) -> None:
+    import json
+    try:
+        d = _classify_cache_dir()
+        d.mkdir(parents=True, exist_ok=True)
+        tmp = d / f".{key}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, d / f"{key}.json")
     except Exception as e:
-        print(f"[classify_action] error: {e}")
-        return "Assist", 0.65, None
+        print(f"[classify_cache] local write failed: {e}")
+
+
+def _classify_cache_get(cache: Optional[dict], start: float, end: float, target_jersey: Optional[str] = None):
+    """
+    Cached (action, confidence, descriptor, jerseyNumbers, featuredBbox) or
+    None. With a target jersey, an exact entry for that jersey wins; failing
+    that, the jersey-agnostic entry is reused (featuredBbox None) as long as
+    the jersey wasn't among the numbers GPT-4o saw in the scene — otherwise
+    the bbox is needed and the scene goes back to the model.
+    """
+    if cache is None:
+        return None
+    entry = None
+    if target_jersey:
+        entry = _classify_cache_read(cache, _classify_cache_key(cache["videoSha256"], start, end, target_jersey))
+    if entry is None:
+        base = _classify_cache_read(cache, _classify_cache_key(cache["videoSha256"], start, end))
+        if base is not None and not (target_jersey and target_jersey in (base.get("jerseyNumbers") or [])):
+            entry = dict(base, featuredBbox=None)
+    if entry is None:
+        cache["misses"] += 1
+        return None
+    cache["hits"] += 1
+    return (
+        entry["action"], float(entry["confidence"]), entry.get("descriptor"),
+        list(entry.get("jerseyNumbers") or []), entry.get("featuredBbox"),
+    )
+
+
+def _classify_cache_put(cache: Optional[dict], start: float, end: float, target_jersey: Optional[str], result: tuple) -> None:
+    """Store a vision answer under the jersey-agnostic key (and the jersey key when set)."""
+    if cache is None:
+        return
+    action, confidence, descriptor, jerseys, featured_bbox = result
+    entry = {
+        "action": action, "confidence": confidence, "descriptor": descriptor,
+        "jerseyNumbers": list(jerseys or []), "featuredBbox": None,
+        "model": OPENAI_VISION_MODEL, "promptVersion": OPENAI_VISION_PROMPT_VERSION,
+        "createdAt": int(time.time()),
+    }
+    keys = [(_classify_cache_key(cache["videoSha256"], start, end), entry)]
+    if target_jersey:
+        keys.append((_classify_cache_key(cache["videoSha256"], start, end, target_jersey), dict(entry, featuredBbox=featured_bbox)))
+    for key, e in keys:
+        _classify_cache_write_local(key, e)
+        cache["new"][key] = e
+
+
+def _classify_cache_evict(max_bytes: Optional[int] = None) -> None:
+    """Drop least-recently-used local entries until the directory fits in `max_bytes`."""
+    max_bytes = max_bytes or _classify_cache_max_bytes()
+    try:
+        files = [(p.stat().st_mtime, p.stat().st_size, p) for p in _classify_cache_dir().glob("*.json")]
+    except Exception:
+        return
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def _classify_cache_close(s3, bucket: str, cache: Optional[dict]) -> None:
+    """Merge this request's new entries into the bucket object, then evict locally."""
+    if cache is None:
+        return
+    if cache["new"] and s3 is not None:
+        try:
+            key = _classify_cache_remote_key(cache["videoSha256"])
+            # Re-read so a concurrent run's entries for the same video survive.
+            doc = _read_json_object(s3, bucket, key) or {}
+            entries = doc.get("entries") if doc.get("version") == CLASSIFY_CACHE_VERSION else None
+            entries = dict(entries or {})
+            entries.update(cache["new"])
+            _put_json_object(s3, bucket, key, {"version": CLASSIFY_CACHE_VERSION, "entries": entries})
+        except Exception as e:
+            print(f"[classify_cache] bucket write failed: {e}")
+    _classify_cache_evict()
+
+
+# ----- Detection store -----
+# Per-asset person/ball detections, normalised to 0-1 and keyed by timestamp,
+# persisted as `detections/<assetId>.npz`: flat arrays of times, per-time
+# offsets into boxes [x, y, w, h] (balls: centre, w = h = 0), COCO classes
+# and confidences. /highlights fills it for the segments it returns (in a
+# background `index_detections` call, at render's sampling rate); render's
+# subject tracking reads it and only runs YOLO for samples it doesn't cover,
+# adding those back so the next render of the asset gets them too. Writers
+# merge into whatever the bucket holds at write time, and while the prefill
+# runs a `detections/<assetId>.pending.json` marker tells render to wait for
+# it rather than detect the same samples itself.
+
+DETECTION_STORE_VERSION = 1
+SUBJECT_TRACK_FPS = 3.0  # render's per-segment subject-tracking rate
+DETECTION_PREFILL_WAIT_SECONDS = 30.0
+DETECTION_PREFILL_STALE_SECONDS = 900.0  # index_detections' timeout
+
+
+def _detection_store_enabled() -> bool:
+    return os.environ.get("DETECTION_STORE", "1") != "0"
+
+
+def _detection_store_key(asset_id: str) -> str:
+    return f"detections/{asset_id}.npz"
+
+
+def _detection_prefill_key(asset_id: str) -> str:
+    return f"detections/{asset_id}.pending.json"
+
+
+def _wait_for_detection_prefill(s3, bucket: str, asset_id: str) -> float:
+    """
+    Block while a prefill for the asset is running (its marker exists and
+    isn't stale), up to `DETECTION_STORE_WAIT_SECONDS`. Returns seconds
+    waited; after a timeout render detects the missing samples itself.
+    """
+    try:
+        limit = float(os.environ.get("DETECTION_STORE_WAIT_SECONDS") or DETECTION_PREFILL_WAIT_SECONDS)
+    except ValueError:
+        limit = DETECTION_PREFILL_WAIT_SECONDS
+    t0 = time.perf_counter()
+    while True:
+        marker = _read_json_object(s3, bucket, _detection_prefill_key(asset_id))
+        if not marker or time.time() - float(marker.get("startedAt") or 0) > DETECTION_PREFILL_STALE_SECONDS:
+            break
+        if time.perf_counter() - t0 >= limit:
+            print(f"[detections] asset={asset_id} prefill still running after {limit:.0f}s, not waiting")
+            break
+        time.sleep(1.0)
+    return time.perf_counter() - t0
+
+
+def _normalize_detections(persons: list, balls: list, w: int, h: int) -> Tuple[list, list]:
+    """Pixel (persons, ball_centers) → the same shapes in 0-1 frame coordinates."""
+    w, h = max(1, w), max(1, h)
+    return (
+        [
+            {
+                "x": p["x"] / w, "y": p["y"] / h, "w": p["w"] / w, "h": p["h"] / h,
+                "cx": p["cx"] / w, "cy": p["cy"] / h, "conf": p["conf"],
+            }
+            for p in persons
+        ],
+        [(bx / w, by / h, conf) for bx, by, conf in balls],
+    )
+
+
+def _load_detection_store(s3, bucket: str, asset_id: str) -> dict:
+    """{t_seconds: (persons, ball_centers)} for the asset, normalised; {} if there's none."""
+    import io
+    import numpy as np
+    try:
+        body = s3.get_object(Bucket=bucket, Key=_detection_store_key(asset_id))["Body"].read()
+        data = np.load(io.BytesIO(body), allow_pickle=False)
+        if int(data["version"]) != DETECTION_STORE_VERSION:
+            return {}
+    except Exception:
+        return {}
+    store: dict = {}
+    offsets, boxes, classes, confs = data["offsets"], data["boxes"], data["classes"], data["conf"]
+    for i, t in enumerate(data["t"].tolist()):
+        persons: list = []
+        balls: list = []
+        for k in range(int(offsets[i]), int(offsets[i + 1])):
+            x, y, w, h = (float(v) for v in boxes[k])
+            if int(classes[k]) == 0:
+                persons.append({"x": x, "y": y, "w": w, "h": h, "cx": x + w / 2.0, "cy": y + h / 2.0, "conf": float(confs[k])})
+            else:
+                balls.append((x, y, float(confs[k])))
+        store[t] = (persons, balls)
+    return store
+
+
+def _save_detection_store(s3, bucket: str, asset_id: str, store: dict) -> None:
+    """Merge `store` into the asset's bucket object and write it back."""
+    import io
+    import numpy as np
+    # Re-read so samples another writer (prefill or a concurrent render)
+    # stored since our load survive.
+    store = {**_load_detection_store(s3, bucket, asset_id), **store}
+    times = sorted(store)
+    offsets = [0]
+    boxes: list = []
+    classes: list = []
+    confs: list = []
+    for t in times:
+        persons, balls = store[t]
+        for p in persons:
+            boxes.append((p["x"], p["y"], p["w"], p["h"]))
+            classes.append(0)
+            confs.append(p["conf"])
+        for bx, by, conf in balls:
+            boxes.append((bx, by, 0.0, 0.0))
+            classes.append(32)
+            confs.append(conf)
+        offsets.append(len(boxes))
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf, version=np.int32(DETECTION_STORE_VERSION),
+        t=np.asarray(times, dtype=np.float64), offsets=np.asarray(offsets, dtype=np.int32),
+        boxes=np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        classes=np.asarray(classes, dtype=np.uint8), conf=np.asarray(confs, dtype=np.float32),
+    )
+    s3.put_object(
+        Bucket=bucket, Key=_detection_store_key(asset_id), Body=buf.getvalue(),
+        ContentType="application/octet-stream",
+    )
+
+
+def _prefill_detection_store(video_path: pathlib.Path, s3, bucket: str, asset_id: str, windows: List[list]) -> int:
+    """Detect every subject-tracking sample of the [start, end] `windows` the store lacks; returns how many were added."""
+    store = _load_detection_store(s3, bucket, asset_id)
+    before = len(store)
+    for start, end in windows:
+        compute_subject_track(video_path, float(start), float(end), sample_fps=SUBJECT_TRACK_FPS, store=store)
+    added = len(store) - before
+    if added:
+        _save_detection_store(s3, bucket, asset_id, store)
+    return added
+
+
+@app.function(image=image, secrets=secrets, timeout=900, memory=2048, cpu=2.0)
+def index_detections(asset_id: str, video: dict, windows: List[list]) -> int:
+    """Background store fill for /highlights' returned segments (see `_prefill_detection_store`)."""
+    s3, bucket = _storage_client()
+    t0 = time.perf_counter()
+    try:
+        added = _prefill_detection_store(_task_video_path(video), s3, bucket, asset_id, windows)
+    finally:
+        try:
+            s3.delete_object(Bucket=bucket, Key=_detection_prefill_key(asset_id))
+        except Exception as e:
+            print(f"[detections] asset={asset_id} pending marker not cleared: {e}")
+    print(f"[detections] asset={asset_id} stored {added} samples for {len(windows)} segments in {time.perf_counter() - t0:.2f}s")
+    return added
+
+
+def _detection_store_get(store: dict, times: List[float], t: float, tolerance: float) -> Optional[Tuple[list, list]]:
+    """Stored detections nearest `t` (`times` = sorted(store)), if within `tolerance` seconds."""
+    import bisect
+    if not times:
+        return None
+    j = bisect.bisect_left(times, t)
+    near = min(times[max(0, j - 1):j + 1], key=lambda s: abs(s - t))
+    return store[near] if abs(near - t) <= tolerance else None
+
+
+def _subject_focus(
+    persons: list, balls: list, anchor: Optional[Tuple[float, float]],
+) -> Tuple[Optional[Tuple[float, float]], Optional[dict]]:
+    """
+    Where subject tracking looks in one frame, from its normalised detections:
+    ((cx, cy), person) where `person` is the player the focus moves with.
+    Player-locked (`anchor` set): the person nearest the anchor. Otherwise
+    ball 60% / top person 40%, the ball alone, or the top person. (None, None)
+    when there's nothing to look at.
+    """
+    if anchor is not None:
+        if not persons:
+            return None, None
+        p = min(persons, key=lambda pp: (pp["cx"] - anchor[0]) ** 2 + (pp["cy"] - anchor[1]) ** 2)
+        return (p["cx"], p["cy"]), p
+    top = max(persons, key=lambda pp: pp["conf"]) if persons else None
+    if balls:
+        bx, by, _ = max(balls, key=lambda b: b[2])
+        if top is not None:
+            return (0.6 * bx + 0.4 * top["cx"], 0.6 * by + 0.4 * top["cy"]), top
+        return (bx, by), None
+    if top is not None:
+        return (top["cx"], top["cy"]), top
+    return None, None
+
+
+def _seed_anchor(seed_bbox: Optional[List[float]]) -> Optional[Tuple[float, float]]:
+    """Player-locked anchor from a [cx, cy, w, h] seed, or None."""
+    if seed_bbox and len(seed_bbox) >= 2:
+        try:
+            return float(seed_bbox[0]), float(seed_bbox[1])
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def _subject_track_times(start: float, end: float, sample_fps: float) -> List[float]:
+    """Sample times of a subject track: evenly over [start, end], both ends included."""
+    duration = max(0.1, end - start)
+    n_samples = max(2, int(duration * sample_fps))
+    return [start + (i / max(1, n_samples - 1)) * duration for i in range(n_samples)]
 
 
 def compute_subject_track(
@@ -1013,6 +2568,7 @@ def compute_subject_track(
     end: float,
     sample_fps: float = 4.0,
     seed_bbox: Optional[List[float]] = None,
+    store: Optional[dict] = None,
 ) -> List[Tuple[float, float, float]]:
     """
     Sample person/ball positions across a segment to drive auto-reframe.
@@ -1027,6 +2583,10 @@ def compute_subject_track(
         center is closest to the running anchor; update the anchor to that
         person's center for the next frame. If no persons detected, hold
         the last anchor (no jumping back to ball/center).
+
+    With a detection `store` (see `_load_detection_store`), samples with a
+    stored detection within half a sample interval skip decode and YOLO;
+    the rest are detected here and added to `store`.
     """
     import cv2
     import numpy as np
@@ -1035,67 +2595,44 @@ def compute_subject_track(
     try:
         cap = cv2.VideoCapture(str(video_path))
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
-        duration = max(0.1, end - start)
-        n_samples = max(2, int(duration * sample_fps))
 
-        # Initialize the running anchor (player-locked mode only)
-        anchor_x: Optional[float] = None
-        anchor_y: Optional[float] = None
-        if seed_bbox and len(seed_bbox) >= 2:
-            try:
-                anchor_x = float(seed_bbox[0])
-                anchor_y = float(seed_bbox[1])
-            except (TypeError, ValueError):
-                anchor_x = anchor_y = None
-
-        for i in range(n_samples):
-            t = start + (i / max(1, n_samples - 1)) * duration
-            cap.set(cv2.CAP_PROP_POS_FRAMES, int(t * fps))
-            ret, frame = cap.read()
-            if not ret:
+        # Running anchor (player-locked mode only)
+        anchor = _seed_anchor(seed_bbox)
+
+        sample_ts = _subject_track_times(start, end, sample_fps)
+        frame_nos = [int(t * fps) for t in sample_ts]
+        # Normalised (persons, balls) per sample; None until found.
+        found: List[Optional[Tuple[list, list]]] = [None] * len(sample_ts)
+        if store:
+            times = sorted(store)
+            found = [_detection_store_get(store, times, n / fps, 0.5 / sample_fps) for n in frame_nos]
+        missing = [i for i, f in enumerate(found) if f is None]
+        if missing:
+            # Read every missing sample first so YOLO sees them in batches, not one by one
+            frames = list(_read_frames_at(cap, video_path, [frame_nos[i] for i in missing]))
+            detections = _detect_persons_and_ball_batch([frame for _, frame in frames])
+            for (k, frame), (persons, balls) in zip(frames, detections):
+                i = missing[k]
+                found[i] = _normalize_detections(persons, balls, frame.shape[1], frame.shape[0])
+                if store is not None:
+                    store[round(frame_nos[i] / fps, 4)] = found[i]
+        cap.release()
+        if store is not None:
+            print(f"[subject_track] {len(sample_ts) - len(missing)}/{len(sample_ts)} samples from the detection store")
+        # Samples whose frame didn't decode are skipped, as before.
+        for t, f in zip(sample_ts, found):
+            if f is None:
                 continue
-            h, w = frame.shape[:2]
-            persons, balls = _detect_persons_and_ball(frame)
-
-            cx_norm = 0.5
-            cy_norm = 0.5
-
-            if anchor_x is not None and anchor_y is not None:
-                # Player-locked: pick the person whose normalized center is
-                # closest to the running anchor. Update anchor for next frame.
-                if persons:
-                    def _dist(pp):
-                        ncx = pp["cx"] / max(1, w)
-                        ncy = pp["cy"] / max(1, h)
-                        return (ncx - anchor_x) ** 2 + (ncy - anchor_y) ** 2
-                    p = min(persons, key=_dist)
-                    cx_norm = p["cx"] / max(1, w)
-                    cy_norm = p["cy"] / max(1, h)
-                    # Update running anchor
-                    anchor_x = cx_norm
-                    anchor_y = cy_norm
-                else:
-                    # No detection — hold last anchor
-                    cx_norm = anchor_x
-                    cy_norm = anchor_y
-            elif balls:
-                bx, by, _ = max(balls, key=lambda b: b[2])
-                if persons:
-                    p = max(persons, key=lambda pp: pp["conf"])
-                    cx_norm = (0.6 * (bx / max(1, w))) + (0.4 * (p["cx"] / max(1, w)))
-                    cy_norm = (0.6 * (by / max(1, h))) + (0.4 * (p["cy"] / max(1, h)))
-                else:
-                    cx_norm = bx / max(1, w)
-                    cy_norm = by / max(1, h)
-            elif persons:
-                p = max(persons, key=lambda pp: pp["conf"])
-                cx_norm = p["cx"] / max(1, w)
-                cy_norm = p["cy"] / max(1, h)
+            focus, _ = _subject_focus(*f, anchor)
+            if focus is None:
+                # No detection — player-locked holds its last anchor, otherwise frame centre
+                focus = anchor or (0.5, 0.5)
+            elif anchor is not None:
+                anchor = focus
+            cx_norm, cy_norm = focus
 
             track.append((t - start, float(np.clip(cx_norm, 0.0, 1.0)), float(np.clip(cy_norm, 0.0, 1.0))))
 
-        cap.release()
-
         # Apply 1D exponential smoothing on x to avoid jitter in the reframe
         if len(track) >= 2:
             alpha = 0.45
@@ -1115,6 +2652,242 @@ def compute_subject_track(
     return track
 
 
+def _render_segment_parallelism(segments: int) -> Tuple[int, int]:
+    """
+    (workers, ffmpeg threads each) for render's segment preparation:
+    `RENDER_SEGMENT_WORKERS` (default: the container's cores) capped at the
+    segment count, and the cores split evenly between them.
+    """
+    cpus = _container_cpus()
+    try:
+        workers = int(os.environ.get("RENDER_SEGMENT_WORKERS") or cpus)
+    except ValueError:
+        workers = cpus
+    workers = max(1, min(workers, segments))
+    return workers, max(1, cpus // workers)
+
+
+# ----- Dense subject tracking -----
+# Per-frame subject paths for the reframe crops. YOLO runs only on sparse
+# keyframes (every TRACK_KEYFRAME_SECONDS, on the detection store's sampling
+# grid, so stored detections count); between them the focus moves with the
+# followed player, carried by pyramidal Lucas-Kanade point tracking on the
+# 320x180 motion grayscale. When too few points pass the forward-backward
+# check the tracker is lost and that frame is re-detected. At each detection
+# the drift between the tracked and detected focus is spread linearly back
+# over the interval, so the path doesn't jump.
+
+TRACK_FPS = 15.0              # frames per second the tracker steps through
+TRACK_KEYFRAME_SECONDS = 1.0  # YOLO keyframe spacing
+TRACK_MAX_POINTS = 40         # feature points seeded in the followed player's box
+TRACK_MIN_POINTS = 4          # surviving points below which the tracker is lost
+TRACK_FB_ERROR = 1.0          # forward-backward error (px at 320x180) a point may have
+TRACK_SMOOTH_SECONDS = 0.4    # centred moving-average window on the finished path
+TRACK_PATH_HZ = 5.0           # crop-expression keypoints per second of reel
+TRACK_PATH_MAX_KEYS = 600     # keypoint cap; longer reels get sparser keypoints
+SPEED_RAMP_FACTOR = 0.4       # render's slow-motion rate around an impact
+
+
+def _track_seed_points(gray, person: dict):
+    """Good features inside `person`'s box (normalised) on a `_motion_gray` frame; None if too few."""
+    import cv2
+    import numpy as np
+
+    h, w = gray.shape[:2]
+    x0, y0 = max(0, int(person["x"] * w)), max(0, int(person["y"] * h))
+    x1, y1 = min(w, int(np.ceil((person["x"] + person["w"]) * w))), min(h, int(np.ceil((person["y"] + person["h"]) * h)))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    mask = np.zeros_like(gray)
+    mask[y0:y1, x0:x1] = 255
+    pts = cv2.goodFeaturesToTrack(gray, maxCorners=TRACK_MAX_POINTS, qualityLevel=0.01, minDistance=2, mask=mask)
+    return pts if pts is not None and len(pts) >= TRACK_MIN_POINTS else None
+
+
+def _track_points(prev_gray, gray, pts):
+    """
+    Lucas-Kanade step for `pts` with a forward-backward check. Returns
+    (surviving points, median (dx, dy) in pixels), or (None, None) once fewer
+    than TRACK_MIN_POINTS survive.
+    """
+    import cv2
+    import numpy as np
+
+    lk = dict(winSize=(15, 15), maxLevel=2, criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+    nxt, st, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, pts, None, **lk)
+    back, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, nxt, None, **lk)
+    fb = np.linalg.norm((pts - back).reshape(-1, 2), axis=1)
+    good = (st.reshape(-1) == 1) & (st_back.reshape(-1) == 1) & (fb < TRACK_FB_ERROR)
+    if int(good.sum()) < TRACK_MIN_POINTS:
+        return None, None
+    shift = np.median((nxt - pts).reshape(-1, 2)[good], axis=0)
+    return nxt[good].reshape(-1, 1, 2), (float(shift[0]), float(shift[1]))
+
+
+def compute_dense_subject_track(
+    video_path: pathlib.Path,
+    start: float,
+    end: float,
+    seed_bbox: Optional[List[float]] = None,
+    store: Optional[dict] = None,
+) -> Tuple[List[Tuple[float, float, float]], dict]:
+    """
+    Dense version of `compute_subject_track`: (t_seconds_from_start, cx_norm,
+    cy_norm) for every TRACK_FPS frame of [start, end], with the same focus
+    rules (`_subject_focus`), plus stats {frames, keyframes, fromStore,
+    detected, redetected}. Keyframes come from the detection `store` when it
+    has them; keyframes YOLO had to run on are added to it.
+    """
+    import cv2
+    import numpy as np
+
+    stats = {"frames": 0, "keyframes": 0, "fromStore": 0, "detected": 0, "redetected": 0}
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, int(round(fps / TRACK_FPS)))
+    first = int(start * fps)
+    frame_nos = list(range(first, max(first + 1, int(end * fps)), step))
+    # Keyframes: every Nth sample of the store's grid, snapped to a tracked frame.
+    grid = _subject_track_times(start, end, SUBJECT_TRACK_FPS)
+    every = max(1, int(round(SUBJECT_TRACK_FPS * TRACK_KEYFRAME_SECONDS)))
+    key_idx = {
+        min(len(frame_nos) - 1, max(0, int(round((int(t * fps) - first) / step))))
+        for t in grid[::every] + grid[-1:]
+    }
+    times = sorted(store) if store else []
+    tolerance = 0.5 / SUBJECT_TRACK_FPS
+
+    anchor = _seed_anchor(seed_bbox)
+    focus: Optional[Tuple[float, float]] = None
+    pts = None
+    prev_gray = None
+    ts: List[float] = []
+    path: List[List[float]] = []
+    # (path index, tracked focus just before the detection reset it)
+    corrections: List[Tuple[int, Optional[Tuple[float, float]]]] = []
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+        for k, frame in _read_frames_at(cap, video_path, frame_nos, sequential=True):
+            gray = _motion_gray(frame)
+            gh, gw = gray.shape[:2]
+            lost = False
+            if pts is not None and prev_gray is not None:
+                pts, shift = _track_points(prev_gray, gray, pts)
+                if pts is None:
+                    lost = True
+                elif focus is not None:
+                    focus = (focus[0] + shift[0] / gw, focus[1] + shift[1] / gh)
+            if k in key_idx or lost:
+                f = None
+                if k in key_idx:
+                    stats["keyframes"] += 1
+                    f = _detection_store_get(store, times, frame_nos[k] / fps, tolerance) if store else None
+                    if f is not None:
+                        stats["fromStore"] += 1
+                if f is None:
+                    persons, balls = _detect_persons_and_ball_batch([frame], batch_size=1)[0]
+                    f = _normalize_detections(persons, balls, frame.shape[1], frame.shape[0])
+                    stats["redetected" if k not in key_idx else "detected"] += 1
+                    if store is not None and k in key_idx:
+                        store[round(frame_nos[k] / fps, 4)] = f
+                # Player-locked picks the person nearest where the tracked player is now.
+                locked = (focus or anchor) if anchor is not None else None
+                detected, person = _subject_focus(*f, locked)
+                if detected is not None:
+                    corrections.append((len(path), focus))
+                    focus = detected
+                    if anchor is not None:
+                        anchor = detected
+                pts = _track_seed_points(gray, person) if person is not None else None
+            if focus is None:
+                focus = anchor or (0.5, 0.5)
+            ts.append(frame_nos[k] / fps - start)
+            path.append([focus[0], focus[1]])
+            prev_gray = gray
+    except Exception as e:
+        print(f"[subject_track] dense tracking error: {e}")
+    finally:
+        cap.release()
+
+    if not path:
+        return [(0.0, 0.5, 0.5)], stats
+    xy = np.asarray(path, dtype=np.float64)
+    # Spread each detection's correction linearly back to the previous one.
+    prev_idx = 0
+    for idx, tracked in corrections:
+        if tracked is not None and idx > prev_idx:
+            delta = xy[idx] - np.asarray(tracked)
+            ramp = (np.arange(prev_idx, idx) - prev_idx) / (idx - prev_idx)
+            xy[prev_idx:idx] += ramp[:, None] * delta[None, :]
+        prev_idx = idx
+    win = max(1, int(round(TRACK_SMOOTH_SECONDS * TRACK_FPS)) | 1)
+    if len(xy) > win:
+        pad = win // 2
+        padded = np.pad(xy, ((pad, pad), (0, 0)), mode="edge")
+        kernel = np.ones(win) / win
+        xy = np.stack([np.convolve(padded[:, c], kernel, mode="valid") for c in range(2)], axis=1)
+    xy = np.clip(xy, 0.0, 1.0)
+    stats["frames"] = len(ts)
+    return [(t, float(x), float(y)) for t, (x, y) in zip(ts, xy)], stats
+
+
+def _reel_crop_points(
+    seg_tracks: List[Tuple[List[Tuple[float, float]], Optional[float], Optional[float]]],
+    seg_durations: List[float],
+    tdur: float,
+) -> List[Tuple[float, float]]:
+    """
+    Per-segment (source-relative t, x) paths → (reel t, x) on the assembled
+    reel: segments follow each other overlapped by the `tdur` xfade (the
+    incoming one owns the second half of it), and a segment's speed-ramp
+    window [ramp_lo, ramp_hi) plays at SPEED_RAMP_FACTOR.
+    """
+    points: List[Tuple[float, float]] = []
+    cursor = 0.0
+    last = len(seg_tracks) - 1
+    for i, (track, ramp_lo, ramp_hi) in enumerate(seg_tracks):
+        lo = cursor + (tdur / 2 if i > 0 else 0.0)
+        hi = cursor + seg_durations[i] - (tdur / 2 if i < last else 0.0)
+        for r, x in track:
+            if ramp_lo is not None and ramp_hi is not None and r >= ramp_lo:
+                if r < ramp_hi:
+                    r = ramp_lo + (r - ramp_lo) / SPEED_RAMP_FACTOR
+                else:
+                    r += (ramp_hi - ramp_lo) * (1 / SPEED_RAMP_FACTOR - 1)
+            if lo <= cursor + r <= hi:
+                points.append((cursor + r, x))
+        cursor += seg_durations[i] - tdur
+    return points
+
+
+def _crop_path_expr(
+    points: List[Tuple[float, float]], hz: float = TRACK_PATH_HZ, max_keys: int = TRACK_PATH_MAX_KEYS,
+) -> str:
+    """
+    Piecewise-linear ffmpeg expression in `t` through (t, value) `points`
+    thinned to `hz` keypoints per second, and to at most `max_keys` overall
+    (about 80 bytes each), held flat before the first and after the last.
+    Commas are escaped for use inside a filter argument.
+    """
+    spacing = 1.0 / hz
+    if len(points) > 1:
+        spacing = max(spacing, (points[-1][0] - points[0][0]) / max(1, max_keys - 2))
+    keys: List[Tuple[float, float]] = []
+    for t, v in points:
+        if not keys or t - keys[-1][0] >= spacing:
+            keys.append((t, v))
+    if points and keys[-1] != points[-1]:
+        keys.append(points[-1])
+    if not keys:
+        return "0.5"
+    terms = [f"lt(t\\,{keys[0][0]:.3f})*{keys[0][1]:.4f}"]
+    for (t0, v0), (t1, v1) in zip(keys, keys[1:]):
+        slope = (v1 - v0) / max(1e-6, t1 - t0)
+        terms.append(f"gte(t\\,{t0:.3f})*lt(t\\,{t1:.3f})*({v0:.4f}+{slope:.4f}*(t-{t0:.3f}))")
+    terms.append(f"gte(t\\,{keys[-1][0]:.3f})*{keys[-1][1]:.4f}")
+    return "(" + "+".join(terms) + ")"
+
+
 def detect_downbeats(audio_path: pathlib.Path, beat_times: List[float], bpm: float) -> List[float]:
     """
     Identify downbeats (strong beats) from a beat grid by RMS-energy weighting at each beat.
@@ -1154,6 +2927,54 @@ def detect_downbeats(audio_path: pathlib.Path, beat_times: List[float], bpm: flo
         return beat_times[::4] if beat_times else []
 
 
+# Segments /highlights returns (PRD Section 6.2), and the classifier
+# confidence a scene needs to be one of them.
+HIGHLIGHT_MAX_SEGMENTS = 12
+HIGHLIGHT_MIN_CONFIDENCE = 0.65
+# Normalised audio peak below which a scene counts as silent (peak RMS ~0.01):
+# dead-ball stretches, replays with the sound cut.
+CASCADE_SILENCE_PEAK = 0.05
+# Scenes longer than this are usually wide continuous coverage, not a play.
+CASCADE_LONG_SCENE = 12.0
+
+
+def _cascade_candidates(requested: Optional[int] = None) -> int:
+    """
+    How many uncached scenes the cascade sends to the classifier. Default
+    HIGHLIGHT_CASCADE_CANDIDATES=36: three per returned segment, the margin
+    for scenes whose action score lifts them past ones that ranked higher on
+    audio/motion alone. 0 = no cascade.
+    """
+    if requested is None:
+        try:
+            requested = int(os.environ.get("HIGHLIGHT_CASCADE_CANDIDATES", "36"))
+        except ValueError:
+            requested = 36
+    return max(0, int(requested))
+
+
+def _cheap_scene_score(det: dict) -> float:
+    """
+    Ranking prior from signals that cost no vision call. The audio and motion
+    terms are exactly the non-action part of the PRD score; silent scenes and
+    scenes much longer than a play are pushed down the order.
+    """
+    score = det['_audio'] * 0.2 + det['_motion'] * 0.2
+    if det['_audio'] < CASCADE_SILENCE_PEAK:
+        score -= 0.1
+    if det['clipDuration'] > CASCADE_LONG_SCENE:
+        score -= 0.05 * min(3.0, (det['clipDuration'] - CASCADE_LONG_SCENE) / 6.0)
+    return score
+
+
+def _cascade_select(detections: list, indices: List[int], limit: int) -> set:
+    """The `limit` best of `indices` by cheap score (all of them when limit is 0)."""
+    if limit <= 0 or len(indices) <= limit:
+        return set(indices)
+    ranked = sorted(indices, key=lambda i: (-_cheap_scene_score(detections[i]), detections[i]['start']))
+    return set(ranked[:limit])
+
+
 def score_highlights(detections: list, video_path: pathlib.Path, min_confidence: float = 0.7):
     """
     Score detected highlights using the PRD algorithm.
@@ -1222,114 +3043,1136 @@ def score_highlights(detections: list, video_path: pathlib.Path, min_confidence:
     scored.sort(key=lambda x: x['score'], reverse=True)
 
     # Return top 12 segments per PRD (Section 6.2)
-    return scored[:12]
+    return scored[:HIGHLIGHT_MAX_SEGMENTS]
 
 
-web = FastAPI(title="Hoops Hype Studio — GPU Worker")
+# ----- Storage helpers -----
 
+# Multipart tuning for artifact uploads. 16 MiB parts keep a multi-GB proxy
+# under ~200 parts and let 8 threads per file keep the link to R2 full; the
+# small sidecars (json, jpg, peaks) stay single-part under the threshold.
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
 
-@web.post("/ingest", response_model=IngestResponse)
-async def ingest(req: IngestRequest, authorization: Optional[str] = Header(None)):
-    _require_auth(authorization)
+# Artifacts uploaded side by side. boto3 clients are thread-safe, so one
+# client is shared across the pool.
+UPLOAD_MAX_PARALLEL = 4
+
+
+def _storage_client() -> Tuple[Optional[object], str]:
+    """
+    (s3 client, bucket) from the storage secret, or (None, bucket) when the
+    worker has no bucket credentials. Endpoints that can't work without
+    storage turn None into a 500; for the rest it's an optional accelerator.
+    """
     bucket = os.environ.get("STORAGE_BUCKET", "")
-    region = os.environ.get("STORAGE_REGION", "us-east-1")
     access = os.environ.get("STORAGE_ACCESS_KEY", "")
     secret = os.environ.get("STORAGE_SECRET_KEY", "")
-    endpoint = os.environ.get("STORAGE_ENDPOINT")
-
+    if not (bucket and access and secret):
+        return None, bucket
     session = boto3.session.Session()
     s3 = session.client(
         "s3",
-        region_name=region,
+        region_name=os.environ.get("STORAGE_REGION", "us-east-1"),
         aws_access_key_id=access,
         aws_secret_access_key=secret,
-        endpoint_url=endpoint,
+        endpoint_url=os.environ.get("STORAGE_ENDPOINT"),
         config=BotoConfig(s3={"addressing_style": "path"}),
     )
+    return s3, bucket
 
-    with tempfile.TemporaryDirectory() as td:
-        tmpdir = pathlib.Path(td)
-        src_path = tmpdir / "source.mp4"
-        proxy_path = tmpdir / "proxy.mp4"
-        # Download source
-        urllib.request.urlretrieve(req.sourceUrl, src_path)
-        # Transcode to 720p60 proxy
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(src_path),
-            "-vf",
-            "scale=-2:720,fps=60",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",
-            "-b:v",
-            "6000k",
-            "-pix_fmt",
-            "yuv420p",
-            "-c:a",
-            "aac",
-            "-b:a",
-            "192k",
-            str(proxy_path),
-        ]
-        subprocess.run(cmd, check=True)
 
-        # Optional waveform JSON via librosa
-        waveform_url = None
-        try:
-            import librosa  # type: ignore
-            import json as _json
-            wav_path = tmpdir / "audio.wav"
-            subprocess.run(["ffmpeg", "-y", "-i", str(src_path), "-vn", "-ac", "1", "-ar", "22050", str(wav_path)], check=True)
-            y, sr = librosa.load(str(wav_path), sr=None)
-            # downsample envelope into 128 bins
-            bins = 128
-            step = max(1, len(y) // bins)
-            env = [float(max(0.0, min(1.0, (abs(y[i:i+step]).mean() * 4)))) for i in range(0, len(y), step)][:bins]
-            wf_path = tmpdir / "waveform.json"
-            with open(wf_path, 'w', encoding='utf-8') as f:
-                f.write(_json.dumps({"sampleRate": sr, "bins": env }))
-            wkey = f"waveforms/{req.assetId}.json"
-            s3.upload_file(str(wf_path), bucket, wkey, ExtraArgs={"ContentType": "application/json"})
-            waveform_url = s3.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": wkey}, ExpiresIn=3600)
-        except Exception:
-            waveform_url = None
+def _upload_artifact(s3, bucket: str, path: pathlib.Path, key: str, extra_args: dict) -> float:
+    """Upload one file with the tuned multipart config. Returns wall seconds."""
+    t0 = time.perf_counter()
+    s3.upload_file(str(path), bucket, key, ExtraArgs=extra_args, Config=UPLOAD_TRANSFER_CONFIG)
+    return time.perf_counter() - t0
+
 
-        # Optional poster at 1s
-        poster_path = tmpdir / "poster.jpg"
+def _upload_artifacts(s3, bucket: str, uploads: List[dict]) -> dict:
+    """
+    Upload several artifacts concurrently. Each entry is
+    `{"name", "path", "key", "extra"}`; returns `{name: {"seconds": float}}`
+    on success or `{name: {"error": Exception}}` so the caller decides which
+    failures are fatal (the proxy) and which are best-effort (sidecars).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    results: dict = {}
+    if not uploads:
+        return results
+    with ThreadPoolExecutor(max_workers=min(UPLOAD_MAX_PARALLEL, len(uploads))) as pool:
+        futures = {
+            u["name"]: pool.submit(_upload_artifact, s3, bucket, u["path"], u["key"], u.get("extra") or {})
+            for u in uploads
+        }
+        for name, fut in futures.items():
+            try:
+                results[name] = {"seconds": round(fut.result(), 3)}
+            except Exception as e:
+                print(f"[upload] {name} failed: {type(e).__name__}: {e}")
+                results[name] = {"error": e}
+    return results
+
+
+# ----- Ingest helpers -----
+
+# Poster frame timestamp. Sources shorter than this take their midpoint
+# instead so the poster branch of the single-pass graph always gets a frame
+# (an empty image2 output fails the whole ffmpeg run, proxy included).
+POSTER_AT_SECONDS = 1.0
+# Mono PCM rate for the waveform stream — matches the old librosa path.
+WAVEFORM_SAMPLE_RATE = 22050
+
+# Scene sidecar (`scenes/{assetId}.json`) written from the ingest decode.
+# Bump SCENE_SIDECAR_VERSION whenever the detector or sidecar layout changes:
+# /highlights treats any other version as stale and re-detects.
+SCENE_SIDECAR_VERSION = 1
+# scdet scores are 0-100. Everything above the floor is kept in the sidecar
+# so the cut threshold can be retuned without re-ingesting; cuts use
+# SCENE_CUT_THRESHOLD (scdet's own default) and, like ContentDetector's
+# min_scene_len, suppress a cut closer than SCENE_MIN_CUT_GAP to the last one.
+SCENE_SCORE_FLOOR = 5.0
+SCENE_CUT_THRESHOLD = 10.0
+SCENE_MIN_CUT_GAP = 0.25
+
+PROXY_VIDEO_ARGS = [
+    "-c:v", "libx264", "-preset", "veryfast", "-b:v", "6000k", "-pix_fmt", "yuv420p",
+]
+PROXY_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "192k"]
+
+# Analysis proxy (`analysis/{assetId}.mp4`): the low tier of the proxy
+# ladder. Every /highlights and /audio-analysis analyzer downsizes anyway
+# (320x180 flow, 384px GPT tiles, YOLO's 640 letterbox, 22.05kHz mono audio),
+# so they read this ANALYSIS_HEIGHT p / ANALYSIS_FPS rendition instead of the
+# 720p60 edit proxy. It is encoded for random access — a keyframe every
+# ANALYSIS_GOP frames, no B-frames, CABAC/deblock off via `-tune fastdecode` —
+# so a seek decodes at most ANALYSIS_GOP - 1 frames instead of up to a full
+# default libx264 GOP. Audio is the mono rate the analyzers resample to.
+ANALYSIS_HEIGHT = 360
+ANALYSIS_FPS = 30
+ANALYSIS_GOP = 15
+ANALYSIS_VIDEO_ARGS = [
+    "-c:v", "libx264", "-preset", "veryfast", "-tune", "fastdecode",
+    "-g", str(ANALYSIS_GOP), "-keyint_min", str(ANALYSIS_GOP), "-sc_threshold", "0", "-bf", "0",
+    "-crf", "23", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+]
+ANALYSIS_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "96k", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE)]
+# Keyframe index sidecar (`analysis/{assetId}.keyframes.json`) layout version.
+# v1 indexed a 720p60 video-only analysis proxy; readers skip it.
+KEYFRAME_INDEX_VERSION = 2
+
+# Streamed ingest: bytes pulled up front to inspect the container layout, and
+# the chunk size used to pump the download into ffmpeg's stdin.
+SOURCE_HEAD_BYTES = 256 * 1024
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+def _ingest_analysis_proxy_enabled() -> bool:
+    """`INGEST_ANALYSIS_PROXY=0` skips the analysis rendition + keyframe index outputs."""
+    return os.environ.get("INGEST_ANALYSIS_PROXY", "1") != "0"
+
+
+def _ingest_streaming_enabled() -> bool:
+    """`INGEST_STREAMING=0` forces the download-then-transcode path."""
+    return os.environ.get("INGEST_STREAMING", "1") != "0"
+
+
+def _fetch_source_head(url: str, nbytes: int = SOURCE_HEAD_BYTES) -> Tuple[Optional[bytes], dict]:
+    """
+    Ranged GET of the first `nbytes` of the source. Presigned GETs don't sign
+    the Range header, so this works against R2/S3 URLs. Servers that ignore
+    Range get their body truncated after `nbytes`.
+
+    Returns (head_bytes, meta) where meta carries the object's `etag` and
+    total `size` when the server reported them (used as the dedupe alias).
+    head_bytes is None on error.
+    """
+    meta: dict = {}
+    try:
+        req = urllib.request.Request(url, headers={"Range": f"bytes=0-{nbytes - 1}"})
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            etag = (resp.headers.get("ETag") or "").strip().strip('"')
+            if etag:
+                meta["etag"] = etag
+            content_range = resp.headers.get("Content-Range") or ""
+            if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                meta["size"] = int(content_range.rsplit("/", 1)[1])
+            elif resp.status == 200 and (resp.headers.get("Content-Length") or "").isdigit():
+                meta["size"] = int(resp.headers["Content-Length"])
+            return resp.read(nbytes), meta
+    except Exception as e:
+        print(f"[ingest] source head fetch failed: {e}")
+        return None, meta
+
+
+def _source_is_streamable(head: bytes) -> bool:
+    """
+    Decide from the first bytes whether ffmpeg can transcode the source from
+    a non-seekable pipe.
+
+      - ISO-BMFF (mp4/mov): walk the top-level boxes. `moov` before `mdat`
+        (faststart) streams; `mdat` first means the index sits at the tail and
+        the demuxer must seek, so the source has to be spilled to disk.
+      - Matroska/WebM (EBML magic) and MPEG-TS (0x47 sync every 188 bytes)
+        are written to be read front to back.
+      - Anything else (AVI with a trailing idx1, unknown) spills — the safe side.
+    """
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return True
+    if len(head) > 376 and head[0] == 0x47 and head[188] == 0x47 and head[376] == 0x47:
+        return True
+    off = 0
+    while off + 8 <= len(head):
+        size = int.from_bytes(head[off:off + 4], "big")
+        box = head[off + 4:off + 8]
+        if not box.isalnum():
+            return False
+        if box == b"moov":
+            return True
+        if box == b"mdat":
+            return False
+        if size == 1:
+            if off + 16 > len(head):
+                return False
+            size = int.from_bytes(head[off + 8:off + 16], "big")
+        if size < 8:
+            # size 0 = "box runs to EOF" (only legal for a trailing mdat).
+            return False
+        off += size
+    # Ran out of head bytes before seeing moov or mdat — don't gamble.
+    return False
+
+
+def _pump_url_to_pipe(url: str, pipe, stats: dict, hasher=None) -> None:
+    """
+    Copy the HTTP body of `url` into `pipe` chunk by chunk, then close the
+    pipe so ffmpeg sees EOF. Runs on its own thread while ffmpeg encodes, so
+    the network and the encoder are busy at the same time. Records bytes,
+    seconds, whether EOF was reached (`complete`) and any download error into
+    `stats`; a BrokenPipe just means ffmpeg exited first, and its exit code
+    carries the real story. When `hasher` is given every chunk is fed to it,
+    so the content hash costs no second read of the source.
+    """
+    t0 = time.perf_counter()
+    n = 0
+    stats["complete"] = False
+    try:
+        with urllib.request.urlopen(url, timeout=60) as resp:
+            while True:
+                chunk = resp.read(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    stats["complete"] = True
+                    break
+                if hasher is not None:
+                    hasher.update(chunk)
+                pipe.write(chunk)
+                n += len(chunk)
+    except BrokenPipeError:
+        pass
+    except Exception as e:
+        stats["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        stats["bytes"] = n
+        stats["seconds"] = time.perf_counter() - t0
         try:
-            subprocess.run([
-                "ffmpeg", "-y", "-ss", "1.0", "-i", str(src_path), "-frames:v", "1", "-q:v", "2", str(poster_path)
-            ], check=True)
+            pipe.close()
         except Exception:
             pass
 
-        key = f"proxy/{req.assetId}.mp4"
-        s3.upload_file(str(proxy_path), bucket, key, ExtraArgs={"ContentType": "video/mp4"})
-        proxy_url = s3.generate_presigned_url(
-            ClientMethod="get_object",
-            Params={"Bucket": bucket, "Key": key},
-            ExpiresIn=3600,
+
+def _download_to_file(url: str, dest: pathlib.Path, hasher=None) -> float:
+    """Chunked download of `url` to `dest`, feeding `hasher` on the way. Returns seconds."""
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=60) as resp, open(dest, "wb") as f:
+        while True:
+            chunk = resp.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            if hasher is not None:
+                hasher.update(chunk)
+            f.write(chunk)
+    return time.perf_counter() - t0
+
+
+def _run_ffmpeg_from_url_stream(cmd: List[str], url: str, log_path: pathlib.Path, hasher=None) -> dict:
+    """
+    Run an ffmpeg command that reads `-i pipe:0` while `url` is pumped into
+    its stdin. stderr goes to `log_path` rather than a PIPE so a chatty
+    ffmpeg can't fill the pipe buffer and deadlock against the stdin writer.
+    Raises CalledProcessError on a non-zero exit OR a download error (a
+    truncated input can still exit 0 with a truncated proxy).
+    """
+    stats: dict = {}
+    with open(log_path, "wb") as log_f:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=log_f)
+        pump = threading.Thread(target=_pump_url_to_pipe, args=(url, proc.stdin, stats, hasher), daemon=True)
+        pump.start()
+        rc = proc.wait()
+        pump.join()
+    if rc != 0 or stats.get("error"):
+        stderr = log_path.read_bytes() if log_path.exists() else b""
+        if stats.get("error"):
+            stderr += f"\nsource download failed: {stats['error']}".encode()
+        raise subprocess.CalledProcessError(rc or 1, cmd, stderr=stderr)
+    return stats
+
+
+def _probe_duration(src: str) -> float:
+    """ffprobe container duration in seconds. Returns 0.0 when unknown."""
+    try:
+        return float(subprocess.check_output(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                src,
+            ],
+            text=True, timeout=30,
+        ).strip())
+    except Exception:
+        return 0.0
+
+
+def _single_pass_ingest(
+    src: str,
+    tmpdir: pathlib.Path,
+    has_audio: bool,
+    duration: float,
+    stream_url: Optional[str] = None,
+    stream_stats: Optional[dict] = None,
+    stream_hasher=None,
+    analysis: bool = False,
+) -> dict:
+    """
+    Decode the source ONCE and fan it out to every ingest artifact:
+      - proxy.mp4     720p60 libx264 edit proxy (+ AAC when the source has audio)
+      - analysis.mp4  360p30 short-GOP fast-decode rendition + mono audio for the
+        analyzers (when `analysis`), plus keyframes.json, its keyframe index
+      - poster.jpg    one frame at POSTER_AT_SECONDS (midpoint for short clips)
+      - waveform.pcm  raw mono s16le @ WAVEFORM_SAMPLE_RATE for the waveform builder
+      - scenes.json   scdet cut candidates for /highlights (best-effort sidecar)
+
+    The legacy ingest ran three ffmpeg processes (transcode, `-vn` audio
+    extract, poster seek), each re-opening and re-demuxing the source — on a
+    20-40 minute game that is most of the ingest wall time. Returns a dict of
+    artifact name → path for the outputs that were written. Raises
+    CalledProcessError so the caller can fall back to `_multi_pass_ingest`.
+
+    With `stream_url` set, `src` must be "pipe:0" and the URL is pumped into
+    ffmpeg's stdin while it encodes; pump stats land in `stream_stats` and
+    the bytes are fed to `stream_hasher` on the way through.
+    """
+    proxy_path = tmpdir / "proxy.mp4"
+    analysis_path = tmpdir / "analysis.mp4"
+    poster_path = tmpdir / "poster.jpg"
+    pcm_path = tmpdir / "waveform.pcm"
+    scd_log = tmpdir / "scdet.txt"
+    poster_t = POSTER_AT_SECONDS if duration <= 0 or duration > POSTER_AT_SECONDS else duration / 2
+
+    # The analysis rendition is scaled down from the edit proxy's frames (not
+    # the source) so both share one crop/aspect and the 720p scale is reused.
+    proxy_chain = (
+        "[v_proxy_in]scale=-2:720,fps=60,split=2[v_proxy][v_analysis_in];"
+        f"[v_analysis_in]scale=-2:{ANALYSIS_HEIGHT},fps={ANALYSIS_FPS}[v_analysis];"
+        if analysis else
+        "[v_proxy_in]scale=-2:720,fps=60[v_proxy];"
+    )
+    graph = (
+        "[0:v]split=3[v_proxy_in][v_poster_in][v_scene_in];"
+        + proxy_chain +
+        f"[v_poster_in]trim=start={poster_t:.3f},setpts=PTS-STARTPTS[v_poster];"
+        # Scene-change scores ride along on a downscaled branch. Every frame's
+        # score is logged and the floor is applied when parsing: selecting
+        # frames in-graph would leave the null output empty on cut-free
+        # sources, which fails the whole multi-output run.
+        "[v_scene_in]scale=320:-2,scdet,"
+        f"metadata=mode=print:key=lavfi.scd.score:file={scd_log}[v_scene]"
+    )
+    cmd = [
+        "ffmpeg", "-y", "-i", src,
+        "-filter_complex", graph,
+        # Output 0: edit proxy
+        "-map", "[v_proxy]", "-map", "0:a?",
+        *PROXY_VIDEO_ARGS, *PROXY_AUDIO_ARGS,
+        str(proxy_path),
+        # Output 1: poster
+        "-map", "[v_poster]", "-frames:v", "1", "-q:v", "2",
+        str(poster_path),
+        # Output 2: scene scores (frames discarded, metadata file is the product)
+        "-map", "[v_scene]", "-f", "null", "-",
+    ]
+    if analysis:
+        cmd += [
+            "-map", "[v_analysis]", "-map", "0:a:0?",
+            *ANALYSIS_VIDEO_ARGS, *ANALYSIS_AUDIO_ARGS,
+            str(analysis_path),
+        ]
+    if has_audio:
+        # Waveform PCM. Only mapped when the source really has audio —
+        # an output with zero streams is a hard ffmpeg error.
+        cmd += [
+            "-map", "0:a:0", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE),
+            "-c:a", "pcm_s16le", "-f", "s16le",
+            str(pcm_path),
+        ]
+    if stream_url:
+        stats = _run_ffmpeg_from_url_stream(cmd, stream_url, tmpdir / "ingest_ffmpeg.log", hasher=stream_hasher)
+        if stream_stats is not None:
+            stream_stats.update(stats)
+    else:
+        subprocess.run(cmd, check=True, capture_output=True)
+
+    artifacts = {"proxy": proxy_path}
+    if poster_path.exists():
+        artifacts["poster"] = poster_path
+    if has_audio and pcm_path.exists():
+        artifacts["pcm"] = pcm_path
+    if analysis and analysis_path.exists():
+        artifacts["analysis"] = analysis_path
+        try:
+            import json
+            keyframes_path = tmpdir / "keyframes.json"
+            with open(keyframes_path, "w", encoding="utf-8") as f:
+                json.dump(_build_keyframe_index(analysis_path, fps=float(ANALYSIS_FPS), duration=duration), f)
+            artifacts["keyframes"] = keyframes_path
+        except Exception as e:
+            print(f"[ingest] keyframe index skipped: {e}")
+    try:
+        scenes_path = tmpdir / "scenes.json"
+        _write_scene_sidecar(_parse_scdet_log(scd_log), duration or _probe_duration(str(proxy_path)), scenes_path)
+        artifacts["scenes"] = scenes_path
+    except Exception as e:
+        print(f"[ingest] scene sidecar skipped: {e}")
+    return artifacts
+
+
+def _build_keyframe_index(video_path: pathlib.Path, fps: float, duration: float = 0.0) -> dict:
+    """
+    Keyframe index for an analysis proxy: the frame numbers a decoder can
+    start from without reference to earlier frames. Read from the packet
+    flags with ffprobe (demux only, no decode); if that fails, assume the
+    fixed ANALYSIS_GOP grid the encoder was told to produce.
+    """
+    keyframes: List[int] = []
+    frame_count = 0
+    source = "ffprobe"
+    try:
+        out = subprocess.check_output(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "v:0",
+                "-show_entries", "packet=pts_time,flags",
+                "-of", "csv=p=0",
+                str(video_path),
+            ],
+            text=True, timeout=120,
+        )
+        for line in out.splitlines():
+            parts = line.strip().split(",")
+            if len(parts) < 2:
+                continue
+            try:
+                t = float(parts[0])
+            except ValueError:
+                continue
+            frame_count += 1
+            if "K" in parts[1]:
+                keyframes.append(int(round(t * fps)))
+        keyframes.sort()
+    except Exception as e:
+        print(f"[keyframes] ffprobe failed, assuming GOP grid: {e}")
+        keyframes = []
+    if not keyframes:
+        source = "gop"
+        frame_count = int(round((duration or _probe_duration(str(video_path))) * fps))
+        keyframes = list(range(0, max(1, frame_count), ANALYSIS_GOP))
+    return {
+        "version": KEYFRAME_INDEX_VERSION,
+        "fps": fps,
+        "height": ANALYSIS_HEIGHT,
+        "gop": ANALYSIS_GOP,
+        "frameCount": frame_count,
+        "keyframes": keyframes,
+        "source": source,
+    }
+
+
+def _fetch_analysis_proxy(s3, bucket: str, asset_id: str, tmpdir: pathlib.Path) -> Optional[pathlib.Path]:
+    """
+    Download the analysis rendition and register its keyframe index for
+    `_read_frames_at`. Returns the local path, or None when the asset was
+    ingested without one (callers then analyse the edit proxy as before).
+    Analyzer outputs are seconds and 0-1 normalised coordinates, so they are
+    the same in edit-proxy and source space whichever file was read.
+    """
+    keys = _ingest_artifact_keys(asset_id)
+    index = _read_json_object(s3, bucket, keys["keyframes"])
+    if index is None or index.get("version") != KEYFRAME_INDEX_VERSION:
+        return None
+    dest = tmpdir / "analysis.mp4"
+    try:
+        s3.download_file(bucket, keys["analysis"], str(dest), Config=UPLOAD_TRANSFER_CONFIG)
+    except Exception as e:
+        print(f"[analysis] proxy download failed: {e}")
+        return None
+    _register_keyframe_index(dest, index)
+    return dest
+
+
+def _parse_scdet_log(log_path: pathlib.Path) -> List[List[float]]:
+    """
+    Parse a `metadata=mode=print` log from the scdet branch into
+    [[pts_time, score], ...] for frames scoring at least SCENE_SCORE_FLOOR.
+    Each logged frame is a `frame:N pts:P pts_time:T` line followed by its
+    `lavfi.scd.score=` line.
+    """
+    candidates: List[List[float]] = []
+    if not log_path.exists():
+        return candidates
+    t: Optional[float] = None
+    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("frame:"):
+                t = None
+                for tok in line.split():
+                    if tok.startswith("pts_time:"):
+                        try:
+                            t = float(tok.split(":", 1)[1])
+                        except ValueError:
+                            t = None
+            elif line.startswith("lavfi.scd.score=") and t is not None:
+                try:
+                    score = float(line.split("=", 1)[1])
+                except ValueError:
+                    continue
+                if score >= SCENE_SCORE_FLOOR:
+                    candidates.append([round(t, 4), round(score, 3)])
+    return candidates
+
+
+def _write_scene_sidecar(candidates: List[List[float]], duration: float, out_path: pathlib.Path) -> None:
+    import json
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SCENE_SIDECAR_VERSION,
+            "detector": "scdet",
+            "floor": SCENE_SCORE_FLOOR,
+            "duration": duration,
+            "candidates": candidates,
+        }, f)
+
+
+def _scenes_from_sidecar(sidecar: dict, min_duration: float = 1.2, threshold: float = SCENE_CUT_THRESHOLD) -> Optional[list]:
+    """
+    Turn a scene sidecar into the same scene dicts `detect_scenes` returns.
+    Returns None when the sidecar is stale (version mismatch) or unusable, so
+    the caller re-runs the decode-based detector. Mirrors PySceneDetect's
+    `detect()`: no cuts at all → no scenes.
+    """
+    if not isinstance(sidecar, dict) or sidecar.get("version") != SCENE_SIDECAR_VERSION:
+        return None
+    try:
+        duration = float(sidecar.get("duration") or 0.0)
+        candidates = sorted((float(t), float(sc)) for t, sc in sidecar.get("candidates") or [])
+    except (TypeError, ValueError):
+        return None
+    if duration <= 0:
+        return None
+
+    return _scenes_from_cuts(candidates, duration, min_duration, threshold)
+
+
+def _scenes_from_cuts(candidates, duration: float, min_duration: float, threshold: float) -> list:
+    """[[t, score]] cut candidates → scene dicts; no cuts at all → no scenes."""
+    cuts: List[float] = []
+    for t, score in sorted(candidates):
+        if score < threshold or t <= 0 or t >= duration:
+            continue
+        if cuts and t - cuts[-1] < SCENE_MIN_CUT_GAP:
+            continue
+        cuts.append(t)
+    if not cuts:
+        return []
+
+    bounds = [0.0] + cuts + [duration]
+    scenes = []
+    for i in range(len(bounds) - 1):
+        start_time, end_time = bounds[i], bounds[i + 1]
+        if end_time - start_time >= min_duration:
+            scenes.append({
+                'id': f'scene-{i}',
+                'start': start_time,
+                'end': end_time,
+                'duration': end_time - start_time,
+            })
+    return scenes
+
+
+def _load_scene_sidecar(s3, bucket: str, asset_id: str, min_duration: float = 1.2) -> Optional[list]:
+    """Fetch `scenes/{assetId}.json` and convert it; None if missing or stale."""
+    sidecar = _read_json_object(s3, bucket, _ingest_artifact_keys(asset_id)["scenes"])
+    if sidecar is None:
+        return None
+    return _scenes_from_sidecar(sidecar, min_duration=min_duration)
+
+
+def _multi_pass_ingest(src: str, tmpdir: pathlib.Path) -> dict:
+    """
+    Legacy three-process ingest, kept as the fallback when the single-pass
+    graph fails on an odd source. Same artifact dict as `_single_pass_ingest`;
+    the proxy transcode raises on failure, waveform/poster are best-effort.
+    """
+    proxy_path = tmpdir / "proxy.mp4"
+    subprocess.run(
+        ["ffmpeg", "-y", "-i", src, "-vf", "scale=-2:720,fps=60",
+         *PROXY_VIDEO_ARGS, *PROXY_AUDIO_ARGS, str(proxy_path)],
+        check=True,
+    )
+    artifacts = {"proxy": proxy_path}
+
+    pcm_path = tmpdir / "waveform.pcm"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", src, "-vn", "-ac", "1", "-ar", str(WAVEFORM_SAMPLE_RATE),
+             "-c:a", "pcm_s16le", "-f", "s16le", str(pcm_path)],
+            check=True, capture_output=True,
+        )
+        artifacts["pcm"] = pcm_path
+    except Exception:
+        pass
+
+    poster_path = tmpdir / "poster.jpg"
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-ss", str(POSTER_AT_SECONDS), "-i", src,
+             "-frames:v", "1", "-q:v", "2", str(poster_path)],
+            check=True, capture_output=True,
         )
-        poster_url = None
-        if poster_path.exists():
-            pkey = f"thumbnails/{req.assetId}.jpg"
-            s3.upload_file(str(poster_path), bucket, pkey, ExtraArgs={"ContentType": "image/jpeg"})
-            poster_url = s3.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": pkey}, ExpiresIn=3600)
+        artifacts["poster"] = poster_path
+    except Exception:
+        pass
+    return artifacts
 
-    return IngestResponse(proxyUrl=proxy_url, waveformUrl=waveform_url, posterUrl=poster_url)
 
+# Waveform peak pyramid sidecar (`waveforms/{assetId}.peaks`). The finest level
+# has up to WAVEFORM_PYRAMID_MAX_BINS bins; each coarser level halves it until
+# at most WAVEFORM_PYRAMID_MIN_BINS remain, so the editor can zoom from the whole
+# game down to ~0.2s/bin on a 2h game without calling the worker again.
+WAVEFORM_PEAKS_MAGIC = b"HHWP"
+WAVEFORM_PEAKS_VERSION = 1
+WAVEFORM_PYRAMID_MIN_BINS = 128
+WAVEFORM_PYRAMID_MAX_BINS = 32768
+# PCM samples read per chunk (~47s at 22.05kHz, 2 MiB of s16) — keeps ingest
+# memory flat regardless of game length.
+WAVEFORM_CHUNK_SAMPLES = 1 << 20
 
-@web.post("/highlights", response_model=HighlightResponse)
-async def highlights(req: HighlightRequest, authorization: Optional[str] = Header(None)):
+
+def _build_waveform(pcm_path: pathlib.Path, envelope_bins: int = 128) -> Tuple[List[float], list]:
+    """
+    One chunked pass over raw mono s16le PCM that produces both:
+      - the legacy `envelope_bins` mean-|amplitude| envelope (×4, clamped 0-1)
+        that `waveforms/{assetId}.json` has always carried, and
+      - a min/max peak pyramid: list of (samples_per_bin, mins, maxs) int16
+        arrays, finest level first, each level half the bins of the previous.
+
+    Only one chunk of samples is resident at a time. Per-bin min/max come from
+    a reshape over bin-aligned chunks; the envelope is a weighted bincount, so
+    it matches the old per-slice mean exactly.
+    """
+    import numpy as np
+
+    n = pcm_path.stat().st_size // 2
+    if n == 0:
+        return [], []
+
+    env_step = max(1, n // envelope_bins)
+    env_sums = np.zeros(envelope_bins, dtype=np.float64)
+
+    spb = max(1, -(-n // WAVEFORM_PYRAMID_MAX_BINS))  # ceil
+    chunk = max(1, WAVEFORM_CHUNK_SAMPLES // spb) * spb
+    mins_parts = []
+    maxs_parts = []
+    offset = 0
+    with open(pcm_path, "rb") as f:
+        while offset < n:
+            y = np.fromfile(f, dtype="<i2", count=chunk)
+            if y.size == 0:
+                break
+            # Envelope: sum |y| into legacy slices; slices past envelope_bins
+            # are the remainder the old [:bins] slice dropped.
+            idx = (np.arange(offset, offset + y.size) // env_step)
+            keep = idx < envelope_bins
+            if keep.any():
+                env_sums += np.bincount(
+                    idx[keep], weights=np.abs(y[keep].astype(np.float64)), minlength=envelope_bins
+                )[:envelope_bins]
+            # Peaks: full bins via reshape, trailing partial bin (last chunk only) separately.
+            full = (y.size // spb) * spb
+            if full:
+                blocks = y[:full].reshape(-1, spb)
+                mins_parts.append(blocks.min(axis=1))
+                maxs_parts.append(blocks.max(axis=1))
+            if full < y.size:
+                mins_parts.append(y[full:].min(keepdims=True))
+                maxs_parts.append(y[full:].max(keepdims=True))
+            offset += y.size
+
+    env_count = min(envelope_bins, -(-n // env_step))
+    envelope = [
+        float(max(0.0, min(1.0, (env_sums[i] / env_step / 32768.0) * 4)))
+        for i in range(env_count)
+    ]
+
+    mins = np.concatenate(mins_parts)
+    maxs = np.concatenate(maxs_parts)
+    levels = [(spb, mins, maxs)]
+    while len(mins) > WAVEFORM_PYRAMID_MIN_BINS:
+        if len(mins) % 2:
+            mins = np.append(mins, mins[-1])
+            maxs = np.append(maxs, maxs[-1])
+        mins = np.minimum(mins[0::2], mins[1::2])
+        maxs = np.maximum(maxs[0::2], maxs[1::2])
+        spb *= 2
+        levels.append((spb, mins, maxs))
+    return envelope, levels
+
+
+def _write_waveform_peaks(levels: list, sample_rate: int, total_samples: int, out_path: pathlib.Path) -> None:
+    """
+    Serialize a peak pyramid to the compact `.peaks` sidecar (little-endian):
+
+      header   "HHWP" | u16 version | u16 levelCount | u32 sampleRate | u64 totalSamples
+      levels   levelCount × (u32 bins | u32 samplesPerBin), coarsest first
+      data     per level, coarsest first: bins × (i8 min, i8 max) interleaved
+
+    Coarsest-first means a client can Range-GET just the first few KB for the
+    overview and fetch finer levels on zoom. Peaks are s16 >> 8 (i8 covers the
+    ±1.0 full scale in 1/128 steps — more than a waveform lane can draw).
+    """
+    import struct
+    import numpy as np
+
+    ordered = list(reversed(levels))
+    with open(out_path, "wb") as f:
+        f.write(struct.pack("<4sHHIQ", WAVEFORM_PEAKS_MAGIC, WAVEFORM_PEAKS_VERSION,
+                            len(ordered), sample_rate, total_samples))
+        for spb, mins, _ in ordered:
+            f.write(struct.pack("<II", len(mins), spb))
+        for _, mins, maxs in ordered:
+            pairs = np.empty(len(mins) * 2, dtype=np.int8)
+            pairs[0::2] = (mins >> 8).astype(np.int8)
+            pairs[1::2] = (maxs >> 8).astype(np.int8)
+            f.write(pairs.tobytes())
+
+
+def _ingest_artifact_keys(asset_id: str) -> dict:
+    """Bucket key for every artifact /ingest produces for `asset_id`."""
+    return {
+        "proxy": f"proxy/{asset_id}.mp4",
+        "waveform": f"waveforms/{asset_id}.json",
+        "peaks": f"waveforms/{asset_id}.peaks",
+        "poster": f"thumbnails/{asset_id}.jpg",
+        "scenes": f"scenes/{asset_id}.json",
+        "analysis": f"analysis/{asset_id}.mp4",
+        "keyframes": f"analysis/{asset_id}.keyframes.json",
+    }
+
+
+# ----- Ingest dedupe -----
+# Content-addressed index so a byte-identical re-upload under a new assetId
+# skips the transcode entirely:
+#   dedupe/sha256/<hex>.json        {"sha256", "size", "assetId", "artifacts": {name: key}}
+#   dedupe/etag/<etag>-<size>.json  {"sha256"}  — alias readable before any bytes are hashed
+# The sha256 is computed on the ingest download stream itself; the ETag alias
+# (from the ranged head GET) is what makes the lookup a millisecond affair.
+# Aliases are only read or written for strong ETags of our own bucket.
+
+def _ingest_dedupe_enabled() -> bool:
+    """`INGEST_DEDUPE=0` disables both the lookup and the index writes."""
+    return os.environ.get("INGEST_DEDUPE", "1") != "0"
+
+
+def _dedupe_alias_key(head_meta: dict) -> Optional[str]:
+    etag = "".join(c for c in str(head_meta.get("etag") or "") if c.isalnum() or c == "-")
+    size = head_meta.get("size")
+    if not etag or not size:
+        return None
+    return f"dedupe/etag/{etag}-{size}.json"
+
+
+def _dedupe_etag_trusted(source_url: str, head_meta: dict, bucket: str) -> bool:
+    """
+    Whether the source's ETag may stand in for its bytes. Only a strong ETag
+    served by the configured bucket qualifies: those are content hashes (MD5,
+    or MD5-of-parts for multipart uploads). Weak `W/` ETags and whatever
+    other origins send (often mtime + size) can match for different bytes.
+    """
+    import urllib.parse
+
+    etag = str(head_meta.get("etag") or "")
+    if not etag or etag.startswith("W/") or not bucket:
+        return False
+    url = urllib.parse.urlsplit(source_url)
+    host = (url.hostname or "").lower()
+    endpoint = os.environ.get("STORAGE_ENDPOINT")
+    store_host = (urllib.parse.urlsplit(endpoint).hostname or "").lower() if endpoint else ""
+    bucket = bucket.lower()
+    if store_host:
+        # Path-style (endpoint/bucket/key) or virtual-hosted (bucket.endpoint/key).
+        if host == store_host:
+            return url.path.startswith(f"/{bucket}/")
+        return host == f"{bucket}.{store_host}"
+    if not host.endswith(".amazonaws.com"):
+        return False
+    if host.startswith(f"{bucket}.s3"):
+        return True
+    return host.startswith("s3") and url.path.startswith(f"/{bucket}/")
+
+
+def _dedupe_index_key(sha256_hex: str) -> str:
+    return f"dedupe/sha256/{sha256_hex}.json"
+
+
+def _read_json_object(s3, bucket: str, key: str) -> Optional[dict]:
+    """GET + parse a small JSON object. None when missing or unreadable."""
+    import json
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        data = json.loads(body)
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def _put_json_object(s3, bucket: str, key: str, data: dict) -> None:
+    import json
+    s3.put_object(Bucket=bucket, Key=key, Body=json.dumps(data).encode("utf-8"), ContentType="application/json")
+
+
+def _dedupe_lookup(s3, bucket: str, head_meta: dict) -> Optional[dict]:
+    """
+    Resolve ETag alias → sha256 index entry, and confirm the entry's proxy
+    still exists (the original asset may have been deleted since). Returns
+    the index entry or None on any miss.
+    """
+    alias_key = _dedupe_alias_key(head_meta)
+    if not alias_key:
+        return None
+    alias = _read_json_object(s3, bucket, alias_key)
+    sha = (alias or {}).get("sha256")
+    if not sha:
+        return None
+    entry = _read_json_object(s3, bucket, _dedupe_index_key(sha))
+    if not entry or entry.get("size") != head_meta.get("size"):
+        return None
+    proxy_key = (entry.get("artifacts") or {}).get("proxy")
+    if not proxy_key:
+        return None
+    try:
+        s3.head_object(Bucket=bucket, Key=proxy_key)
+    except Exception:
+        return None
+    return entry
+
+
+def _dedupe_clone(s3, bucket: str, entry: dict, asset_id: str) -> dict:
+    """
+    Server-side copy every indexed artifact to `asset_id`'s keys, concurrently.
+    The waveform JSON embeds its peaks key, so it is rewritten rather than
+    copied. Returns {name: new_key} for what was cloned; raises if the proxy
+    copy fails so the caller can fall through to a real ingest.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    dst_keys = _ingest_artifact_keys(asset_id)
+    src_keys = {
+        name: key for name, key in (entry.get("artifacts") or {}).items()
+        if name in dst_keys and key
+    }
+
+    def _clone(name: str) -> None:
+        if name == "waveform":
+            wf = _read_json_object(s3, bucket, src_keys[name])
+            if wf is None:
+                raise RuntimeError(f"waveform {src_keys[name]} unreadable")
+            if isinstance(wf.get("peaks"), dict):
+                wf["peaks"]["key"] = dst_keys["peaks"]
+            _put_json_object(s3, bucket, dst_keys[name], wf)
+            return
+        s3.copy(
+            {"Bucket": bucket, "Key": src_keys[name]}, bucket, dst_keys[name],
+            Config=UPLOAD_TRANSFER_CONFIG,
+        )
+
+    cloned: dict = {}
+    with ThreadPoolExecutor(max_workers=min(UPLOAD_MAX_PARALLEL, max(1, len(src_keys)))) as pool:
+        futures = {name: pool.submit(_clone, name) for name in src_keys}
+        for name, fut in futures.items():
+            try:
+                fut.result()
+                cloned[name] = dst_keys[name]
+            except Exception as e:
+                print(f"[dedupe] clone of {name} failed: {type(e).__name__}: {e}")
+                if name == "proxy":
+                    raise
+    return cloned
+
+
+def _dedupe_record(s3, bucket: str, sha256_hex: str, size: int, head_meta: dict, asset_id: str, uploaded: List[str]) -> None:
+    """Point the sha256 index (and the ETag alias, when known) at this asset's artifacts. Best-effort."""
+    keys = _ingest_artifact_keys(asset_id)
+    try:
+        _put_json_object(s3, bucket, _dedupe_index_key(sha256_hex), {
+            "sha256": sha256_hex,
+            "size": size,
+            "assetId": asset_id,
+            "artifacts": {name: keys[name] for name in uploaded if name in keys},
+        })
+        alias_key = _dedupe_alias_key(head_meta)
+        if alias_key and head_meta.get("size") == size:
+            _put_json_object(s3, bucket, alias_key, {"sha256": sha256_hex})
+    except Exception as e:
+        print(f"[dedupe] index write failed: {type(e).__name__}: {e}")
+
+
+def _ingest_response(s3, bucket: str, keys: dict, present: set, timings: dict, content_hash: Optional[str]) -> "IngestResponse":
+    """Presign GET URLs for the artifacts in `present` and build the /ingest response."""
+    def _url(name: str) -> Optional[str]:
+        if name not in present:
+            return None
+        return s3.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": keys[name]}, ExpiresIn=3600)
+
+    waveform_url = _url("waveform")
+    return IngestResponse(
+        proxyUrl=_url("proxy"),
+        waveformUrl=waveform_url,
+        waveformPeaksUrl=_url("peaks") if waveform_url else None,
+        posterUrl=_url("poster"),
+        contentHash=content_hash,
+        timings=timings,
+    )
+
+
+web = FastAPI(title="Hoops Hype Studio — GPU Worker")
+
+
+@web.post("/ingest", response_model=IngestResponse)
+async def ingest(req: IngestRequest, authorization: Optional[str] = Header(None)):
+    _require_auth(authorization)
+    s3, bucket = _storage_client()
+    if s3 is None:
+        raise HTTPException(
+            status_code=500,
+            detail="S3 not configured: set STORAGE_BUCKET / STORAGE_ACCESS_KEY / STORAGE_SECRET_KEY",
+        )
+
+    timings: dict = {}
+    t_total = time.perf_counter()
+    keys = _ingest_artifact_keys(req.assetId)
+
+    head: Optional[bytes] = None
+    head_meta: dict = {}
+    dedupe = _ingest_dedupe_enabled()
+    if _ingest_streaming_enabled() or dedupe:
+        head, head_meta = _fetch_source_head(req.sourceUrl)
+        if not _dedupe_etag_trusted(req.sourceUrl, head_meta, bucket):
+            # No alias lookup or write for this source; dedupe still
+            # indexes it by the sha256 of the bytes.
+            head_meta.pop("etag", None)
+
+    # Dedupe fast path: a byte-identical source was ingested before under
+    # another assetId — server-side copy its artifacts instead of transcoding.
+    if dedupe:
+        t0 = time.perf_counter()
+        entry = _dedupe_lookup(s3, bucket, head_meta)
+        if entry is not None and entry.get("assetId") == req.assetId:
+            # Re-ingest of the same asset (e.g. a retry after a client
+            # timeout): its artifacts are already in place. Copying them onto
+            # themselves fails for the single-part ones and would
+            # multipart-copy the proxy for nothing.
+            present = {name for name, key in (entry.get("artifacts") or {}).items() if key == keys.get(name)}
+            timings["deduped"] = True
+            timings["dedupe"] = round(time.perf_counter() - t0, 3)
+            timings["total"] = round(time.perf_counter() - t_total, 3)
+            print(f"[ingest] asset={req.assetId} already ingested timings={timings}")
+            return _ingest_response(s3, bucket, keys, present, timings, entry.get("sha256"))
+        if entry is not None:
+            try:
+                cloned = _dedupe_clone(s3, bucket, entry, req.assetId)
+                timings["deduped"] = True
+                timings["dedupe"] = round(time.perf_counter() - t0, 3)
+                timings["total"] = round(time.perf_counter() - t_total, 3)
+                print(f"[ingest] asset={req.assetId} deduped from {entry.get('assetId')} timings={timings}")
+                return _ingest_response(s3, bucket, keys, set(cloned), timings, entry.get("sha256"))
+            except Exception as e:
+                print(f"[ingest] dedupe clone failed, running full ingest: {type(e).__name__}: {e}")
+        timings["dedupe"] = round(time.perf_counter() - t0, 3)
+    timings["deduped"] = False
+
+    import hashlib
+    hasher = hashlib.sha256()
+    content_hash: Optional[str] = None
+    source_size = 0
+
+    with tempfile.TemporaryDirectory() as td:
+        tmpdir = pathlib.Path(td)
+        src_path = tmpdir / "source.mp4"
+        artifacts: Optional[dict] = None
+        timings["streamed"] = False
+
+        # Streamed path: when the container can be demuxed front-to-back,
+        # pipe the download straight into ffmpeg so time-to-proxy is roughly
+        # max(download, transcode) and the original never touches disk.
+        if _ingest_streaming_enabled() and head is not None and _source_is_streamable(head):
+            t0 = time.perf_counter()
+            stream_stats: dict = {}
+            try:
+                artifacts = _single_pass_ingest(
+                    "pipe:0", tmpdir,
+                    has_audio=_has_audio_stream(req.sourceUrl),
+                    duration=_probe_duration(req.sourceUrl),
+                    stream_url=req.sourceUrl,
+                    stream_stats=stream_stats,
+                    stream_hasher=hasher,
+                    analysis=_ingest_analysis_proxy_enabled(),
+                )
+                timings["streamed"] = True
+                timings["decodePasses"] = 1
+                timings["download"] = round(stream_stats.get("seconds", 0.0), 3)
+                timings["transcode"] = round(time.perf_counter() - t0, 3)
+                if stream_stats.get("complete"):
+                    content_hash = hasher.hexdigest()
+                    source_size = int(stream_stats.get("bytes") or 0)
+            except subprocess.CalledProcessError as e:
+                print(f"[ingest] streamed ingest failed, spilling to disk: {_ffmpeg_error_tail(e.stderr)}")
+                artifacts = None
+
+        if artifacts is None:
+            # Spill path (moov-at-end MP4s, unknown containers, stream failure):
+            # download the whole source so the demuxer can seek.
+            hasher = hashlib.sha256()
+            timings["download"] = round(_download_to_file(req.sourceUrl, src_path, hasher=hasher), 3)
+            content_hash = hasher.hexdigest()
+            source_size = src_path.stat().st_size
+
+            # One decode → proxy + poster + waveform PCM. Falls back to the legacy
+            # three-pass ingest if the combined graph trips on an odd source.
+            t0 = time.perf_counter()
+            try:
+                artifacts = _single_pass_ingest(
+                    str(src_path), tmpdir,
+                    has_audio=_has_audio_stream(src_path),
+                    duration=_probe_duration(str(src_path)),
+                    analysis=_ingest_analysis_proxy_enabled(),
+                )
+                timings["decodePasses"] = 1
+            except subprocess.CalledProcessError as e:
+                print(f"[ingest] single-pass failed, falling back to multi-pass: {_ffmpeg_error_tail(e.stderr)}")
+                artifacts = _multi_pass_ingest(str(src_path), tmpdir)
+                timings["decodePasses"] = 3
+            timings["transcode"] = round(time.perf_counter() - t0, 3)
+
+        # Optional waveform JSON + peak pyramid sidecar from the PCM stream
+        t0 = time.perf_counter()
+        wf_path: Optional[pathlib.Path] = None
+        peaks_path: Optional[pathlib.Path] = None
+        if "pcm" in artifacts:
+            try:
+                import json as _json
+                env, levels = _build_waveform(artifacts["pcm"])
+                if levels:
+                    peaks_path = tmpdir / "waveform.peaks"
+                    _write_waveform_peaks(levels, WAVEFORM_SAMPLE_RATE, artifacts["pcm"].stat().st_size // 2, peaks_path)
+                wf_path = tmpdir / "waveform.json"
+                with open(wf_path, 'w', encoding='utf-8') as f:
+                    f.write(_json.dumps({
+                        "sampleRate": WAVEFORM_SAMPLE_RATE,
+                        "bins": env,
+                        # Pointer to the zoomable pyramid (see _write_waveform_peaks).
+                        "peaks": {
+                            "key": keys["peaks"],
+                            "format": f"HHWP/{WAVEFORM_PEAKS_VERSION}",
+                            "levels": [len(m) for _, m, _ in reversed(levels)],
+                        } if peaks_path else None,
+                    }))
+            except Exception as e:
+                print(f"[ingest] waveform build failed: {e}")
+                wf_path = None
+                peaks_path = None
+        timings["waveform"] = round(time.perf_counter() - t0, 3)
+
+        # Upload every artifact concurrently (proxy multipart-chunked).
+        t0 = time.perf_counter()
+        uploads = [{"name": "proxy", "path": artifacts["proxy"], "key": keys["proxy"], "extra": {"ContentType": "video/mp4"}}]
+        if wf_path is not None:
+            uploads.append({"name": "waveform", "path": wf_path, "key": keys["waveform"], "extra": {"ContentType": "application/json"}})
+        if peaks_path is not None:
+            uploads.append({"name": "peaks", "path": peaks_path, "key": keys["peaks"], "extra": {"ContentType": "application/octet-stream"}})
+        if "poster" in artifacts:
+            uploads.append({"name": "poster", "path": artifacts["poster"], "key": keys["poster"], "extra": {"ContentType": "image/jpeg"}})
+        if "scenes" in artifacts:
+            uploads.append({"name": "scenes", "path": artifacts["scenes"], "key": keys["scenes"], "extra": {"ContentType": "application/json"}})
+        # The index is only useful next to its proxy; upload them as a pair.
+        if "analysis" in artifacts and "keyframes" in artifacts:
+            uploads.append({"name": "analysis", "path": artifacts["analysis"], "key": keys["analysis"], "extra": {"ContentType": "video/mp4"}})
+            uploads.append({"name": "keyframes", "path": artifacts["keyframes"], "key": keys["keyframes"], "extra": {"ContentType": "application/json"}})
+        uploaded = _upload_artifacts(s3, bucket, uploads)
+        # Proxy and poster failures surface as before; the waveform pair is best-effort.
+        for name in ("proxy", "poster"):
+            if "error" in uploaded.get(name, {}):
+                raise uploaded[name]["error"]
+        present = {name for name, r in uploaded.items() if "seconds" in r}
+        if "waveform" not in present:
+            present.discard("peaks")
+        if "analysis" not in present:
+            present.discard("keyframes")
+        timings["uploads"] = {name: r["seconds"] for name, r in uploaded.items() if "seconds" in r}
+        timings["upload"] = round(time.perf_counter() - t0, 3)
+
+    if dedupe and content_hash:
+        _dedupe_record(s3, bucket, content_hash, source_size, head_meta, req.assetId, sorted(present))
+
+    timings["total"] = round(time.perf_counter() - t_total, 3)
+    print(f"[ingest] asset={req.assetId} timings={timings}")
+    return _ingest_response(s3, bucket, keys, present, timings, content_hash)
+
+
+def _highlight_segment(seg: dict) -> HighlightSegment:
+    """`score_highlights` entry → response segment."""
+    return HighlightSegment(
+        id=seg['id'],
+        timestamp=seg['timestamp'],
+        action=seg['action'],
+        descriptor=seg['descriptor'],
+        confidence=seg['confidence'],
+        audioPeak=seg['audioPeak'],
+        motion=seg['motion'],
+        score=seg['score'],
+        clipDuration=seg['clipDuration'],
+        jerseyNumbers=seg.get('jerseyNumbers', []),
+        featuredBbox=seg.get('featuredBbox'),
+    )
+
+
+def _highlight_events(req: HighlightRequest):
     """
-    AI-powered highlight detection with scoring.
+    AI-powered highlight detection with scoring, as a stream of
+    (event, data) pairs:
+
+      stage   {"stage": ..., ...}  pipeline milestones (scene count, how many
+                                   scenes go to the classifier, scoring)
+      scene   HighlightSegment + {"kept"}  each scene as soon as it's
+                                   classified; `kept` = passes the confidence cut
+      top     {"segments": [...]}  running top 12, whenever it changes
+      result  HighlightResponse    always last, exactly what /highlights returns
 
     Pipeline:
-    1. Download proxy video
+    1. Download the 360p30 analysis rendition (720p60 proxy if there is none)
     2. Detect scene boundaries (>1.2s scenes)
     3. Classify actions per scene (Dunk, Three Pointer, etc.)
     4. Score using PRD formula: (ActionWeight × Confidence) + (AudioPeak × 0.2) + (MotionIntensity × 0.2)
@@ -1337,80 +4180,284 @@ async def highlights(req: HighlightRequest, authorization: Optional[str] = Heade
 
     PRD Requirements: Sections 6.2, 11
     """
-    _require_auth(authorization)
-
     with tempfile.TemporaryDirectory() as td:
         tmpdir = pathlib.Path(td)
         video_path = tmpdir / "proxy.mp4"
 
         try:
-            # Step 1: Download proxy video
-            urllib.request.urlretrieve(req.proxyUrl, video_path)
+            yield "stage", {"stage": "downloading"}
+            # Step 1: Get the video to analyse. Ingest leaves a 360p30 analysis
+            # rendition (with audio) next to the edit proxy; every analyzer
+            # below runs on it, and the 720p60 proxy is only downloaded for
+            # assets ingested without one. Ingest also leaves a scene sidecar
+            # from its own decode; only re-detect when it's missing or was
+            # written by an older detector version.
+            scenes = None
+            analysis_path: Optional[pathlib.Path] = None
+            s3, bucket = None, ""
+            try:
+                s3, bucket = _storage_client()
+                if s3 is not None:
+                    scenes = _load_scene_sidecar(s3, bucket, req.assetId, min_duration=1.2)
+                    analysis_path = _fetch_analysis_proxy(s3, bucket, req.assetId, tmpdir)
+            except Exception as e:
+                print(f"[highlights] ingest sidecars unavailable: {e}")
+            if analysis_path is not None:
+                video_path = analysis_path
+            else:
+                urllib.request.urlretrieve(req.proxyUrl, video_path)
 
-            # Step 2: Detect scenes (PRD: auto-segment video into scenes > 1.2s)
-            scenes = detect_scenes(video_path, min_duration=1.2)
+            # Step 2: Detect scenes (PRD: auto-segment video into scenes > 1.2s).
+            if scenes is None:
+                yield "stage", {"stage": "detecting"}
+                scenes = detect_scenes(video_path, min_duration=1.2)
+            else:
+                print(f"[highlights] asset={req.assetId} scenes from sidecar ({len(scenes)})")
 
             if not scenes:
                 # Return empty if no scenes found
-                return HighlightResponse(segments=[])
+                yield "result", HighlightResponse(segments=[]).model_dump()
+                return
+            yield "stage", {"stage": "signals", "scenes": len(scenes)}
+
+            # Step 3: Cheap signals for every scene. Motion comes from one
+            # whole-video curve (one decode pass, or none when it's already
+            # persisted for this file) and audio from one decode + range max.
+            # Both the curve and the classification cache are keyed by the
+            # file's hash. The curve and the YOLO fallback run on the
+            # analysis executor; fan-out containers fetch the video by URL.
+            executor = _analysis_executor()
+            video_ref: dict = {"path": str(video_path)}
+
+            def _remote_video_ref() -> dict:
+                """`video_ref` plus where other containers fetch the analysed file."""
+                if analysis_path is not None:
+                    url = s3.generate_presigned_url(
+                        "get_object", ExpiresIn=3600,
+                        Params={"Bucket": bucket, "Key": _ingest_artifact_keys(req.assetId)["analysis"]},
+                    )
+                else:
+                    url = req.proxyUrl
+                return {**video_ref, "url": url, "keyframes": _keyframe_indexes.get(str(video_path))}
+
+            if executor["kind"] == "modal":
+                try:
+                    video_ref = _remote_video_ref()
+                except Exception as e:
+                    print(f"[highlights] no URL for fan-out workers: {e}")
+            video_sha256 = None
+            if s3 is not None or _classify_cache_enabled():
+                try:
+                    video_sha256 = _file_sha256(video_path)
+                except Exception as e:
+                    print(f"[highlights] could not hash {video_path.name}: {e}")
+            motion_curve = None
+            try:
+                motion_curve = _motion_curve_for(video_path, s3, bucket, video_sha256, executor, video_ref)
+            except Exception as e:
+                print(f"[highlights] motion curve failed, sampling per scene: {e}")
+            audio_envelope = None
+            try:
+                t_audio = time.perf_counter()
+                audio_envelope = compute_audio_envelope(video_path)
+                if audio_envelope is not None:
+                    print(
+                        f"[highlights] audio envelope: {len(audio_envelope['rms'])} frames "
+                        f"in {time.perf_counter() - t_audio:.2f}s"
+                    )
+            except Exception as e:
+                print(f"[highlights] audio envelope failed, decoding per scene: {e}")
 
-            # Step 3: Run YOLOv8-backed action detection on each scene
-            detections = []
+            all_detections = []
             for scene in scenes:
-                # Compute motion + audio first to drive the classifier's heuristic priors
-                motion = compute_motion_intensity(video_path, scene['start'], scene['end'])
-                audio_peak = compute_audio_peak(video_path, scene['start'], scene['end'])
-                action, confidence, descriptor, jerseys, featured_bbox = classify_action(
-                    video_path,
-                    scene['start'],
-                    scene['end'],
-                    motion=motion,
-                    audio_peak=audio_peak,
-                    target_jersey=req.targetJersey,
-                )
-
-                detections.append({
+                if motion_curve is not None:
+                    motion = motion_from_curve(motion_curve, scene['start'], scene['end'])
+                else:
+                    motion = compute_motion_intensity(video_path, scene['start'], scene['end'])
+                if audio_envelope is not None:
+                    audio_peak = audio_peak_from_envelope(audio_envelope, scene['start'], scene['end'])
+                else:
+                    audio_peak = compute_audio_peak(video_path, scene['start'], scene['end'])
+                all_detections.append({
                     'id': scene['id'],
-                    'action': action,
-                    'confidence': confidence,
                     'start': scene['start'],
                     'end': scene['end'],
                     'clipDuration': scene['duration'],
                     '_motion': motion,
                     '_audio': audio_peak,
+                })
+
+            # Step 4: Classify. Scenes with a cached vision answer for this
+            # exact video cost nothing; of the rest, only the cascade's top
+            # candidates by cheap score go to the classifier.
+            cache = None
+            if _classify_cache_enabled() and video_sha256:
+                try:
+                    cache = _classify_cache_open(s3, bucket, video_sha256)
+                except Exception as e:
+                    print(f"[highlights] classification cache unavailable: {e}")
+            cached = [_classify_cache_get(cache, sc['start'], sc['end'], req.targetJersey) for sc in scenes]
+            for det, hit in zip(all_detections, cached):
+                if hit is not None:
+                    action, confidence, descriptor, jerseys, featured_bbox = hit
+                    det.update({
+                        'action': action,
+                        'confidence': confidence,
+                        '_descriptor': descriptor,
+                        '_jerseys': jerseys,
+                        '_featuredBbox': featured_bbox,
+                    })
+            uncached = [i for i, hit in enumerate(cached) if hit is None]
+            to_classify = _cascade_select(all_detections, uncached, _cascade_candidates(req.cascadeCandidates))
+            detections = [det for i, det in enumerate(all_detections) if cached[i] is not None or i in to_classify]
+            order = sorted(to_classify)
+            yield "stage", {
+                "stage": "classifying",
+                "scenes": len(scenes),
+                "cacheHits": len(scenes) - len(uncached),
+                "classify": len(order),
+            }
+
+            # Streamed as they're classified: the scene itself, then the
+            # running top 12 if it changed.
+            classified: list = []
+            top_ids: List[str] = []
+
+            def _scored_events(dets: list):
+                for det in dets:
+                    classified.append(det)
+                    seg = score_highlights([det], video_path, min_confidence=0.0)[0]
+                    yield "scene", dict(
+                        _highlight_segment(seg).model_dump(),
+                        kept=det['confidence'] >= HIGHLIGHT_MIN_CONFIDENCE,
+                    )
+                top = score_highlights(classified, video_path, min_confidence=HIGHLIGHT_MIN_CONFIDENCE)
+                if [seg['id'] for seg in top] != top_ids:
+                    top_ids[:] = [seg['id'] for seg in top]
+                    yield "top", {"segments": [_highlight_segment(seg).model_dump() for seg in top]}
+
+            yield from _scored_events([det for det, hit in zip(all_detections, cached) if hit is not None])
+
+            # One frame server decodes every frame the classified scenes need
+            # exactly once, in order, and hands each its 5-frame strip
+            # (shared by GPT-4o and the YOLO fallback).
+            fps = _video_fps(video_path)
+            strip_plans = [_strip_frame_numbers(fps, scenes[i]['start'], scenes[i]['end']) for i in order]
+            # Scenes GPT-4o didn't classify queue here for the YOLO fallback,
+            # which runs as executor tasks of ANALYSIS_YOLO_CHUNK_SCENES scenes
+            # in scene order (the same chunks on every backend). Flushed once
+            # there's a chunk per worker, to keep the held strips bounded.
+            # Inline tasks reuse the strips decoded here; other backends
+            # decode their chunk's strips themselves.
+            yolo_pending: List[Tuple[dict, Optional[list]]] = []
+            yolo_chunk = ANALYSIS_YOLO_CHUNK_SCENES
+            yolo_flush_at = yolo_chunk * executor["workers"]
+            inline = executor["kind"] == "inline"
+
+            def _flush_yolo(final: bool = False) -> list:
+                n = len(yolo_pending) if final else len(yolo_pending) // yolo_chunk * yolo_chunk
+                flushing = yolo_pending[:n]
+                del yolo_pending[:n]
+                tasks = []
+                for k in range(0, len(flushing), yolo_chunk):
+                    part = flushing[k:k + yolo_chunk]
+                    task = {
+                        "task": "yolo",
+                        "video": video_ref,
+                        "scenes": [[d['start'], d['end'], d['_motion'], d['_audio']] for d, _ in part],
+                    }
+                    if inline:
+                        task["frames"] = [strip for _, strip in part]
+                    tasks.append(task)
+                results = [r for chunk in _map_analysis_tasks(executor, tasks) for r in chunk]
+                for (d, _), (action, confidence, descriptor, jerseys, featured_bbox) in zip(flushing, results):
+                    d.update({
+                        'action': action,
+                        'confidence': confidence,
+                        '_descriptor': descriptor,
+                        '_jerseys': jerseys,
+                        '_featuredBbox': featured_bbox,
+                    })
+                return [d for d, _ in flushing]
+
+            def _vision_jobs():
+                for j, bundle in _serve_frames(video_path, strip_plans):
+                    det = all_detections[order[j]]
+                    strip = [bundle[n] for n in strip_plans[j] if n in bundle]
+                    yield (det, strip), {
+                        'video_path': video_path,
+                        'start': det['start'],
+                        'end': det['end'],
+                        'target_jersey': req.targetJersey,
+                        'frames': strip,
+                    }
+
+            # GPT-4o vision first, `concurrency` scenes at a time while the
+            # frame server keeps decoding; results come back in scene order.
+            # Failures queue for the batched YOLO fallback.
+            concurrency = _openai_vision_concurrency(req.visionConcurrency)
+            t_vision = time.perf_counter()
+            for (det, strip), openai_result in _classify_openai_ordered(_vision_jobs(), concurrency):
+                if openai_result is None:
+                    yolo_pending.append((det, strip if inline else None))
+                    if len(yolo_pending) >= yolo_flush_at:
+                        yield from _scored_events(_flush_yolo())
+                    continue
+                _classify_cache_put(cache, det['start'], det['end'], req.targetJersey, openai_result)
+                action, confidence, descriptor, jerseys, featured_bbox = openai_result
+                det.update({
+                    'action': action,
+                    'confidence': confidence,
                     '_descriptor': descriptor,
                     '_jerseys': jerseys,
                     '_featuredBbox': featured_bbox,
                 })
+                yield from _scored_events([det])
+            if yolo_pending:
+                yield from _scored_events(_flush_yolo(final=True))
+            _classify_cache_close(s3, bucket, cache)
+            cascade = {
+                'scenes': len(scenes),
+                'cacheHits': len(scenes) - len(uncached),
+                'classified': len(order),
+                'skipped': len(uncached) - len(order),
+            }
+            print(
+                f"[highlights] asset={req.assetId} classified {cascade['classified']} of {cascade['scenes']} scenes "
+                f"({cascade['cacheHits']} cached, {cascade['skipped']} skipped by cascade; "
+                f"vision concurrency {concurrency}) in {time.perf_counter() - t_vision:.2f}s"
+            )
 
-            # Step 4: Score highlights using PRD algorithm (re-uses precomputed motion/audio)
-            scored_segments = score_highlights(detections, video_path, min_confidence=0.65)
-
-            # Step 5: Convert to response format
-            segments = [
-                HighlightSegment(
-                    id=seg['id'],
-                    timestamp=seg['timestamp'],
-                    action=seg['action'],
-                    descriptor=seg['descriptor'],
-                    confidence=seg['confidence'],
-                    audioPeak=seg['audioPeak'],
-                    motion=seg['motion'],
-                    score=seg['score'],
-                    clipDuration=seg['clipDuration'],
-                    jerseyNumbers=seg.get('jerseyNumbers', []),
-                    featuredBbox=seg.get('featuredBbox'),
-                )
-                for seg in scored_segments
-            ]
+            # Step 5: Score highlights using PRD algorithm (re-uses precomputed motion/audio)
+            yield "stage", {"stage": "scoring"}
+            scored_segments = score_highlights(detections, video_path, min_confidence=HIGHLIGHT_MIN_CONFIDENCE)
+            # Render will subject-track these segments; detect their samples
+            # now, off the request path, so it can read them from the store.
+            if scored_segments and s3 is not None and _detection_store_enabled():
+                try:
+                    _put_json_object(s3, bucket, _detection_prefill_key(req.assetId), {
+                        "startedAt": time.time(), "segments": len(scored_segments),
+                    })
+                    index_detections.spawn(
+                        req.assetId, _remote_video_ref(), [[seg['start'], seg['end']] for seg in scored_segments],
+                    )
+                except Exception as e:
+                    print(f"[highlights] detection store prefill not started: {e}")
+                    try:
+                        s3.delete_object(Bucket=bucket, Key=_detection_prefill_key(req.assetId))
+                    except Exception:
+                        pass
 
-            return HighlightResponse(segments=segments)
+            # Step 6: Convert to response format
+            segments = [_highlight_segment(seg) for seg in scored_segments]
+            yield "result", HighlightResponse(segments=segments, cascade=cascade).model_dump()
 
         except Exception as e:
             # Log error and return fallback mock data
             import traceback
             print(f"Highlight detection error: {e}")
             print(traceback.format_exc())
+            yield "stage", {"stage": "error", "error": f"{type(e).__name__}: {e}"[:160]}
 
             # Fallback segments
             segments = [
@@ -1437,30 +4484,156 @@ async def highlights(req: HighlightRequest, authorization: Optional[str] = Heade
                     clipDuration=5.2,
                 ),
             ]
-            return HighlightResponse(segments=segments)
+            yield "result", HighlightResponse(segments=segments).model_dump()
+
+
+@web.post("/highlights", response_model=HighlightResponse)
+async def highlights(req: HighlightRequest, authorization: Optional[str] = Header(None)):
+    """Highlight detection (see `_highlight_events`); returns only the final result."""
+    _require_auth(authorization)
+    result = None
+    for event, data in _with_highlight_progress(_highlight_events(req), req.jobId):
+        if event == "result":
+            result = data
+    return HighlightResponse.model_validate(result)
+
+
+def _with_highlight_progress(events, job_id: Optional[str]):
+    """
+    Pass `_highlight_events` through unchanged while mirroring it into
+    `job:<id>:progress`: download/detection up to 15%, motion + audio to 25%,
+    classification 25-90% by scenes done, scoring, then done (or error).
+    """
+    report = _progress_reporter(job_id)
+    total = 0
+    done = 0
+    failed = False
+    try:
+        for event, data in events:
+            if event == "stage":
+                stage = data.get("stage")
+                if stage == "downloading":
+                    report(2, "downloading", note="fetching analysis video")
+                elif stage == "detecting":
+                    report(8, "detecting", note="detecting scenes")
+                elif stage == "signals":
+                    report(15, "analyzing", note=f"{data.get('scenes', 0)} scenes detected; motion + audio")
+                elif stage == "classifying":
+                    total = int(data.get("cacheHits", 0)) + int(data.get("classify", 0))
+                    report(25, "classifying", note=f"classified 0/{total} scenes")
+                elif stage == "scoring":
+                    report(92, "scoring", note=f"scoring {done} scenes")
+                elif stage == "error":
+                    failed = True
+                    report(0, "error", note=data.get("error"), force=True)
+            elif event == "scene":
+                done += 1
+                report(
+                    25 + int(65 * done / max(1, total)), "classifying",
+                    note=f"classified {done}/{total} scenes", force=done == total,
+                )
+            elif event == "result" and not failed:
+                report(100, "done", note=f"{len(data.get('segments') or [])} highlight(s)", force=True)
+            yield event, data
+    finally:
+        events.close()
+
+
+# Seconds without an event before the stream sends a keep-alive, so proxies
+# in front of the worker don't drop the connection during long stages
+# (motion curve, audio decode) on full games.
+HIGHLIGHT_STREAM_HEARTBEAT = 15.0
+
+
+def _events_with_heartbeat(events, interval: float = HIGHLIGHT_STREAM_HEARTBEAT):
+    """
+    Run the `events` generator on a worker thread and re-yield its items,
+    plus ("ping", {}) whenever nothing arrived for `interval` seconds.
+    Closing this generator (client went away) stops the worker at its next
+    event and closes `events`, so the analysis and its temp files go too.
+    """
+    import queue
+
+    q: "queue.Queue" = queue.Queue(maxsize=16)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run() -> None:
+        try:
+            for item in events:
+                if not _put(item):
+                    break
+        except Exception as e:
+            print(f"[highlights] stream worker failed: {e}")
+        finally:
+            events.close()
+            _put(done)
+
+    worker = threading.Thread(target=_run, name="highlight-stream", daemon=True)
+    worker.start()
+    try:
+        while True:
+            try:
+                item = q.get(timeout=interval)
+            except queue.Empty:
+                yield "ping", {}
+                continue
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+@web.post("/highlights/stream")
+async def highlights_stream(
+    req: HighlightRequest,
+    authorization: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = None,
+):
+    """
+    Streaming /highlights: the `_highlight_events` stream as NDJSON (one
+    {"event", "data"} object per line, the default) or as server-sent events
+    (`?format=sse` or `Accept: text/event-stream`). The `result` event's data
+    is the same HighlightResponse /highlights returns.
+    """
+    import json
+    from fastapi.responses import StreamingResponse
+
+    _require_auth(authorization)
+    sse = format == "sse" or "text/event-stream" in (accept or "")
+
+    def _body():
+        for event, data in _events_with_heartbeat(_with_highlight_progress(_highlight_events(req), req.jobId)):
+            if event == "ping":
+                yield ": keep-alive\n\n" if sse else json.dumps({"event": "ping", "data": {}}) + "\n"
+            elif sse:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            else:
+                yield json.dumps({"event": event, "data": data}) + "\n"
+
+    return StreamingResponse(
+        _body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @web.post("/render", response_model=RenderResponse)
 async def render(req: RenderRequest, authorization: Optional[str] = Header(None)):
     _require_auth(authorization)
     # Minimal ffmpeg render: scale/reframe to preset and upload; mix music if provided
-    bucket = os.environ.get("STORAGE_BUCKET", "")
-    region = os.environ.get("STORAGE_REGION", "us-east-1")
-    access = os.environ.get("STORAGE_ACCESS_KEY", "")
-    secret = os.environ.get("STORAGE_SECRET_KEY", "")
-    endpoint = os.environ.get("STORAGE_ENDPOINT")
-
-    s3 = None
-    if bucket and access and secret:
-        session = boto3.session.Session()
-        s3 = session.client(
-            "s3",
-            region_name=region,
-            aws_access_key_id=access,
-            aws_secret_access_key=secret,
-            endpoint_url=endpoint,
-            config=BotoConfig(s3={"addressing_style": "path"}),
-        )
+    s3, bucket = _storage_client()
 
     outputs: list[RenderOutput] = []
     if not s3:
@@ -1518,11 +4691,36 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
         tmpdir = pathlib.Path(td)
         src_path = tmpdir / "src.mp4"
         urllib.request.urlretrieve(src_url, src_path)
+        # Subject tracking seeks a handful of frames per segment; use the
+        # short-GOP analysis proxy for it when ingest produced one.
+        track_path = src_path
+        if src_key == proxy_key:
+            try:
+                track_path = _fetch_analysis_proxy(s3, bucket, req.assetId, tmpdir) or src_path
+            except Exception as e:
+                print(f"[render] analysis proxy unavailable: {e}")
+
+        # Detections /highlights (or an earlier render) stored for this asset;
+        # subject tracking only runs YOLO for the samples they don't cover.
+        det_store: Optional[dict] = None
+        if _detection_store_enabled():
+            waited = _wait_for_detection_prefill(s3, bucket, req.assetId)
+            if waited >= 1.0:
+                print(f"[render] waited {waited:.1f}s for the detection prefill")
+            det_store = _load_detection_store(s3, bucket, req.assetId)
+        det_store_size = len(det_store or {})
 
         # Optional beat-aligned cut assembly with transitions and speed ramps
         input_path = src_path
         # Per-segment subject-x average (normalized 0..1) for downstream subject-aware reframe
         seg_subject_x: List[float] = []
+        # Dense mode: per-segment (t, x) subject paths (+ speed-ramp window)
+        # that become a per-frame crop path on the assembled reel.
+        reframing = any(p.presetId in ("vertical-916", "highlight-45") for p in req.presets)
+        dense_tracking = reframing and os.environ.get("SUBJECT_TRACK_MODE", "dense") != "average"
+        seg_tracks: list = []
+        # Per-segment wall time {index, track, cut, total}, in cuts order.
+        seg_timings: List[dict] = []
         try:
             meta = req.metadata or {}
             cuts = meta.get("segments") if isinstance(meta, dict) else None
@@ -1551,7 +4749,17 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                 allowed = {"fade", "fadeblack", "flash", "wipeleft", "wiperight", "slideleft", "slideright"}
                 if ttype not in allowed:
                     ttype = "fade"
-                for i, seg in enumerate(cuts):
+                # Segments are prepared concurrently (subject tracking, then
+                # the cut / speed-ramp encode) on a bounded pool, each ffmpeg
+                # held to its share of the container's cores. Results are
+                # taken in `cuts` order, so ordering and skips are the same as
+                # running them one after another.
+                seg_workers, seg_threads = _render_segment_parallelism(len(cuts))
+                store_lock = threading.Lock()
+
+                def _prepare_segment(i: int, seg) -> Optional[dict]:
+                    """One segment's subject track + cut, or None if its bounds are unusable."""
+                    t_seg = time.perf_counter()
                     # Parse bounds
                     try:
                         start = float(seg.get("start", 0.0))
@@ -1559,17 +4767,17 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                         impact = seg.get("impact")
                         impact_t = float(impact) if impact is not None else None
                     except Exception:
-                        continue
+                        return None
                     # Clamp to source duration so we never -ss past the end of
                     # the video and produce an empty trim file.
                     if src_dur > 0:
                         start = max(0.0, min(src_dur - 0.1, start))
                         end = max(start + 0.1, min(src_dur, end))
                     if end <= start:
-                        continue
+                        return None
                     d = max(0.1, end - start)
                     if d < 0.5:
-                        continue
+                        return None
 
                     # Subject-track this segment for downstream reframe (vertical/4:5).
                     # If the frontend included a `bbox` for player-locked mode,
@@ -1578,16 +4786,37 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                     seg_bbox = seg.get("bbox") if isinstance(seg, dict) else None
                     if not (isinstance(seg_bbox, list) and len(seg_bbox) >= 2):
                         seg_bbox = None
+                    seg_track: List[Tuple[float, float]] = []
+                    subject_x = 0.5
+                    # Each segment tracks against its own copy of the store;
+                    # what it detected is merged back afterwards.
+                    store = None
+                    if det_store is not None:
+                        with store_lock:
+                            store = dict(det_store)
+                    stored = len(store or {})
+                    t_track = time.perf_counter()
                     try:
-                        track_pts = compute_subject_track(
-                            src_path, start, end, sample_fps=3.0, seed_bbox=seg_bbox
-                        )
-                        if track_pts:
-                            seg_subject_x.append(float(sum(p[1] for p in track_pts) / len(track_pts)))
+                        if dense_tracking:
+                            track_pts, track_stats = compute_dense_subject_track(
+                                track_path, start, end, seed_bbox=seg_bbox, store=store,
+                            )
+                            seg_track = [(t, x) for t, x, _ in track_pts]
+                            print(f"[render] seg_{i:02d} dense track {track_stats}")
                         else:
-                            seg_subject_x.append(0.5)
+                            track_pts = compute_subject_track(
+                                track_path, start, end, sample_fps=SUBJECT_TRACK_FPS, seed_bbox=seg_bbox,
+                                store=store,
+                            )
+                        if track_pts:
+                            subject_x = float(sum(p[1] for p in track_pts) / len(track_pts))
                     except Exception:
-                        seg_subject_x.append(0.5)
+                        subject_x = 0.5
+                    if store is not None and len(store) > stored:
+                        with store_lock:
+                            for t, found in store.items():
+                                det_store.setdefault(t, found)
+                    timings = {"track": round(time.perf_counter() - t_track, 3)}
 
                     # Speed ramp window around impact (optional)
                     ramp_lo = None
@@ -1597,6 +4826,16 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                         ramp_lo = max(0.0, rel - 0.6)
                         ramp_hi = min(d, rel + 0.6)
 
+                    def _run_cut(cmd_cut: list) -> None:
+                        # Cuts run side by side: capture stderr so the logs
+                        # don't interleave, and name the segment on failure.
+                        try:
+                            subprocess.run(cmd_cut, check=True, capture_output=True)
+                        except subprocess.CalledProcessError as e:
+                            print(f"[render] seg_{i:02d} cut failed: {_ffmpeg_error_tail(e.stderr)}")
+                            raise
+
+                    t_cut = time.perf_counter()
                     out_seg = tmpdir / f"seg_{i:02d}.mp4"
                     if ramp_lo is not None and ramp_hi is not None and (ramp_hi - ramp_lo) >= 0.05:
                         # Apply slow-motion (0.75x) around impact for video; keep audio normal
@@ -1604,7 +4843,7 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                             f"[0:v]trim=start={0}:end={d},setpts=PTS-STARTPTS[vfull];"
                             f"[vfull]split=3[v0][v1][v2];"
                             f"[v0]trim=0:{ramp_lo},setpts=PTS-STARTPTS[v0t];"
-                            f"[v1]trim={ramp_lo}:{ramp_hi},setpts=(PTS-STARTPTS)/0.4[v1s];"
+                            f"[v1]trim={ramp_lo}:{ramp_hi},setpts=(PTS-STARTPTS)/{SPEED_RAMP_FACTOR}[v1s];"
                             f"[v2]trim={ramp_hi}:{d},setpts=PTS-STARTPTS[v2t];"
                             f"[v0t][v1s][v2t]concat=n=3:v=1:a=0[vout]"
                         )
@@ -1618,11 +4857,12 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                             "-map", "0:a?",
                             "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
                             "-c:a", "aac", "-b:a", "192k",
+                            "-threads", str(seg_threads),
                             str(out_seg),
                         ]
-                        subprocess.run(cmd_cut, check=True)
+                        _run_cut(cmd_cut)
                         # Adjust duration for slow-motion section
-                        d_for_seg = d + (ramp_hi - ramp_lo) * (1/0.4 - 1)
+                        d_for_seg = d + (ramp_hi - ramp_lo) * (1 / SPEED_RAMP_FACTOR - 1)
                     else:
                         cmd_cut = [
                             "ffmpeg", "-y",
@@ -1631,23 +4871,52 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                             "-i", str(src_path),
                             "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
                             "-c:a", "aac", "-b:a", "192k",
+                            "-threads", str(seg_threads),
                             str(out_seg),
                         ]
-                        subprocess.run(cmd_cut, check=True)
+                        _run_cut(cmd_cut)
                         d_for_seg = d
 
+                    timings["cut"] = round(time.perf_counter() - t_cut, 3)
+                    timings["total"] = round(time.perf_counter() - t_seg, 3)
+
                     # Reject empty segments. ffmpeg can return exit 0 even when
                     # `-ss/-to` produces a 0-frame file (e.g. trim window past
                     # source duration despite our clamp, or the source has gaps).
                     # Including a 0-byte segment makes the xfade chain die with
                     # "Stream specifier ':v' matches no streams".
-                    if not out_seg.exists() or out_seg.stat().st_size < 1024:
+                    empty = not out_seg.exists() or out_seg.stat().st_size < 1024
+                    if empty:
                         print(f"[render] seg_{i:02d} produced empty file (start={start}, end={end}); skipping")
+                    return {
+                        "file": None if empty else out_seg,
+                        "duration": d_for_seg,
+                        "subjectX": subject_x,
+                        "track": (seg_track, ramp_lo, ramp_hi),
+                        "action": seg.get("action") if isinstance(seg, dict) else None,
+                        "timings": timings,
+                    }
+
+                from concurrent.futures import ThreadPoolExecutor
+                t_prep = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=seg_workers) as seg_pool:
+                    futures = [seg_pool.submit(_prepare_segment, i, seg) for i, seg in enumerate(cuts)]
+                    prepared = [f.result() for f in futures]
+                for i, r in enumerate(prepared):
+                    if r is None:
                         continue
-
-                    seg_durations.append(d_for_seg)
-                    seg_files.append(out_seg)
-                    seg_actions.append(seg.get("action") if isinstance(seg, dict) else None)
+                    seg_subject_x.append(r["subjectX"])
+                    seg_timings.append({"index": i, **r["timings"]})
+                    if r["file"] is None:
+                        continue
+                    seg_durations.append(r["duration"])
+                    seg_files.append(r["file"])
+                    seg_tracks.append(r["track"])
+                    seg_actions.append(r["action"])
+                print(
+                    f"[render] asset={req.assetId} prepared {len(seg_files)}/{len(cuts)} segments "
+                    f"({seg_workers} workers x {seg_threads} ffmpeg threads) in {time.perf_counter() - t_prep:.2f}s"
+                )
 
                 if len(seg_files) == 1:
                     input_path = seg_files[0]
@@ -1681,7 +4950,8 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                     ]
                     subprocess.run(cmd_xf, check=True)
                     input_path = out_xf
-        except Exception:
+        except Exception as e:
+            print(f"[render] segment assembly failed, rendering from the source: {type(e).__name__}: {e}")
             input_path = src_path
 
         # ---- Build action SFX stinger track (if enabled) ----
@@ -1755,11 +5025,29 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
         else:
             try:
                 # Sample first 6 seconds of source if no segments — keeps it cheap
-                track_pts = compute_subject_track(input_path, 0.0, 6.0, sample_fps=2.0)
+                track_pts = compute_subject_track(track_path, 0.0, 6.0, sample_fps=2.0, store=det_store)
                 subject_x_avg = float(sum(p[1] for p in track_pts) / len(track_pts)) if track_pts else 0.5
             except Exception:
                 subject_x_avg = 0.5
         subject_x_avg = max(0.1, min(0.9, subject_x_avg))
+        # Per-frame crop centre on the assembled reel (dense mode), same clamp
+        # as the average. Falls back to the average if assembly fell back to
+        # the raw source, whose timeline the paths don't describe. The
+        # expression goes to ffmpeg in a filter script file, not argv, so its
+        # length isn't bound by the kernel's per-argument limit.
+        subject_x_expr = f"{subject_x_avg}"
+        if dense_tracking and input_path != src_path and any(t for t, _, _ in seg_tracks):
+            try:
+                crop_points = _reel_crop_points(seg_tracks, seg_durations, tdur)
+                if crop_points:
+                    subject_x_expr = _crop_path_expr([(t, max(0.1, min(0.9, x))) for t, x in crop_points])
+            except Exception as e:
+                print(f"[render] crop path unavailable, using the average subject x: {e}")
+        if det_store is not None and len(det_store) > det_store_size:
+            try:
+                _save_detection_store(s3, bucket, req.assetId, det_store)
+            except Exception as e:
+                print(f"[render] detection store upload failed: {e}")
 
         meta_block = req.metadata or {}
         try:
@@ -1908,146 +5196,155 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
             note=f"starting {total_presets} preset encode(s)",
         )
 
-        # TODO Phase 2b: extract this body into a separate `@app.function`
-        # and call via `app.starmap(...)` for true parallel multi-preset
-        # encoding. Requires staging the prepped video + audio inputs to R2
-        # so the worker tasks can pull them. Today we bump cpu on the
-        # fastapi_app function to give each sequential ffmpeg headroom and
-        # rely on ffmpeg's own internal multithreading.
-        for preset_idx, p in enumerate(req.presets):
-            out_path = tmpdir / f"out-{p.presetId}.mp4"
-
-            # ---- Aspect-aware base scaler (subject-tracked crop for vertical / 4:5) ----
-            # Approach: crop a window from source whose aspect matches the target, centered on
-            # the average tracked subject x; then scale to target resolution. Falls back to the
-            # legacy scale+pad letterbox if subject tracking yields a degenerate width.
-            if p.presetId == "vertical-916":
-                target_w, target_h = 1080, 1920
-                target_ar = target_w / target_h  # 0.5625
-                # crop_w/in_h = target_ar  → crop_w = ih * target_ar (capped to iw).
-                # Backslash-escape commas inside expressions: ffmpeg's filter
-                # parser otherwise treats them as filter-chain separators and
-                # blows up with `No such filter: 'ih*0.5625):h'`.
-                crop_w_expr = f"min(iw\\,ih*{target_ar})"
-                crop_x_expr = f"max(0\\,min(iw-{crop_w_expr}\\,(iw*{subject_x_avg})-({crop_w_expr})/2))"
-                base_filter = (
-                    f"crop=w={crop_w_expr}:h=ih:x={crop_x_expr}:y=0,"
-                    f"scale={target_w}:{target_h}:flags=lanczos"
-                )
-            elif p.presetId == "highlight-45":
-                target_w, target_h = 1080, 1350
-                target_ar = target_w / target_h  # 0.8
-                crop_w_expr = f"min(iw\\,ih*{target_ar})"
-                crop_x_expr = f"max(0\\,min(iw-{crop_w_expr}\\,(iw*{subject_x_avg})-({crop_w_expr})/2))"
-                base_filter = (
-                    f"crop=w={crop_w_expr}:h=ih:x={crop_x_expr}:y=0,"
-                    f"scale={target_w}:{target_h}:flags=lanczos"
-                )
-            else:
+        # Preset uploads run here while the loop encodes the next preset.
+        # Two workers: one draining, one queued; each upload is itself
+        # multipart-parallel via UPLOAD_TRANSFER_CONFIG.
+        from concurrent.futures import ThreadPoolExecutor
+        upload_pool = ThreadPoolExecutor(max_workers=2)
+        pending_uploads: list = []
+        upload_timings: dict = {}
+        try:
+            def _base_filter(preset_id: str, x_expr: str) -> str:
+                # ---- Aspect-aware base scaler (subject-tracked crop for vertical / 4:5) ----
+                # Approach: crop a window from source whose aspect matches the target, centered on
+                # the tracked subject x; then scale to target resolution. Falls back to the
+                # legacy scale+pad letterbox if subject tracking yields a degenerate width.
+                if preset_id == "vertical-916":
+                    target_w, target_h = 1080, 1920
+                    target_ar = target_w / target_h  # 0.5625
+                    # crop_w/in_h = target_ar  → crop_w = ih * target_ar (capped to iw).
+                    # Backslash-escape commas inside expressions: ffmpeg's filter
+                    # parser otherwise treats them as filter-chain separators and
+                    # blows up with `No such filter: 'ih*0.5625):h'`.
+                    crop_w_expr = f"min(iw\\,ih*{target_ar})"
+                    crop_x_expr = f"max(0\\,min(iw-{crop_w_expr}\\,(iw*{x_expr})-({crop_w_expr})/2))"
+                    return (
+                        f"crop=w={crop_w_expr}:h=ih:x={crop_x_expr}:y=0,"
+                        f"scale={target_w}:{target_h}:flags=lanczos"
+                    )
+                if preset_id == "highlight-45":
+                    target_w, target_h = 1080, 1350
+                    target_ar = target_w / target_h  # 0.8
+                    crop_w_expr = f"min(iw\\,ih*{target_ar})"
+                    crop_x_expr = f"max(0\\,min(iw-{crop_w_expr}\\,(iw*{x_expr})-({crop_w_expr})/2))"
+                    return (
+                        f"crop=w={crop_w_expr}:h=ih:x={crop_x_expr}:y=0,"
+                        f"scale={target_w}:{target_h}:flags=lanczos"
+                    )
                 # 16:9 cinematic — keep original framing, scale+pad to absolute 1920x1080
-                base_filter = (
+                return (
                     "scale=1920:1080:force_original_aspect_ratio=decrease:flags=lanczos,"
                     "pad=1920:1080:(ow-iw)/2:(oh-ih)/2"
                 )
 
-            # Use the module-level GRADE_FILTER (preset-agnostic). Locally
-            # bound to keep the f-string interpolation below readable.
-            grade_filter = GRADE_FILTER
+            # Every preset's crop/scale and overlay filters are built up front:
+            # the presets are normally encoded together from one decode (see
+            # RENDER_MULTI_OUTPUT below) and only fall back to one ffmpeg run per
+            # preset if that fails.
+            preset_chains: list[tuple[str, list[str]]] = []
+            # The simple per-preset fallback encode crops at the average
+            # subject x, so a crop path ffmpeg can't use doesn't sink it too.
+            static_base_filters: list[str] = []
+            for p in req.presets:
+                base_filter = _base_filter(p.presetId, subject_x_expr)
+                static_base_filters.append(_base_filter(p.presetId, f"{subject_x_avg}"))
+
+                # ---- Build overlay text/box filters (drawtext/drawbox) ----
+                text_filters: list[str] = []
+                try:
+                    ov = ov_block
+                    if ov.titleCard and ov.titleCard.text:
+                        tc = ov.titleCard
+                        color = (tc.color or "#FFFFFF").replace("#", "0x")
+                        safe_text = str(tc.text).replace("'", r"\'").replace(":", r"\:")
+                        # Animated fade-in for title card
+                        text_filters.append(
+                            f"drawtext=fontsize=72:fontcolor={color}:borderw=2:bordercolor=black@0.6:"
+                            f"x=(w-text_w)/2:y=(h-text_h)/3:text='{safe_text}':"
+                            f"alpha='if(lt(t,0.4),t/0.4,if(lt(t,{tc.duration}),1,max(0,1-(t-{tc.duration})/0.5)))':"
+                            f"enable='lte(t,{tc.duration + 0.5})'"
+                        )
+                    if ov.lowerThird:
+                        lt = ov.lowerThird
+                        safe_name = str(lt.name or "").replace("'", r"\'").replace(":", r"\:")
+                        safe_team = str(lt.team or "").replace("'", r"\'").replace(":", r"\:")
+                        safe_num = str(lt.number or "").replace("'", r"\'").replace(":", r"\:")
+                        safe_pos = str(lt.position or "").replace("'", r"\'").replace(":", r"\:")
+                        color = (lt.color or "#5B6DFA").replace("#", "0x")
+                        # Bottom band with team color, then text — appears 1.0s in for 5s
+                        text_filters.append(
+                            f"drawbox=x=0:y=h-180:w=w:h=180:color={color}@0.78:t=fill:enable='between(t,1.0,6.0)'"
+                        )
+                        text_filters.append(
+                            f"drawtext=fontsize=46:fontcolor=white:borderw=1:bordercolor=black@0.55:"
+                            f"x=48:y=h-150:text='{safe_name}':enable='between(t,1.0,6.0)'"
+                        )
+                        text_filters.append(
+                            f"drawtext=fontsize=28:fontcolor=white@0.85:"
+                            f"x=48:y=h-92:text='{safe_team}  #{safe_num}  {safe_pos}':enable='between(t,1.0,6.0)'"
+                        )
+                    # Safe zones rectangle overlay per preset if provided or toggled
+                    if ov.showSafeZones or (ov.safeZones and isinstance(ov.safeZones, dict)):
+                        aspect_key = "16x9"
+                        if p.presetId == "vertical-916":
+                            aspect_key = "9x16"
+                        elif p.presetId == "highlight-45":
+                            aspect_key = "4x5"
+                        rect = None
+                        if ov.safeZones and aspect_key in ov.safeZones:
+                            try:
+                                parts = str(ov.safeZones[aspect_key]).split(",")
+                                if len(parts) == 4:
+                                    x1, y1, x2, y2 = [float(v.strip()) for v in parts]
+                                    rx = max(0.0, min(1.0, min(x1, x2)))
+                                    ry = max(0.0, min(1.0, min(y1, y2)))
+                                    rw = max(0.0, min(1.0, abs(x2 - x1)))
+                                    rh = max(0.0, min(1.0, abs(y2 - y1)))
+                                    rect = (rx, ry, rw, rh)
+                            except Exception:
+                                rect = None
+                        if rect is None:
+                            rect = (0.08, 0.08, 0.84, 0.84)
+                        rx, ry, rw, rh = rect
+                        text_filters.append(
+                            f"drawbox=x=w*{rx}:y=h*{ry}:w=w*{rw}:h=h*{rh}:color=white@0.22:t=2"
+                        )
 
-            # ---- Build overlay text/box filters (drawtext/drawbox) ----
-            text_filters: list[str] = []
-            try:
-                ov = ov_block
-                if ov.titleCard and ov.titleCard.text:
-                    tc = ov.titleCard
-                    color = (tc.color or "#FFFFFF").replace("#", "0x")
-                    safe_text = str(tc.text).replace("'", r"\'").replace(":", r"\:")
-                    # Animated fade-in for title card
-                    text_filters.append(
-                        f"drawtext=fontsize=72:fontcolor={color}:borderw=2:bordercolor=black@0.6:"
-                        f"x=(w-text_w)/2:y=(h-text_h)/3:text='{safe_text}':"
-                        f"alpha='if(lt(t,0.4),t/0.4,if(lt(t,{tc.duration}),1,max(0,1-(t-{tc.duration})/0.5)))':"
-                        f"enable='lte(t,{tc.duration + 0.5})'"
-                    )
-                if ov.lowerThird:
-                    lt = ov.lowerThird
-                    safe_name = str(lt.name or "").replace("'", r"\'").replace(":", r"\:")
-                    safe_team = str(lt.team or "").replace("'", r"\'").replace(":", r"\:")
-                    safe_num = str(lt.number or "").replace("'", r"\'").replace(":", r"\:")
-                    safe_pos = str(lt.position or "").replace("'", r"\'").replace(":", r"\:")
-                    color = (lt.color or "#5B6DFA").replace("#", "0x")
-                    # Bottom band with team color, then text — appears 1.0s in for 5s
-                    text_filters.append(
-                        f"drawbox=x=0:y=h-180:w=w:h=180:color={color}@0.78:t=fill:enable='between(t,1.0,6.0)'"
-                    )
-                    text_filters.append(
-                        f"drawtext=fontsize=46:fontcolor=white:borderw=1:bordercolor=black@0.55:"
-                        f"x=48:y=h-150:text='{safe_name}':enable='between(t,1.0,6.0)'"
-                    )
-                    text_filters.append(
-                        f"drawtext=fontsize=28:fontcolor=white@0.85:"
-                        f"x=48:y=h-92:text='{safe_team}  #{safe_num}  {safe_pos}':enable='between(t,1.0,6.0)'"
-                    )
-                # Safe zones rectangle overlay per preset if provided or toggled
-                if ov.showSafeZones or (ov.safeZones and isinstance(ov.safeZones, dict)):
-                    aspect_key = "16x9"
-                    if p.presetId == "vertical-916":
-                        aspect_key = "9x16"
-                    elif p.presetId == "highlight-45":
-                        aspect_key = "4x5"
-                    rect = None
-                    if ov.safeZones and aspect_key in ov.safeZones:
-                        try:
-                            parts = str(ov.safeZones[aspect_key]).split(",")
-                            if len(parts) == 4:
-                                x1, y1, x2, y2 = [float(v.strip()) for v in parts]
-                                rx = max(0.0, min(1.0, min(x1, x2)))
-                                ry = max(0.0, min(1.0, min(y1, y2)))
-                                rw = max(0.0, min(1.0, abs(x2 - x1)))
-                                rh = max(0.0, min(1.0, abs(y2 - y1)))
-                                rect = (rx, ry, rw, rh)
-                        except Exception:
-                            rect = None
-                    if rect is None:
-                        rect = (0.08, 0.08, 0.84, 0.84)
-                    rx, ry, rw, rh = rect
-                    text_filters.append(
-                        f"drawbox=x=w*{rx}:y=h*{ry}:w=w*{rw}:h=h*{rh}:color=white@0.22:t=2"
-                    )
+                    # Scoreboard banner (top-right) — ESPN-style team-color tile.
+                    # Animated slide-in over the first 0.6s, holds for 4s, slides out by 5s.
+                    if ov.scoreboard and ov.scoreboard.enabled:
+                        sb = ov.scoreboard
+                        sb_color = (sb.color or "#FFD166").replace("#", "0x")
+                        style = sb.style if sb.style in ("burst", "minimal") else "burst"
+                        band_h = 84 if style == "burst" else 56
+                        band_w_frac = 0.32 if style == "burst" else 0.24
+                        # x slides from right edge (offscreen) to its rest position
+                        x_expr = f"if(lt(t,0.6),W-w*{band_w_frac}*t/0.6,if(lt(t,5),W-w*{band_w_frac}-12,W-w*{band_w_frac}*max(0,(5.6-t)/0.6)))"
+                        text_filters.append(
+                            f"drawbox=x='{x_expr}':y=22:w=w*{band_w_frac}:h={band_h}:"
+                            f"color={sb_color}@0.85:t=fill:enable='between(t,0,5.6)'"
+                        )
+                        # Title text
+                        sb_title = "HYPE" if style == "burst" else "LIVE"
+                        text_filters.append(
+                            f"drawtext=fontsize={int(band_h*0.42)}:fontcolor=black@0.92:"
+                            f"x='{x_expr}+22':y=34:text='{sb_title}':enable='between(t,0.4,5.4)'"
+                        )
+                        # Optional team initials from lower-third (if present)
+                        if ov.lowerThird and ov.lowerThird.team:
+                            team_init = (ov.lowerThird.team or "")[:3].upper().replace("'", "").replace(":", "")
+                            if team_init:
+                                text_filters.append(
+                                    f"drawtext=fontsize={int(band_h*0.30)}:fontcolor=black@0.90:"
+                                    f"x='{x_expr}+22':y=34+{int(band_h*0.50)}:text='{team_init}':"
+                                    f"enable='between(t,0.6,5.4)'"
+                                )
+                except Exception:
+                    pass
 
-                # Scoreboard banner (top-right) — ESPN-style team-color tile.
-                # Animated slide-in over the first 0.6s, holds for 4s, slides out by 5s.
-                if ov.scoreboard and ov.scoreboard.enabled:
-                    sb = ov.scoreboard
-                    sb_color = (sb.color or "#FFD166").replace("#", "0x")
-                    style = sb.style if sb.style in ("burst", "minimal") else "burst"
-                    band_h = 84 if style == "burst" else 56
-                    band_w_frac = 0.32 if style == "burst" else 0.24
-                    # x slides from right edge (offscreen) to its rest position
-                    x_expr = f"if(lt(t,0.6),W-w*{band_w_frac}*t/0.6,if(lt(t,5),W-w*{band_w_frac}-12,W-w*{band_w_frac}*max(0,(5.6-t)/0.6)))"
-                    text_filters.append(
-                        f"drawbox=x='{x_expr}':y=22:w=w*{band_w_frac}:h={band_h}:"
-                        f"color={sb_color}@0.85:t=fill:enable='between(t,0,5.6)'"
-                    )
-                    # Title text
-                    sb_title = "HYPE" if style == "burst" else "LIVE"
-                    text_filters.append(
-                        f"drawtext=fontsize={int(band_h*0.42)}:fontcolor=black@0.92:"
-                        f"x='{x_expr}+22':y=34:text='{sb_title}':enable='between(t,0.4,5.4)'"
-                    )
-                    # Optional team initials from lower-third (if present)
-                    if ov.lowerThird and ov.lowerThird.team:
-                        team_init = (ov.lowerThird.team or "")[:3].upper().replace("'", "").replace(":", "")
-                        if team_init:
-                            text_filters.append(
-                                f"drawtext=fontsize={int(band_h*0.30)}:fontcolor=black@0.90:"
-                                f"x='{x_expr}+22':y=34+{int(band_h*0.50)}:text='{team_init}':"
-                                f"enable='between(t,0.6,5.4)'"
-                            )
-            except Exception:
-                pass
+                preset_chains.append((base_filter, text_filters))
 
-            # ---- Compose into a unified -filter_complex graph ----
+            # ---- Shared inputs for the -filter_complex graph ----
             # Inputs:
             #   [0] = video (always)
             #   [1] = silent stereo bed via lavfi (only if source has no audio)
@@ -2055,7 +5352,7 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
             #   [next] = logo (optional)
             #   [next] = voiceover (optional)
             #   [next] = sfx track (optional)
-            cmd = ["ffmpeg", "-y", "-i", str(input_path)]
+            input_args = ["-i", str(input_path)]
             input_index = 1
             music_idx: Optional[int] = None
             logo_idx: Optional[int] = None
@@ -2068,46 +5365,39 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
             has_src_audio = _has_audio_stream(input_path)
             silent_audio_idx: Optional[int] = None
             if not has_src_audio:
-                cmd += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000"]
+                input_args += ["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000"]
                 silent_audio_idx = input_index
                 input_index += 1
-                print(f"[render] source has no audio; injected silent bed at input {silent_audio_idx} for preset={p.presetId}")
+                print(f"[render] source has no audio; injected silent bed at input {silent_audio_idx}")
             src_a = f"[0:a]" if has_src_audio else f"[{silent_audio_idx}:a]"
 
             if music_path is not None and music_path.exists():
-                cmd += ["-i", str(music_path)]
+                input_args += ["-i", str(music_path)]
                 music_idx = input_index
                 input_index += 1
 
             if logo_path is not None and logo_path.exists():
-                cmd += ["-i", str(logo_path)]
+                input_args += ["-i", str(logo_path)]
                 logo_idx = input_index
                 input_index += 1
 
             # Optional anchor voiceover — generate once, mix into audio chain
             vo_idx: Optional[int] = None
             if vo_path is not None and vo_path.exists():
-                cmd += ["-i", str(vo_path)]
+                input_args += ["-i", str(vo_path)]
                 vo_idx = input_index
                 input_index += 1
 
             # Optional action SFX stinger track — pre-built once outside the preset loop
             sfx_idx: Optional[int] = None
             if sfx_track_path is not None and sfx_track_path.exists():
-                cmd += ["-i", str(sfx_track_path)]
+                input_args += ["-i", str(sfx_track_path)]
                 sfx_idx = input_index
                 input_index += 1
 
-            # Video chain segments
-            chain: list[str] = []
-            video_label_in = "[0:v]"
-            video_label_out = "[v0]"
-            chain.append(f"{video_label_in}{base_filter},{grade_filter}{video_label_out}")
-
-            if text_filters:
-                chain.append(f"{video_label_out}{','.join(text_filters)}[v1]")
-                video_label_out = "[v1]"
-
+            # Logo is scaled once; each preset overlays it at the same relative spot.
+            logo_filter: Optional[str] = None
+            logo_overlay = ""
             if logo_idx is not None and logo_path is not None:
                 logo_scale = max(0.05, min(2.0, ov_block.logo.scale if ov_block.logo else 0.5))
                 # Logo width as fraction of target frame width × scale factor
@@ -2116,20 +5406,16 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                 yfrac = ov_block.logo.y if ov_block.logo and ov_block.logo.y is not None else 0.06
                 xfrac = max(0.0, min(1.0, xfrac))
                 yfrac = max(0.0, min(1.0, yfrac))
-                chain.append(
-                    f"[{logo_idx}:v]format=rgba,scale=iw*{logo_w_frac}:-1[lg]"
-                )
-                chain.append(
-                    f"{video_label_out}[lg]overlay=x=(W-w)*{xfrac}:y=(H-h)*{yfrac}:format=auto[vout]"
-                )
-                video_label_out = "[vout]"
+                logo_filter = f"[{logo_idx}:v]format=rgba,scale=iw*{logo_w_frac}:-1"
+                logo_overlay = f"overlay=x=(W-w)*{xfrac}:y=(H-h)*{yfrac}:format=auto"
 
             # Audio chain — build the music/VO mix first into [a_pre], then
             # optionally amix the SFX stinger track on top, then loudnorm at the end.
-            audio_map: list[str] = []
+            # The mix is the same for every preset.
+            audio_chain: list[str] = []
             if music_idx is not None and vo_idx is not None:
                 # Source + music + VO. Music ducks under source AND VO; source ducks under VO.
-                chain.append(
+                audio_chain.append(
                     f"{src_a}volume=1.0,asplit=2[a_main][a_sc];"
                     f"[{music_idx}:a]volume=0.55[a_music];"
                     f"[{vo_idx}:a]volume=1.4,asplit=2[a_vo][a_vo_sc];"
@@ -2139,82 +5425,172 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                     f"[a_main_dv][a_music_dv][a_vo]amix=inputs=3:duration=first:dropout_transition=2[a_pre]"
                 )
             elif music_idx is not None:
-                chain.append(
+                audio_chain.append(
                     f"{src_a}volume=1.0,asplit=2[a_main][a_sc];"
                     f"[{music_idx}:a]volume=0.55[a_music];"
                     f"[a_music][a_sc]sidechaincompress=threshold=0.06:ratio=8:attack=10:release=200[a_music_d];"
                     f"[a_main][a_music_d]amix=inputs=2:duration=first:dropout_transition=2[a_pre]"
                 )
             elif vo_idx is not None:
-                chain.append(
+                audio_chain.append(
                     f"{src_a}volume=1.0[a_main];"
                     f"[{vo_idx}:a]volume=1.4,asplit=2[a_vo][a_vo_sc];"
                     f"[a_main][a_vo_sc]sidechaincompress=threshold=0.04:ratio=6:attack=5:release=300[a_main_d];"
                     f"[a_main_d][a_vo]amix=inputs=2:duration=first:dropout_transition=2[a_pre]"
                 )
             else:
-                chain.append(f"{src_a}anull[a_pre]")
+                audio_chain.append(f"{src_a}anull[a_pre]")
 
             # Optional SFX stinger track on top, then EBU R128 at the end
             if sfx_idx is not None:
-                chain.append(
+                audio_chain.append(
                     f"[{sfx_idx}:a]volume=1.0[a_sfx];"
                     f"[a_pre][a_sfx]amix=inputs=2:duration=first:dropout_transition=0,"
                     f"loudnorm=I=-14:TP=-1.5:LRA=11:dual_mono=true[aout]"
                 )
             else:
-                chain.append("[a_pre]loudnorm=I=-14:TP=-1.5:LRA=11:dual_mono=true[aout]")
-            audio_map = ["-map", "[aout]"]
-
-            filter_graph = "; ".join(chain)
-            cmd += [
-                "-filter_complex", filter_graph,
-                "-map", video_label_out,
-                *audio_map,
+                audio_chain.append("[a_pre]loudnorm=I=-14:TP=-1.5:LRA=11:dual_mono=true[aout]")
+
+            encode_args = [
                 "-c:v", "libx264", "-preset", "medium", "-crf", "19",
                 "-profile:v", "high", "-level", "4.2",
                 "-pix_fmt", "yuv420p",
                 "-c:a", "aac", "-b:a", "320k", "-ar", "48000",
                 "-movflags", "+faststart",
-                str(out_path),
             ]
-            primary_err: Optional[str] = None
-            fallback_err: Optional[str] = None
-            try:
-                subprocess.run(cmd, check=True, capture_output=True)
-            except subprocess.CalledProcessError as e:
-                # Pull the actually-useful error tail (skip ffmpeg's --enable-* spam).
-                primary_err = _ffmpeg_error_tail(e.stderr)
-                print(f"[render] primary ffmpeg failed for preset={p.presetId}: {primary_err}")
-                fallback_cmd = [
-                    "ffmpeg", "-y", "-i", str(input_path),
-                    "-vf", f"{base_filter},{grade_filter}",
-                    "-c:v", "libx264", "-preset", "veryfast", "-crf", "21",
-                    "-pix_fmt", "yuv420p",
-                    "-c:a", "aac", "-b:a", "256k",
-                    "-movflags", "+faststart",
-                    str(out_path),
-                ]
-                try:
-                    subprocess.run(fallback_cmd, check=True, capture_output=True)
-                except subprocess.CalledProcessError as e2:
-                    fallback_err = _ffmpeg_error_tail(e2.stderr)
-                    print(f"[render] fallback ffmpeg also failed for preset={p.presetId}: {fallback_err}")
-                    # Both encode paths failed — record the more informative
-                    # primary error (the fallback is a simplified chain that
-                    # often fails for the same root reason) and move on so the
-                    # other presets still get their chance.
-                    preset_errors.append((p.presetId, primary_err or fallback_err or "encode failed"))
-                    continue
 
-            key = f"exports/{req.assetId}-{p.presetId}.mp4"
-            download_name = f"hype-{p.presetId}-{req.assetId}.mp4"
-            try:
-                s3.upload_file(
-                    str(out_path),
-                    bucket,
-                    key,
-                    ExtraArgs={
+            def _preset_video_chain(src: str, grade: str, base_filter: str, text_filters: list[str], lg: Optional[str], tag: str = ""):
+                """Video chain for one preset: `src` → framing + grade → overlays → logo.
+
+                Returns the filter chain and the label of its final output.
+                """
+                chain = [f"{src}{base_filter},{grade}[v0{tag}]"]
+                label = f"[v0{tag}]"
+                if text_filters:
+                    chain.append(f"{label}{','.join(text_filters)}[v1{tag}]")
+                    label = f"[v1{tag}]"
+                if lg:
+                    chain.append(f"{label}{lg}{logo_overlay}[vout{tag}]")
+                    label = f"[vout{tag}]"
+                return chain, label
+
+            # ---- One decode, many outputs ----
+            # Decoding the source and grading it is the same work for every
+            # preset, so by default all presets come out of a single ffmpeg run:
+            # the colour grade runs once on the decoded source, `split` fans it
+            # out to one branch per preset (crop/scale, sharpen + vignette, text,
+            # logo), the audio mix is `asplit` the same way, and each branch gets
+            # its own encoder and output file. Any preset that run doesn't produce
+            # goes through the per-preset loop below instead.
+            encoded: set[int] = set()
+            encode_timings: dict = {}
+            multi_output = os.environ.get("RENDER_MULTI_OUTPUT", "1") != "0"
+            if multi_output and len(req.presets) > 1:
+                n = len(req.presets)
+                chain = [f"[0:v]{GRADE_COLOR_FILTER},split={n}" + "".join(f"[g{k}]" for k in range(n))]
+                if logo_filter:
+                    chain.append(f"{logo_filter},split={n}" + "".join(f"[lg{k}]" for k in range(n)))
+                chain += audio_chain
+                chain.append(f"[aout]asplit={n}" + "".join(f"[aout{k}]" for k in range(n)))
+                output_args: list[str] = []
+                for k, (p, (base_filter, text_filters)) in enumerate(zip(req.presets, preset_chains)):
+                    branch, label = _preset_video_chain(
+                        f"[g{k}]", GRADE_FRAME_FILTER, base_filter, text_filters,
+                        f"[lg{k}]" if logo_filter else None, tag=f"_{k}",
+                    )
+                    chain += branch
+                    output_args += ["-map", label, "-map", f"[aout{k}]", *encode_args, str(tmpdir / f"out-{p.presetId}.mp4")]
+                _write_progress(
+                    req.jobId, 30, stage="encoding",
+                    presets=preset_progress,
+                    note=f"encoding {n} presets in one pass",
+                )
+                graph_path = tmpdir / "graph-multi.txt"
+                graph_path.write_text("; ".join(chain), encoding="utf-8")
+                t_enc = time.perf_counter()
+                try:
+                    subprocess.run(
+                        ["ffmpeg", "-y", *input_args, "-filter_complex_script", str(graph_path), *output_args],
+                        check=True, capture_output=True,
+                    )
+                except (subprocess.CalledProcessError, OSError) as e:
+                    # Outputs of a failed run may be truncated; re-encode them
+                    # all. OSError: ffmpeg didn't start (e.g. E2BIG).
+                    detail = _ffmpeg_error_tail(e.stderr) if isinstance(e, subprocess.CalledProcessError) else f"{type(e).__name__}: {e}"
+                    print(f"[render] multi-output ffmpeg failed, encoding presets one at a time: {detail}")
+                else:
+                    for k, p in enumerate(req.presets):
+                        out_path = tmpdir / f"out-{p.presetId}.mp4"
+                        if out_path.exists() and out_path.stat().st_size > 0:
+                            encoded.add(k)
+                encode_timings["multiOutput"] = round(time.perf_counter() - t_enc, 3)
+                print(f"[render] multi-output encode of {n} presets: {len(encoded)} ok in {encode_timings['multiOutput']}s")
+
+            for preset_idx, p in enumerate(req.presets):
+                out_path = tmpdir / f"out-{p.presetId}.mp4"
+                base_filter, text_filters = preset_chains[preset_idx]
+
+                if preset_idx not in encoded:
+                    # ---- Per-preset -filter_complex graph ----
+                    chain = [f"{logo_filter}[lg]"] if logo_filter else []
+                    video_chain, video_label_out = _preset_video_chain(
+                        "[0:v]", GRADE_FILTER, base_filter, text_filters, "[lg]" if logo_filter else None,
+                    )
+                    chain += video_chain + audio_chain
+                    graph_path = tmpdir / f"graph-{p.presetId}.txt"
+                    graph_path.write_text("; ".join(chain), encoding="utf-8")
+                    cmd = [
+                        "ffmpeg", "-y", *input_args,
+                        "-filter_complex_script", str(graph_path),
+                        "-map", video_label_out,
+                        "-map", "[aout]",
+                        *encode_args,
+                        str(out_path),
+                    ]
+                    primary_err: Optional[str] = None
+                    fallback_err: Optional[str] = None
+                    t_enc = time.perf_counter()
+                    try:
+                        subprocess.run(cmd, check=True, capture_output=True)
+                    except (subprocess.CalledProcessError, OSError) as e:
+                        # Pull the actually-useful error tail (skip ffmpeg's --enable-* spam).
+                        if isinstance(e, subprocess.CalledProcessError):
+                            primary_err = _ffmpeg_error_tail(e.stderr)
+                        else:
+                            primary_err = f"{type(e).__name__}: {e}"
+                        print(f"[render] primary ffmpeg failed for preset={p.presetId}: {primary_err}")
+                        fallback_cmd = [
+                            "ffmpeg", "-y", "-i", str(input_path),
+                            "-vf", f"{static_base_filters[preset_idx]},{GRADE_FILTER}",
+                            "-c:v", "libx264", "-preset", "veryfast", "-crf", "21",
+                            "-pix_fmt", "yuv420p",
+                            "-c:a", "aac", "-b:a", "256k",
+                            "-movflags", "+faststart",
+                            str(out_path),
+                        ]
+                        try:
+                            subprocess.run(fallback_cmd, check=True, capture_output=True)
+                        except (subprocess.CalledProcessError, OSError) as e2:
+                            if isinstance(e2, subprocess.CalledProcessError):
+                                fallback_err = _ffmpeg_error_tail(e2.stderr)
+                            else:
+                                fallback_err = f"{type(e2).__name__}: {e2}"
+                            print(f"[render] fallback ffmpeg also failed for preset={p.presetId}: {fallback_err}")
+                            # Both encode paths failed — record the more informative
+                            # primary error (the fallback is a simplified chain that
+                            # often fails for the same root reason) and move on so the
+                            # other presets still get their chance.
+                            preset_errors.append((p.presetId, primary_err or fallback_err or "encode failed"))
+                            continue
+                    encode_timings[p.presetId] = round(time.perf_counter() - t_enc, 3)
+
+                key = f"exports/{req.assetId}-{p.presetId}.mp4"
+                download_name = f"hype-{p.presetId}-{req.assetId}.mp4"
+                # Hand the finished file to the upload pool and go straight on to
+                # the next preset's encode, so this R2 upload overlaps that ffmpeg run.
+                upload_fut = upload_pool.submit(
+                    _upload_artifact, s3, bucket, out_path, key,
+                    {
                         "ContentType": "video/mp4",
                         "ContentDisposition": f'attachment; filename="{download_name}"',
                         # Phase 2d: tell CDN edges they may cache the signed
@@ -2222,29 +5598,40 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
                         "CacheControl": "private, max-age=3600",
                     },
                 )
-                url = s3.generate_presigned_url(
-                    "get_object",
-                    Params={
-                        "Bucket": bucket,
-                        "Key": key,
-                        "ResponseContentDisposition": f'attachment; filename="{download_name}"',
-                    },
-                    ExpiresIn=3600,
+                pending_uploads.append((preset_idx, p, key, download_name, upload_fut))
+                preset_progress[preset_idx]["progress"] = 90
+                # Each preset encode bumps overall progress within the 30→90 band.
+                band_progress = 30 + int((preset_idx + 1) / total_presets * 60)
+                _write_progress(
+                    req.jobId, band_progress, stage="encoding",
+                    presets=preset_progress,
+                    note=f"preset {preset_idx + 1}/{total_presets} encoded, uploading",
                 )
-            except Exception as upload_err:
-                detail = f"{type(upload_err).__name__}: {upload_err}"
-                print(f"[render] s3 upload/presign failed for preset={p.presetId}: {detail}")
-                preset_errors.append((p.presetId, f"upload failed: {detail}"))
-                continue
-            outputs.append(RenderOutput(presetId=p.presetId, url=url, key=key))
-            preset_progress[preset_idx]["progress"] = 100
-            # Each preset completion bumps overall progress within the 30→90 band.
-            band_progress = 30 + int((preset_idx + 1) / total_presets * 60)
-            _write_progress(
-                req.jobId, band_progress, stage="encoding",
-                presets=preset_progress,
-                note=f"preset {preset_idx + 1}/{total_presets} done",
-            )
+
+            # Collect uploads in preset order so `outputs` keeps request ordering.
+            for preset_idx, p, key, download_name, upload_fut in pending_uploads:
+                try:
+                    upload_timings[p.presetId] = round(upload_fut.result(), 3)
+                    url = s3.generate_presigned_url(
+                        "get_object",
+                        Params={
+                            "Bucket": bucket,
+                            "Key": key,
+                            "ResponseContentDisposition": f'attachment; filename="{download_name}"',
+                        },
+                        ExpiresIn=3600,
+                    )
+                except Exception as upload_err:
+                    detail = f"{type(upload_err).__name__}: {upload_err}"
+                    print(f"[render] s3 upload/presign failed for preset={p.presetId}: {detail}")
+                    preset_errors.append((p.presetId, f"upload failed: {detail}"))
+                    continue
+                outputs.append(RenderOutput(presetId=p.presetId, url=url, key=key))
+                preset_progress[preset_idx]["progress"] = 100
+        finally:
+            # Also on an exception: the uploads read out-*.mp4, which the
+            # TemporaryDirectory deletes as soon as this block unwinds.
+            upload_pool.shutdown(wait=True)
 
     if not outputs:
         # Every preset failed — surface a useful 500 so the bg fn writes a
@@ -2258,16 +5645,101 @@ async def render(req: RenderRequest, authorization: Optional[str] = Header(None)
         _write_progress(req.jobId, 0, stage="error", note=detail[:160])
         raise HTTPException(status_code=500, detail=detail)
     _write_progress(req.jobId, 100, stage="done", presets=preset_progress, note=f"{len(outputs)} preset(s) ready")
-    return RenderResponse(outputs=outputs)
+    print(f"[render] asset={req.assetId} upload timings={upload_timings}")
+    return RenderResponse(outputs=outputs, timings={"uploads": upload_timings, "segments": seg_timings, "encode": encode_timings})
+
+
+# ----- Container warmup -----
+# Heavy imports, the YOLO weights and the first (slowest) forward pass used to
+# land on whichever request first needed them. `_warmup()` pays for all of it
+# when the container starts, before it takes traffic, and records how long
+# each phase took; GET /startup reports the breakdown.
+
+WARMUP_IMPORTS = (
+    "numpy", "cv2", "torch", "ultralytics", "scenedetect", "openai",
+    # librosa loads its submodules lazily; these are the ones the endpoints use.
+    "librosa", "librosa.beat", "librosa.feature",
+)
+STARTUP_SLO_SECONDS = 20.0
+
+_startup: dict = {"phases": {}, "totalSeconds": None, "startedAt": None}
+
+
+def _startup_slo_seconds() -> float:
+    """Cold-start budget for the warmup (`WORKER_STARTUP_SLO_SECONDS`)."""
+    try:
+        return float(os.environ.get("WORKER_STARTUP_SLO_SECONDS", STARTUP_SLO_SECONDS))
+    except ValueError:
+        return STARTUP_SLO_SECONDS
+
+
+def _warmup() -> dict:
+    """
+    Import the heavy libraries, load YOLO and run one dummy batch through it
+    and through Farneback. Each phase is timed into `_startup["phases"]`; a
+    failing phase is logged and skipped, so warmup never stops the container
+    from serving. `WORKER_PREWARM=0` leaves everything lazy.
+    """
+    import importlib
+
+    _startup["startedAt"] = time.time()
+    if os.environ.get("WORKER_PREWARM", "1") == "0":
+        print("[startup] prewarm disabled")
+        return _startup
+    phases = _startup["phases"]
+    t_start = time.perf_counter()
+
+    def _timed(name: str, fn) -> None:
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            print(f"[startup] {name} failed: {e}")
+        phases[name] = round(time.perf_counter() - t0, 3)
+
+    for module in WARMUP_IMPORTS:
+        _timed(f"import:{module}", lambda module=module: importlib.import_module(module))
+    _timed("yolo:load", _get_detector)
+
+    def _dummy_inference() -> None:
+        import numpy as np
+        frame = np.zeros((ANALYSIS_HEIGHT, ANALYSIS_HEIGHT * 16 // 9, 3), dtype=np.uint8)
+        _detect_persons_and_ball_batch([frame] * _yolo_batch_size())
+        gray = _motion_gray(frame)
+        _flow_magnitude(gray, gray)
+
+    _timed("inference", _dummy_inference)
+    total = time.perf_counter() - t_start
+    _startup["totalSeconds"] = round(total, 3)
+    slo = _startup_slo_seconds()
+    breakdown = ", ".join(f"{k} {v:.2f}s" for k, v in phases.items())
+    print(f"[startup] warm in {total:.2f}s (SLO {slo:g}s{', OVER' if total > slo else ''}): {breakdown}")
+    return _startup
+
+
+@web.get("/startup")
+async def startup(authorization: Optional[str] = Header(None)):
+    """This container's warmup breakdown, in seconds per phase."""
+    _require_auth(authorization)
+    slo = _startup_slo_seconds()
+    total = _startup["totalSeconds"]
+    return {
+        **_startup,
+        "sloSeconds": slo,
+        "withinSlo": None if total is None else total <= slo,
+        "uptimeSeconds": round(time.time() - _startup["startedAt"], 1) if _startup["startedAt"] else None,
+    }
 
 
-# cpu=4.0 gives multi-preset renders enough headroom for ffmpeg's internal
-# multithreading. Sequential per-preset encoding still applies (Phase 2b
-# Modal-native fan-out is deferred — see TODO at the per-preset loop), but
-# each ffmpeg instance now has 4 cores instead of 2 and finishes faster.
+# cpu=4.0 gives multi-preset renders enough headroom: /render encodes every
+# preset from one decode in a single multi-output ffmpeg run (one libx264
+# encoder per preset, sharing the 4 cores), and only falls back to one
+# ffmpeg run per preset when that fails (see RENDER_MULTI_OUTPUT).
 @app.function(image=image, secrets=secrets, timeout=900, memory=4096, cpu=4.0)
 @modal.asgi_app()
 def fastapi_app():
+    # Runs once when the container starts, before it serves any request.
+    _warmup()
     return web
 
 
@@ -2290,6 +5762,8 @@ async def beats(req: BeatsRequest, authorization: Optional[str] = Header(None)):
 class AudioAnalysisRequest(BaseModel):
     assetId: str
     proxyUrl: Optional[str] = None
+    # Optional jobId for `job:<id>:progress` stage updates (see HighlightRequest).
+    jobId: Optional[str] = None
 
 
 class AudioAnalysisResponse(BaseModel):
@@ -2315,37 +5789,36 @@ async def audio_analysis(req: AudioAnalysisRequest, authorization: Optional[str]
     import librosa
     import numpy as np
 
+    report = _progress_reporter(req.jobId)
     with tempfile.TemporaryDirectory() as td:
         tmpdir = pathlib.Path(td)
 
         try:
-            # Download proxy video
+            report(2, "downloading", note="fetching audio source")
+            # Prefer the analysis rendition: its audio is already mono at the
+            # 22.05kHz analysis rate and the file is a fraction of the proxy.
             video_path = tmpdir / "proxy.mp4"
-            if req.proxyUrl:
+            analysis_path: Optional[pathlib.Path] = None
+            try:
+                s3, bucket = _storage_client()
+                if s3 is not None:
+                    analysis_path = _fetch_analysis_proxy(s3, bucket, req.assetId, tmpdir)
+            except Exception as e:
+                print(f"[audio-analysis] analysis rendition unavailable: {e}")
+            if analysis_path is not None:
+                video_path = analysis_path
+            elif req.proxyUrl:
                 urllib.request.urlretrieve(req.proxyUrl, video_path)
             else:
                 # Try to fetch from storage using assetId
-                bucket = os.environ.get("STORAGE_BUCKET", "")
-                region = os.environ.get("STORAGE_REGION", "us-east-1")
-                access = os.environ.get("STORAGE_ACCESS_KEY", "")
-                secret = os.environ.get("STORAGE_SECRET_KEY", "")
-                endpoint = os.environ.get("STORAGE_ENDPOINT")
-
-                if bucket and access and secret:
-                    session = boto3.session.Session()
-                    s3 = session.client(
-                        "s3",
-                        region_name=region,
-                        aws_access_key_id=access,
-                        aws_secret_access_key=secret,
-                        endpoint_url=endpoint,
-                        config=BotoConfig(s3={"addressing_style": "path"}),
-                    )
+                s3, bucket = _storage_client()
+                if s3 is not None:
                     src_key = f"proxy/{req.assetId}.mp4"
                     src_url = s3.generate_presigned_url("get_object", Params={"Bucket": bucket, "Key": src_key}, ExpiresIn=3600)
                     urllib.request.urlretrieve(src_url, video_path)
 
             # Extract audio
+            report(20, "decoding", note="extracting audio")
             audio_path = tmpdir / "audio.wav"
             subprocess.run([
                 "ffmpeg", "-y", "-i", str(video_path),
@@ -2356,10 +5829,12 @@ async def audio_analysis(req: AudioAnalysisRequest, authorization: Optional[str]
             y, sr = librosa.load(str(audio_path), sr=22050)
 
             # 1. BPM detection
+            report(40, "analyzing", note="detecting tempo")
             tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
             avg_bpm = float(tempo)
 
             # 2. Energy curve (RMS in 1-second windows)
+            report(75, "analyzing", note="energy curve + peaks")
             frame_length = sr  # 1 second
             hop_length = sr // 2  # 0.5 second overlap
             rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
@@ -2388,6 +5863,7 @@ async def audio_analysis(req: AudioAnalysisRequest, authorization: Optional[str]
             # Convert frame indices to time
             peak_times = librosa.frames_to_time(peaks, sr=sr, hop_length=hop_length)
 
+            report(100, "done", note=f"{avg_bpm:.0f} BPM, {len(peak_times)} peak(s)", force=True)
             return AudioAnalysisResponse(
                 avgBpm=avg_bpm,
                 avgEnergy=avg_energy,
@@ -2399,6 +5875,7 @@ async def audio_analysis(req: AudioAnalysisRequest, authorization: Optional[str]
             import traceback
             print(f"Audio analysis error: {e}")
             print(traceback.format_exc())
+            report(0, "error", note=f"{type(e).__name__}: {e}", force=True)
 
             # Return fallback values
             return AudioAnalysisResponse(
@@ -2408,3 +5885,438 @@ async def audio_analysis(req: AudioAnalysisRequest, authorization: Optional[str]
                 energyCurve=[0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.85, 0.8, 0.75]
             )
 
+
+
+# ----- Benchmarks -----
+# Run against the deployed image with e.g.
+#   modal run workers/modal/modal_app.py::bench_ingest --source-url <presigned GET>
+#   modal run workers/modal/modal_app.py::bench_seek --source-url <presigned GET>
+#   modal run workers/modal/modal_app.py::bench_yolo --source-url <presigned GET> --batch-sizes 1,4,8,16
+#   modal run workers/modal/modal_app.py::bench_openai --scenes 60 --concurrency 1,4,8,16
+#   modal run workers/modal/modal_app.py::bench_scenes --seconds 600 --workers 1,2,4,8
+
+@app.function(image=image, secrets=secrets, timeout=1800, memory=4096, cpu=4.0)
+def bench_ingest(source_url: str) -> dict:
+    """
+    Run the single-pass ingest and the legacy three-pass ingest on the same
+    source and report the wall time the single decode saves for that asset.
+    Uploads are skipped — this isolates the ffmpeg side of /ingest.
+    """
+    with tempfile.TemporaryDirectory() as td:
+        tmpdir = pathlib.Path(td)
+        src_path = tmpdir / "source.mp4"
+        urllib.request.urlretrieve(source_url, src_path)
+        has_audio = _has_audio_stream(src_path)
+        duration = _probe_duration(str(src_path))
+
+        single_dir = tmpdir / "single"
+        single_dir.mkdir()
+        t0 = time.perf_counter()
+        _single_pass_ingest(str(src_path), single_dir, has_audio=has_audio, duration=duration)
+        single_s = time.perf_counter() - t0
+
+        multi_dir = tmpdir / "multi"
+        multi_dir.mkdir()
+        t0 = time.perf_counter()
+        _multi_pass_ingest(str(src_path), multi_dir)
+        multi_s = time.perf_counter() - t0
+
+    result = {
+        "sourceSeconds": round(duration, 2),
+        "singlePassSeconds": round(single_s, 3),
+        "multiPassSeconds": round(multi_s, 3),
+        "savedSeconds": round(multi_s - single_s, 3),
+        "savedPct": round(100.0 * (multi_s - single_s) / multi_s, 1) if multi_s > 0 else 0.0,
+    }
+    print(f"[bench_ingest] {result}")
+    return result
+
+
+def _time_sampled_reads(video_path: pathlib.Path, windows: List[Tuple[float, float]], per_window: int = 5) -> dict:
+    """Time the analyzers' access pattern: `per_window` evenly spaced frames per window."""
+    import cv2
+    import numpy as np
+
+    cap = cv2.VideoCapture(str(video_path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = 0
+    t0 = time.perf_counter()
+    for start, end in windows:
+        ts = np.linspace(start, end, per_window + 2)[1:-1]
+        for _ in _read_frames_at(cap, video_path, [int(t * fps) for t in ts]):
+            frames += 1
+    elapsed = time.perf_counter() - t0
+    cap.release()
+    return {
+        "frames": frames,
+        "seconds": round(elapsed, 3),
+        "msPerFrame": round(1000.0 * elapsed / frames, 2) if frames else None,
+    }
+
+
+@app.function(image=image, secrets=secrets, timeout=1800, memory=4096, cpu=4.0)
+def bench_seek(source_url: str, window_seconds: float = 3.0) -> dict:
+    """
+    Seek latency before/after the analysis rendition: ingest the source once
+    (edit proxy + analysis rendition from the same decode), then read 5 frames
+    per `window_seconds` window — the classifier's sampling pattern — with
+    plain seeks on the 720p60 edit proxy and index-planned reads on the 360p30
+    analysis rendition. File sizes are reported too (the download side).
+    """
+    with tempfile.TemporaryDirectory() as td:
+        tmpdir = pathlib.Path(td)
+        src_path = tmpdir / "source.mp4"
+        urllib.request.urlretrieve(source_url, src_path)
+        duration = _probe_duration(str(src_path))
+        artifacts = _single_pass_ingest(
+            str(src_path), tmpdir,
+            has_audio=_has_audio_stream(src_path), duration=duration, analysis=True,
+        )
+        import json
+        with open(artifacts["keyframes"], "r", encoding="utf-8") as f:
+            _register_keyframe_index(artifacts["analysis"], json.load(f))
+
+        windows = []
+        t = 0.0
+        while t + window_seconds <= duration:
+            windows.append((t, t + window_seconds))
+            t += window_seconds
+
+        before = _time_sampled_reads(artifacts["proxy"], windows)
+        after = _time_sampled_reads(artifacts["analysis"], windows)
+        before["bytes"] = artifacts["proxy"].stat().st_size
+        after["bytes"] = artifacts["analysis"].stat().st_size
+
+    result = {
+        "sourceSeconds": round(duration, 2),
+        "windows": len(windows),
+        "editProxy": before,
+        "analysisProxy": after,
+        "speedup": round(before["seconds"] / after["seconds"], 2) if after["seconds"] > 0 else None,
+    }
+    print(f"[bench_seek] {result}")
+    return result
+
+
+@app.function(image=image, secrets=secrets, timeout=1800, memory=4096, cpu=4.0)
+def bench_yolo(source_url: str, frames: int = 64, batch_sizes: str = "1,2,4,8,16,32") -> dict:
+    """
+    YOLO throughput per batch size: sample `frames` frames evenly across the
+    source, run `_detect_persons_and_ball_batch` over them at each size in
+    `batch_sizes`, and report frames/s plus whether each run's detections
+    match the first size's (centres to the pixel, confidences to 3 decimals).
+    """
+    import cv2
+
+    with tempfile.TemporaryDirectory() as td:
+        src_path = pathlib.Path(td) / "source.mp4"
+        urllib.request.urlretrieve(source_url, src_path)
+        cap = cv2.VideoCapture(str(src_path))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+        step = max(1, total // max(1, frames))
+        sample = [f for _, f in _read_frames_at(cap, src_path, list(range(0, total, step))[:frames])]
+        cap.release()
+
+    if _get_detector() is None:
+        return {"error": "YOLO model failed to load"}
+    _detect_persons_and_ball_batch(sample[:2], batch_size=2)  # warm-up (lazy fuse/allocations)
+
+    def _signature(dets: List[Tuple[list, list]]) -> list:
+        return [
+            (
+                [(round(p["cx"]), round(p["cy"]), round(p["conf"], 3)) for p in persons],
+                [(round(b[0]), round(b[1]), round(b[2], 3)) for b in balls],
+            )
+            for persons, balls in dets
+        ]
+
+    runs = []
+    reference = None
+    for size in [int(b) for b in batch_sizes.split(",") if b.strip()]:
+        t0 = time.perf_counter()
+        dets = _detect_persons_and_ball_batch(sample, batch_size=size)
+        elapsed = time.perf_counter() - t0
+        sig = _signature(dets)
+        if reference is None:
+            reference = sig
+        runs.append({
+            "batchSize": size,
+            "seconds": round(elapsed, 3),
+            "framesPerSecond": round(len(sample) / elapsed, 2) if elapsed > 0 else None,
+            "matchesFirst": sig == reference,
+        })
+
+    result = {"frames": len(sample), "runs": runs}
+    print(f"[bench_yolo] {result}")
+    return result
+
+
+def _box_iou(a: dict, b: dict) -> float:
+    """IoU of two person boxes ({x, y, w, h})."""
+    ix = max(0.0, min(a["x"] + a["w"], b["x"] + b["w"]) - max(a["x"], b["x"]))
+    iy = max(0.0, min(a["y"] + a["h"], b["y"] + b["h"]) - max(a["y"], b["y"]))
+    inter = ix * iy
+    union = a["w"] * a["h"] + b["w"] * b["h"] - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _detection_agreement(reference: List[Tuple[list, list]], dets: List[Tuple[list, list]]) -> dict:
+    """
+    How closely `dets` reproduce `reference`, frame by frame: persons are
+    greedily matched at IoU >= 0.5 (recall/precision/mean IoU over matches),
+    and a frame's ball agrees when both or neither side found one within 20px.
+    """
+    matched = ref_total = det_total = 0
+    ious: list = []
+    ball_agree = 0
+    for (ref_persons, ref_balls), (persons, balls) in zip(reference, dets):
+        ref_total += len(ref_persons)
+        det_total += len(persons)
+        free = list(persons)
+        for rp in sorted(ref_persons, key=lambda p: -p["conf"]):
+            best = max(free, key=lambda p: _box_iou(rp, p), default=None)
+            if best is not None and _box_iou(rp, best) >= 0.5:
+                ious.append(_box_iou(rp, best))
+                free.remove(best)
+                matched += 1
+        if not ref_balls and not balls:
+            ball_agree += 1
+        elif ref_balls and balls:
+            rb, b = max(ref_balls, key=lambda t: t[2]), max(balls, key=lambda t: t[2])
+            ball_agree += ((rb[0] - b[0]) ** 2 + (rb[1] - b[1]) ** 2) ** 0.5 <= 20
+    return {
+        "personRecall": round(matched / ref_total, 3) if ref_total else None,
+        "personPrecision": round(matched / det_total, 3) if det_total else None,
+        "meanIou": round(sum(ious) / len(ious), 3) if ious else None,
+        "ballAgreement": round(ball_agree / len(reference), 3) if reference else None,
+    }
+
+
+@app.function(image=image, secrets=secrets, timeout=1800, memory=4096, cpu=4.0)
+def bench_detection(source_url: str, frames: int = 64, backends: str = "ultralytics,onnx,onnx-int8") -> dict:
+    """
+    Detection backends side by side: sample `frames` frames evenly across the
+    source, run each backend in `backends` at YOLO_BATCH_SIZE, and report
+    frames/s plus person/ball agreement with the first backend's detections.
+    """
+    import cv2
+
+    with tempfile.TemporaryDirectory() as td:
+        src_path = pathlib.Path(td) / "source.mp4"
+        urllib.request.urlretrieve(source_url, src_path)
+        cap = cv2.VideoCapture(str(src_path))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
+        step = max(1, total // max(1, frames))
+        sample = [f for _, f in _read_frames_at(cap, src_path, list(range(0, total, step))[:frames])]
+        cap.release()
+
+    runs = []
+    reference = None
+    for backend in [b.strip() for b in backends.split(",") if b.strip()]:
+        t0 = time.perf_counter()
+        detector = _get_detector(backend)
+        load_seconds = time.perf_counter() - t0
+        if detector is None:
+            runs.append({"backend": backend, "error": "failed to load"})
+            continue
+        _detect_persons_and_ball_batch(sample[:2], batch_size=2, backend=backend)  # warm-up
+        t0 = time.perf_counter()
+        dets = _detect_persons_and_ball_batch(sample, backend=backend)
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = dets
+        runs.append({
+            "backend": backend,
+            "loadSeconds": round(load_seconds, 3),
+            "seconds": round(elapsed, 3),
+            "framesPerSecond": round(len(sample) / elapsed, 2) if elapsed > 0 else None,
+            **_detection_agreement(reference, dets),
+        })
+
+    result = {"frames": len(sample), "batchSize": _yolo_batch_size(), "runs": runs}
+    print(f"[bench_detection] {result}")
+    return result
+
+
+def _start_openai_stub(latency: float = 0.8, max_in_flight: int = 8, retry_after: float = 1.0):
+    """
+    Local stand-in for the Chat Completions endpoint, for offline vision
+    throughput runs (point OPENAI_BASE_URL at the returned URL). Each call
+    sleeps `latency` seconds and answers a valid classification; above
+    `max_in_flight` concurrent calls it answers 429 with Retry-After, like a
+    rate-limited account. Returns (server, base_url, stats) — call
+    `server.shutdown()` when done; `stats` counts `ok` and `rateLimited`.
+    """
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    lock = threading.Lock()
+    stats = {"inFlight": 0, "ok": 0, "rateLimited": 0}
+
+    class _Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("content-length") or 0))
+            if not self.path.endswith("/chat/completions"):
+                self._send(404, {"error": {"message": "not found"}})
+                return
+            with lock:
+                limited = stats["inFlight"] >= max_in_flight
+                if limited:
+                    stats["rateLimited"] += 1
+                else:
+                    stats["inFlight"] += 1
+            if limited:
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}},
+                    {"retry-after": f"{retry_after:g}"},
+                )
+                return
+            try:
+                time.sleep(latency)
+                content = json.dumps({
+                    "action": "Three Pointer", "confidence": 0.8, "descriptor": "stub classification",
+                    "jerseyNumbers": [], "featuredBbox": None,
+                })
+                self._send(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": OPENAI_VISION_MODEL,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+            finally:
+                with lock:
+                    stats["inFlight"] -= 1
+                    stats["ok"] += 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1", stats
+
+
+@app.function(image=image, timeout=1800, memory=2048, cpu=2.0)
+def bench_openai(
+    scenes: int = 60,
+    concurrency: str = "1,4,8,16",
+    latency: float = 0.8,
+    stub_limit: int = 8,
+) -> dict:
+    """
+    Offline vision throughput: classify `scenes` synthetic 360p strips
+    through `_classify_openai_ordered` at each concurrency against the local
+    stub (`latency` s per call, 429 + Retry-After above `stub_limit` in
+    flight). Reports wall time, scenes/s, 429s absorbed, and whether every
+    scene came back classified and in order. No OpenAI key or network needed.
+    """
+    import numpy as np
+
+    server, base_url, stats = _start_openai_stub(latency=latency, max_in_flight=stub_limit)
+    saved = {k: os.environ.get(k) for k in ("OPENAI_API_KEY", "OPENAI_BASE_URL")}
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_BASE_URL"] = base_url
+    strip = [np.zeros((ANALYSIS_HEIGHT, ANALYSIS_HEIGHT * 16 // 9, 3), dtype=np.uint8) for _ in range(5)]
+    runs = []
+    try:
+        for c in [int(x) for x in concurrency.split(",") if x.strip()]:
+            stats["ok"] = stats["rateLimited"] = 0
+            jobs = ((i, {"video_path": None, "start": float(i), "end": float(i) + 2.0, "frames": strip}) for i in range(scenes))
+            t0 = time.perf_counter()
+            results = list(_classify_openai_ordered(jobs, c))
+            elapsed = time.perf_counter() - t0
+            runs.append({
+                "concurrency": c,
+                "seconds": round(elapsed, 3),
+                "scenesPerSecond": round(scenes / elapsed, 2) if elapsed > 0 else None,
+                "rateLimited": stats["rateLimited"],
+                "allClassified": all(r is not None for _, r in results),
+                "inOrder": [k for k, _ in results] == list(range(scenes)),
+            })
+    finally:
+        server.shutdown()
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+    result = {"scenes": scenes, "latency": latency, "stubLimit": stub_limit, "runs": runs}
+    print(f"[bench_openai] {result}")
+    return result
+
+
+def _synthetic_cut_clip(out_path: pathlib.Path, seconds: float, segment: float = 7.0) -> List[float]:
+    """720p60 clip of alternating lavfi sources with a hard cut every `segment` s. Returns the cut times."""
+    sources = ["testsrc2", "mandelbrot", "smptehdbars", "life=mold=10:ratio=0.5", "rgbtestsrc", "cellauto=rule=110"]
+    n = max(2, -(-int(seconds) // int(segment)))
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    for i in range(n):
+        source = sources[i % len(sources)]
+        cmd += ["-f", "lavfi", "-t", str(segment), "-i", source + (":" if "=" in source else "=") + "size=1280x720:rate=60"]
+    graph = "".join(f"[{i}:v]format=yuv420p,setsar=1[v{i}];" for i in range(n))
+    graph += "".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[v]"
+    cmd += ["-filter_complex", graph, "-map", "[v]", "-t", str(seconds), *PROXY_VIDEO_ARGS, str(out_path)]
+    subprocess.run(cmd, check=True)
+    return [i * segment for i in range(1, n) if i * segment < seconds]
+
+
+@app.function(image=image, timeout=1800, memory=8192, cpu=8.0)
+def bench_scenes(seconds: float = 600.0, workers: str = "1,2,4,8") -> dict:
+    """
+    Sharded scene detection throughput on a synthetic 720p60 clip with known
+    cuts. Per worker count: wall time, decoded frames/s per core, whether the
+    merged cut list is identical to the single-worker one, and how many of
+    the known cuts were found (within one sampled frame).
+    """
+    with tempfile.TemporaryDirectory() as td:
+        clip = pathlib.Path(td) / "synthetic.mp4"
+        t0 = time.perf_counter()
+        truth = _synthetic_cut_clip(clip, seconds)
+        synth_seconds = time.perf_counter() - t0
+
+        runs = []
+        baseline = None
+        for w in [int(x) for x in workers.split(",") if x.strip()]:
+            candidates, duration, stats = _detect_scene_cuts_sharded(clip, workers=w)
+            cuts = [sc["start"] for sc in _scenes_from_cuts(candidates, duration, 0.0, SCENE_CONTENT_THRESHOLD)][1:]
+            if baseline is None:
+                baseline = cuts
+            tolerance = 1.0 / SCENE_DETECT_FPS + 1e-6
+            runs.append({
+                **stats,
+                "framesPerSecond": round(stats["decodedFrames"] / stats["seconds"], 1),
+                "framesPerSecondPerCore": round(stats["decodedFrames"] / stats["seconds"] / stats["workers"], 1),
+                "cuts": len(cuts),
+                "identicalToSingle": cuts == baseline,
+                "knownCutsFound": sum(1 for t in truth if any(abs(c - t) <= tolerance for c in cuts)),
+            })
+
+    result = {
+        "seconds": seconds,
+        "knownCuts": len(truth),
+        "synthSeconds": round(synth_seconds, 2),
+        "sampleFps": SCENE_DETECT_FPS,
+        "width": SCENE_DETECT_WIDTH,
+        "runs": runs,
+    }
+    print(f"[bench_scenes] {result}")
+    return result
@@ -0,0 +1,23 @@
+import pathlib
+import shutil
+import sys
+
+import pytest
+
+# modal_app is a single-file Modal app, not an installed package.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("modal")
+
+
+@pytest.fixture(scope="session")
+def modal_app():
+    import modal_app
+
+    return modal_app
+
+
+@pytest.fixture
+def ffmpeg():
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not on PATH")
@@ -0,0 +1,55 @@
+"""compute_audio_envelope / audio_peak_from_envelope against the librosa path they replace."""
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip("librosa")
+sf = pytest.importorskip("soundfile")
+
+SR = 22050
+
+
+def _synthetic_audio(path, seconds=12.0, seed=7):
+    """Noise floor with louder bursts, so scene peaks differ from window to window."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SR)
+    y = 0.02 * rng.standard_normal(n)
+    for start, length, gain in [(1.3, 0.4, 0.10), (4.05, 0.9, 0.03), (7.7, 0.2, 0.25), (10.2, 1.1, 0.06)]:
+        a, b = int(start * SR), int((start + length) * SR)
+        y[a:b] += gain * np.sin(2 * np.pi * 440 * np.arange(b - a) / SR)
+    sf.write(str(path), y.astype(np.float32), SR, subtype="FLOAT")
+    return y.astype(np.float32)
+
+
+@pytest.fixture
+def audio(tmp_path, ffmpeg, modal_app, monkeypatch):
+    path = tmp_path / "audio.wav"
+    y = _synthetic_audio(path)
+    # ffprobe isn't needed to know a wav has audio.
+    monkeypatch.setattr(modal_app, "_has_audio_stream", lambda p: True)
+    return path, y, modal_app.compute_audio_envelope(path)
+
+
+def test_envelope_matches_librosa_rms(audio, modal_app):
+    _, y, envelope = audio
+    expected = librosa.feature.rms(
+        y=y, frame_length=modal_app.AUDIO_PEAK_FRAME, hop_length=modal_app.AUDIO_PEAK_HOP, pad_mode="constant",
+    )[0]
+    assert envelope["rms"].shape == expected.shape
+    np.testing.assert_allclose(envelope["rms"], expected, rtol=1e-4, atol=1e-6)
+
+
+@pytest.mark.parametrize("start,end", [(0.0, 2.0), (1.0, 1.9), (3.2, 6.4), (7.5, 8.1), (9.0, 12.0), (5.0, 5.2)])
+def test_scene_peak_matches_compute_audio_peak(audio, modal_app, start, end):
+    path, _, envelope = audio
+    expected = modal_app.compute_audio_peak(path, start, end)
+    assert modal_app.audio_peak_from_envelope(envelope, start, end) == pytest.approx(expected, abs=0.01)
+
+
+def test_range_max_random(modal_app):
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        values = rng.random(int(rng.integers(1, 300)))
+        table = modal_app._sparse_table_max(values)
+        lo = int(rng.integers(0, len(values)))
+        hi = int(rng.integers(lo, len(values)))
+        assert modal_app._range_max(table, lo, hi) == values[lo:hi + 1].max()
@@ -0,0 +1,37 @@
+"""Sharded scene scoring must not depend on where the shard borders fall."""
+import pytest
+
+pytest.importorskip("cv2")
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory, modal_app):
+    import shutil
+
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not on PATH")
+    path = tmp_path_factory.mktemp("scenes") / "synthetic.mp4"
+    cuts = modal_app._synthetic_cut_clip(path, 20.0)
+    return path, cuts
+
+
+def _candidates(modal_app, monkeypatch, path, workers, shard_seconds):
+    monkeypatch.setattr(modal_app, "SCENE_SHARD_MIN_SECONDS", shard_seconds)
+    candidates, _, stats = modal_app._detect_scene_cuts_sharded(path, workers=workers)
+    return candidates, stats
+
+
+def test_sharded_candidates_match_single_pass(clip, modal_app, monkeypatch):
+    path, cuts = clip
+    single, single_stats = _candidates(modal_app, monkeypatch, path, 1, 3600.0)
+    assert single_stats["shards"] == 1
+
+    for workers in (1, 3):
+        sharded, stats = _candidates(modal_app, monkeypatch, path, workers, 3.0)
+        assert stats["shards"] > 1
+        assert sharded == single
+
+    # The known cuts are the strongest scores in the list.
+    top = sorted(single, key=lambda c: c[1], reverse=True)[:len(cuts)]
+    frame = 1.0 / modal_app.SCENE_DETECT_FPS
+    assert all(any(abs(t - cut) <= frame for t, _ in top) for cut in cuts)